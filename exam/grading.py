@@ -0,0 +1,209 @@
+from functools import reduce
+from operator import or_
+from django.db import IntegrityError, transaction
+from django.db.models import Case, Count, F, Q, When
+from django.db.models.functions import Coalesce, Greatest, NullIf
+from django.utils import timezone
+from rest_framework import status
+from exam.models import QuizAttempt, UserAnswers, LeaderBoardEntry, UserScoreRollup
+from exam.signals import attempt_submitted
+from quiz.models import QuizSet
+from resources import QuizExceptionHandler
+from resources.metrics import registry
+
+
+def load_answer_key(quiz_set_id):
+    # ONE QUERY: {question_id: correct_option} FOR EVERY QUESTION IN THE SET
+    return dict(
+        QuizSet.questions.through.objects.filter(
+            quizset_id=quiz_set_id
+        ).values_list(
+            "question_id",
+            "question__correct_option"
+        )
+    )
+
+
+def attempt_scores(questions_count, total_answered, correct_count):
+    return {
+        "total_answered": total_answered,
+        "correct_count": correct_count,
+        "wrong_count": total_answered - correct_count,
+        "score_pct": int(0.0 if questions_count == 0 else round((correct_count / questions_count) * 100)),
+    }
+
+
+def build_leader_board_entry(attempt):
+    # EXPECTS attempt.quiz_set TO BE LOADED, NAMES ARE JOINED WHEN THE BOARD IS READ
+    quiz_set = attempt.quiz_set
+    completion_seconds = None
+    if attempt.end_at and attempt.start_at:
+        completion_seconds = max(int((attempt.end_at - attempt.start_at).total_seconds()), 0)
+    return LeaderBoardEntry(
+        attempt=attempt,
+        quiz_set=quiz_set,
+        topic_id=quiz_set.topic_id,
+        difficulty_level=quiz_set.difficulty_level,
+        set_type=quiz_set.set_type,
+        user_id=attempt.user_id,
+        total_questions=attempt.total_answered,
+        correct_count=attempt.correct_count,
+        wrong_count=attempt.wrong_count,
+        percentage=0 if attempt.total_answered == 0 else (100 * attempt.correct_count) // attempt.total_answered,
+        completion_seconds=completion_seconds,
+        end_at=attempt.end_at
+    )
+
+
+def add_to_score_rollup(user_id, topic_id, difficulty_level, total_answers, correct_answers):
+    if not total_answers:
+        return
+    found_rollup = UserScoreRollup.objects.filter(
+        user_id=user_id,
+        topic_id=topic_id,
+        difficulty_level=difficulty_level
+    )
+    updated = found_rollup.update(
+        correct_percentage=Coalesce(
+            100.0 * (F("correct_answers") + correct_answers) / NullIf(F("total_answers") + total_answers, 0),
+            0.0
+        ),
+        total_answers=F("total_answers") + total_answers,
+        correct_answers=F("correct_answers") + correct_answers
+    )
+    if updated:
+        return
+    try:
+        with transaction.atomic():
+            UserScoreRollup.objects.create(
+                user_id=user_id,
+                topic_id=topic_id,
+                difficulty_level=difficulty_level,
+                total_answers=total_answers,
+                correct_answers=correct_answers,
+                correct_percentage=100.0 * correct_answers / total_answers
+            )
+    except IntegrityError:
+        # A CONCURRENT SUBMISSION CREATED THE ROW FIRST
+        add_to_score_rollup(user_id, topic_id, difficulty_level, total_answers, correct_answers)
+
+
+def remove_answers_from_score_rollups(answers):
+    # answers ARE ABOUT TO BE DELETED, THREE QUERIES HOWEVER MANY ROLLUPS THEY TOUCH
+    removed = list(
+        answers.filter(
+            attempt__is_submitted=True
+        ).values(
+            "attempt__user_id",
+            "attempt__quiz_set__topic_id",
+            "attempt__quiz_set__difficulty_level"
+        ).annotate(
+            total=Count("id"),
+            correct=Count("id", filter=Q(is_correct=True))
+        ).order_by()
+    )
+    if not removed:
+        return
+    matches = [
+        (
+            Q(
+                user_id=row["attempt__user_id"],
+                topic_id=row["attempt__quiz_set__topic_id"],
+                difficulty_level=row["attempt__quiz_set__difficulty_level"]
+            ),
+            row
+        )
+        for row in removed
+    ]
+    found_rollups = UserScoreRollup.objects.filter(reduce(or_, [match for match, _ in matches]))
+    total_answers = Greatest(
+        Case(*[When(match, then=F("total_answers") - row["total"]) for match, row in matches]),
+        0
+    )
+    correct_answers = Greatest(
+        Case(*[When(match, then=F("correct_answers") - row["correct"]) for match, row in matches]),
+        0
+    )
+    # correct_percentage FIRST, MYSQL READS THE NEW VALUES OF COLUMNS SET EARLIER IN THE SAME UPDATE
+    found_rollups.update(
+        correct_percentage=Coalesce(100.0 * correct_answers / NullIf(total_answers, 0), 0.0),
+        total_answers=total_answers,
+        correct_answers=correct_answers
+    )
+    found_rollups.filter(total_answers=0).delete()
+
+
+def grade_submission(attempt, responses):
+    answer_key = load_answer_key(attempt.quiz_set_id)
+
+    unknown_questions = []
+    duplicate_questions = []
+    seen = set()
+    for response in responses:
+        question_id = response["questionId"]
+        if question_id not in answer_key:
+            unknown_questions.append(question_id)
+        elif question_id in seen:
+            duplicate_questions.append(question_id)
+        seen.add(question_id)
+
+    if unknown_questions:
+        raise QuizExceptionHandler(
+            error_msg=f"Questions {unknown_questions} are not part of this quiz set.",
+            error_code=status.HTTP_406_NOT_ACCEPTABLE
+        )
+    if duplicate_questions:
+        raise QuizExceptionHandler(
+            error_msg=f"Questions {duplicate_questions} are answered more than once.",
+            error_code=status.HTTP_406_NOT_ACCEPTABLE
+        )
+
+    user_answers = [
+        UserAnswers(
+            attempt=attempt,
+            question_id=response["questionId"],
+            submitted_ans=response["selectedOption"],
+            is_correct=response["selectedOption"] == answer_key[response["questionId"]]
+        )
+        for response in responses
+    ]
+
+    # MARK QUIZ COMPLETE IN QUIZ ATTEMPT AND STORE ITS SCORE
+    scores = attempt_scores(
+        questions_count=len(answer_key),
+        total_answered=len(user_answers),
+        correct_count=sum(1 for user_answer in user_answers if user_answer.is_correct)
+    )
+    attempt.end_at = timezone.now()
+    attempt.is_submitted = True
+    for field, value in scores.items():
+        setattr(attempt, field, value)
+    # ONLY ONE OF TWO CONCURRENT SUBMISSIONS FLIPS is_submitted, THE OTHER WRITES NOTHING.
+    # ALL OR NOTHING, THE CALLING VIEW TURNS ERRORS INTO RESPONSES INSIDE ITS OWN ATOMIC BLOCK
+    with transaction.atomic():
+        marked = QuizAttempt.objects.filter(
+            id=attempt.id,
+            user_id=attempt.user_id,
+            is_submitted=False
+        ).update(
+            end_at=attempt.end_at,
+            is_submitted=True,
+            **scores
+        )
+        if not marked:
+            raise QuizExceptionHandler(
+                error_msg="Attempt already submitted.",
+                error_code=status.HTTP_406_NOT_ACCEPTABLE
+            )
+        UserAnswers.objects.bulk_create(user_answers)
+        build_leader_board_entry(attempt).save(force_insert=True)
+        add_to_score_rollup(
+            attempt.user_id,
+            attempt.quiz_set.topic_id,
+            attempt.quiz_set.difficulty_level,
+            attempt.total_answered,
+            attempt.correct_count
+        )
+        attempt_submitted.send(sender=QuizAttempt, attempt=attempt)
+        transaction.on_commit(lambda: registry.inc("quiz_submissions_graded_total"))
+    return user_answers
@@ -1,24 +1,18 @@
+from django.conf import settings
 from rest_framework import status
-from exam.models import QuizAttempt, UserAnswers
+from exam.models import QuizAttempt
 from exam.serializer import QuizResultDetailSerializer
-from quiz import seralizer as quiz_serializer
+from exam.paper_cache import exam_paper_cache, exam_paper_key
+from quiz import helper as quiz_helper
+from quiz.signals import tracked_delete
+from resources.metrics import registry
 from django.db.models import (
     Count,
-    Subquery,
-    OuterRef,
-    IntegerField,
+    Sum,
     Q,
     F,
-    Value,
-    Case,
-    When,
     ExpressionWrapper,
-    FloatField,
-    CharField
-)
-from django.db.models.functions import (
-    Concat,
-    Cast
+    FloatField
 )
 from resources import (
     QuizExceptionHandler,
@@ -28,6 +22,7 @@ from quiz.models import (
     QuizSet,
     Topic
 )
+from users.models import UserProfile
 from exam import (
     serializer,
     models
@@ -35,16 +30,31 @@ from exam import (
 
 
 def get_quiz_set(topic, difficulty, set_type):
-    topic = Topic.objects.get(id=topic)
-    found_quiz_set = QuizSet.objects.filter(topic__id=topic.id, difficulty_level=difficulty, set_type=set_type)
+    found_quiz_set = QuizSet.objects.filter(
+        topic__id=topic,
+        difficulty_level=difficulty,
+        set_type=set_type
+    ).values_list("id", "version").first()
+
     if not found_quiz_set:
+        found_topic = Topic.objects.filter(id=topic).first()
+        if not found_topic:
+            raise QuizExceptionHandler(
+                error_msg=f"The topic '{topic}' does not exist.",
+                error_code=status.HTTP_404_NOT_FOUND
+            )
         raise QuizExceptionHandler(
-            error_msg=f"No quiz set for this choice 'Topic:{topic.name}, difficulty:{difficulty}, Set:{set_type}'.",
+            error_msg=f"No quiz set for this choice 'Topic:{found_topic.name}, difficulty:{difficulty}, Set:{set_type}'.",
             error_code=status.HTTP_404_NOT_FOUND
         )
-    _serializer = quiz_serializer.QuizSetDetailsSerializer(found_quiz_set, many=True)
-    data = _serializer.data[0] if _serializer.data else {}
-    return data
+
+    quiz_set_id, version = found_quiz_set
+    return exam_paper_cache.get_or_set(
+        exam_paper_key(topic, difficulty, set_type, quiz_set_id, version),
+        lambda: dict(quiz_helper.get_quiz_set_details(
+            quiz_helper.quiz_set_details_queryset(QuizSet.objects.filter(id=quiz_set_id))
+        )[0])
+    )
 
 
 def quiz_start_details_fill(user, quiz_set, start_at):
@@ -52,6 +62,7 @@ def quiz_start_details_fill(user, quiz_set, start_at):
         data={"user": user.id, "quiz_set": quiz_set.id, "start_at": start_at})
     if serializer_data.is_valid():
         quiz_attempt = serializer_data.save()
+        registry.inc("quiz_attempts_started_total")
         response_data = serializer.QuizAttemptSerializer(quiz_attempt).data
         return response_data
     else:
@@ -62,22 +73,24 @@ def quiz_start_details_fill(user, quiz_set, start_at):
 
 
 def get_quiz_attempt_result_report(user, attempt):
-    found_data = UserAnswers.objects.filter(
-        attempt__id=attempt,
-        attempt__user_id=user
+    found_attempt = QuizAttempt.objects.select_related(
+        "quiz_set"
+    ).filter(
+        id=attempt,
+        user_id=user
+    ).first()
 
-    )
-
-    questions_count = found_data[0].attempt.quiz_set.questions_count
-    correct_answers = found_data.filter(is_correct=True).count()
-    incorrect_answers = found_data.filter(is_correct=False).count()
-    percentage = int(0.0 if questions_count == 0 else round((correct_answers / questions_count) * 100))
+    if not found_attempt:
+        raise QuizExceptionHandler(
+            error_msg="Attempt not found",
+            error_code=status.HTTP_404_NOT_FOUND
+        )
 
     return {
-        "totalQuestions": questions_count,
-        "correctAnswers": correct_answers,
-        "incorrectAnswers": incorrect_answers,
-        "percentage": percentage,
+        "totalQuestions": found_attempt.quiz_set.question_count,
+        "correctAnswers": found_attempt.correct_count,
+        "incorrectAnswers": found_attempt.wrong_count,
+        "percentage": found_attempt.score_pct,
     }
 
 
@@ -86,156 +99,162 @@ def delete_user_quiz_attempt(user, quiz_set):
         user_id=user,
         quiz_set__id=quiz_set.id
     )
-    if found_user_attempt:
-        found_user_attempt_answers = UserAnswers.objects.filter(
-            attempt__id=found_user_attempt[0].id
-        )
-        found_user_attempt_answers.delete()
-    found_user_attempt.delete()
+    # THE ANSWERS GO WITH THE ATTEMPT, quiz.signals TAKES THEM OFF THE SCORE ROLLUP FIRST
+    tracked_delete(found_user_attempt)
     return "User Quiz Attempt Deleted"
 
 
 def get_quiz_result(user, user_role):
     if user_role == UserType.STUDENT.value:
-        data = models.QuizAttempt.objects.filter(user_id=user, is_submitted=True)
+        data = models.QuizAttempt.objects.filter(
+            user_id=user,
+            is_submitted=True
+        ).select_related("quiz_set__topic")
         _serializer = QuizResultDetailSerializer(data, many=True)
         return _serializer.data
     if user_role == UserType.TEACHER.value:
-        question_count_subquery = models.QuizSet.questions.through.objects.filter(
-            quizset_id=OuterRef('pk')
-        ).values('quizset_id').annotate(
-            total_questions=Count('question_id')
-        ).values('total_questions')[:1]
-
         # Fetch quiz sets created by the current user
+        # Exclude quiz attempts by the quiz creator (self)
+        submitted_attempts = Q(quizattempt__is_submitted=True) & ~Q(quizattempt__user_id=user)
         quiz_sets = models.QuizSet.objects.filter(
             user=user
         ).annotate(
-            total_questions=Subquery(question_count_subquery, output_field=IntegerField())
-        )
+            total_questions=F("question_count")
+        ).annotate(
+            student_attempts=Count(
+                "quizattempt",
+                filter=submitted_attempts
+            ),
+            all_correct_students=Count(
+                "quizattempt",
+                filter=submitted_attempts & Q(question_count__gt=0, quizattempt__correct_count=F("total_questions"))
+            )
+        ).values(
+            "id",
+            "topic__name",
+            "difficulty_level",
+            "set_type",
+            "student_attempts",
+            "all_correct_students"
+        ).order_by("id")
 
         results = []
 
         for quiz_set in quiz_sets:
-            # Exclude quiz attempts by the quiz creator (self)
-            submitted_attempts = models.QuizAttempt.objects.filter(
-                quiz_set=quiz_set,
-                is_submitted=True
-            ).exclude(user=user)
-
-            student_attempts = submitted_attempts.count()
-            all_correct_students = 0
-
-            for attempt in submitted_attempts:
-                correct_count = models.UserAnswers.objects.filter(
-                    attempt=attempt,
-                    is_correct=True
-                ).count()
-
-                if correct_count == quiz_set.total_questions:
-                    all_correct_students += 1
-
-            not_all_correct_students = student_attempts - all_correct_students
-
             results.append({
-                "quiz_set_id": quiz_set.id,
-                "topic_name": quiz_set.topic.name,
-                "difficulty_level": quiz_set.difficulty_level,
-                "set_type": quiz_set.set_type,
-                "student_attempts": student_attempts,
-                "all_correct_students": all_correct_students,
-                "not_all_correct_students": not_all_correct_students
+                "quiz_set_id": quiz_set["id"],
+                "topic_name": quiz_set["topic__name"],
+                "difficulty_level": quiz_set["difficulty_level"],
+                "set_type": quiz_set["set_type"],
+                "student_attempts": quiz_set["student_attempts"],
+                "all_correct_students": quiz_set["all_correct_students"],
+                "not_all_correct_students": quiz_set["student_attempts"] - quiz_set["all_correct_students"]
             })
         return results
     return []
 
 
-def get_leader_board_result(topic, difficulty):
-    found_data = QuizAttempt.objects.filter(
-        is_submitted=True
-    )
+def get_limit_offset(query_params):
+    try:
+        limit = int(query_params.get("limit", settings.LEADER_BOARD_PAGE["DEFAULT_LIMIT"]))
+        offset = int(query_params.get("offset", 0))
+    except ValueError:
+        raise QuizExceptionHandler(
+            error_msg="The limit and offset must be numbers.",
+            error_code=status.HTTP_406_NOT_ACCEPTABLE
+        )
+    if limit <= 0 or offset < 0:
+        raise QuizExceptionHandler(
+            error_msg="The limit must be positive and the offset can not be negative.",
+            error_code=status.HTTP_406_NOT_ACCEPTABLE
+        )
+    return min(limit, settings.LEADER_BOARD_PAGE["MAX_LIMIT"]), offset
+
+
+def get_leader_board_result(topic, difficulty, limit, offset):
+    found_data = models.LeaderBoardEntry.objects.all()
     if topic:
         found_data = found_data.filter(
-            quiz_set__topic__id=topic
+            topic_id=topic
         )
     if difficulty:
         found_data = found_data.filter(
-            quiz_set__difficulty_level=difficulty
+            difficulty_level=difficulty
         )
     results = (
         found_data
-        .annotate(
-            quizSetId=F('quiz_set__id'),
-            topicName=F('quiz_set__topic__name'),
-            difficultyLevel=F('quiz_set__difficulty_level'),
-            setType=F('quiz_set__set_type'),
-            studentName=Concat(F('user__first_name'), Value(' '), F('user__last_name')),
-            totalQuestions=Count('useranswers'),
-            correctCount=Count('useranswers', filter=Q(useranswers__is_correct=True)),
-            wrongCount=Count('useranswers', filter=Q(useranswers__is_correct=False)),
-        )
-        .annotate(
-            percentage_int=Case(
-                When(totalQuestions=0, then=Value(0)),
-                default=ExpressionWrapper(
-                    100 * F('correctCount') / F('totalQuestions'),
-                    output_field=IntegerField()
-                )
-            )
-        )
-        .annotate(
-            percentage=Concat(
-                Cast('percentage_int', CharField()),
-                Value('%')
-            )
-        )
+        .order_by('set_type', 'correct_count', 'end_at', 'attempt_id')
+        # TOPIC AND STUDENT NAMES CAN BE EDITED, SO THEY ARE JOINED, NOT COPIED
         .values(
-            'topicName',
-            'difficultyLevel',
-            'setType',
-            'studentName',
-            'totalQuestions',
-            'correctCount',
-            'wrongCount',
+            'topic__name',
+            'difficulty_level',
+            'set_type',
+            'user__first_name',
+            'user__last_name',
+            'total_questions',
+            'correct_count',
+            'wrong_count',
             'percentage',
-        )
-        .order_by('setType', 'correctCount', 'end_at')
+        )[offset:offset + limit]
     )
-    return results
+    return [
+        {
+            'topicName': row['topic__name'],
+            'difficultyLevel': row['difficulty_level'],
+            'setType': row['set_type'],
+            'studentName': f"{row['user__first_name']} {row['user__last_name']}",
+            'totalQuestions': row['total_questions'],
+            'correctCount': row['correct_count'],
+            'wrongCount': row['wrong_count'],
+            'percentage': f"{row['percentage']}%",
+        }
+        for row in results
+    ]
 
 
-def get_leader_board_top_result(topic=None, difficulty=None):
-    user_answers = UserAnswers.objects.all()
+def get_leader_board_top_result(topic=None, difficulty=None, top=3):
+    rollups = models.UserScoreRollup.objects.all()
 
     if topic is not None:
-        user_answers = user_answers.filter(attempt__quiz_set__topic_id=topic)
+        rollups = rollups.filter(topic_id=topic)
     if difficulty is not None:
-        user_answers = user_answers.filter(attempt__quiz_set__difficulty_level=difficulty)
+        rollups = rollups.filter(difficulty_level=difficulty)
 
-    top_users = (
-        user_answers
-        .values(
-            user_id=F('attempt__user__id'),
-            username=F('attempt__user__username'),
-            first_name=F('attempt__user__first_name'),
-            last_name=F('attempt__user__last_name')
+    if topic is not None and difficulty is not None:
+        # ONE ROW PER USER, READ STRAIGHT FROM THE (topic, difficulty, percentage) INDEX
+        top_users = list(
+            rollups
+            .values('user_id', 'correct_percentage')
+            .order_by('-correct_percentage', 'user_id')[:top]
         )
-        .annotate(
-            total_answers=Count('id'),
-            correct_answers=Count('id', filter=Q(is_correct=True)),
-            correct_percentage=ExpressionWrapper(
-                100.0 * Count('id', filter=Q(is_correct=True)) / Count('id'),
-                output_field=FloatField()
+    else:
+        # ALL TOPICS / ALL DIFFICULTIES: SUM THE USER'S ROLLUP ROWS
+        top_users = list(
+            rollups
+            .values('user_id')
+            .annotate(
+                total_answers=Sum('total_answers'),
+                correct_answers=Sum('correct_answers')
             )
+            .annotate(
+                correct_percentage=ExpressionWrapper(
+                    100.0 * F('correct_answers') / F('total_answers'),
+                    output_field=FloatField()
+                )
+            )
+            .order_by('-correct_percentage', 'user_id')[:top]
         )
-        .order_by('-correct_percentage')[:3]
+
+    users = UserProfile.objects.in_bulk(
+        [user['user_id'] for user in top_users]
     )
     response = []
     for position, user in enumerate(top_users, start=1):
+        found_user = users[user['user_id']]
         response.append({
             'position': position,
-            'username': user['username'],
-            'name': (user['first_name'] or '') + " " + (user['last_name'] or ''),
+            'username': found_user.username,
+            'name': (found_user.first_name or '') + " " + (found_user.last_name or ''),
             'percentage': int(round(user['correct_percentage'], 1))
         })
     return response
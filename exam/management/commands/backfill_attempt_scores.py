@@ -0,0 +1,63 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q
+from exam.grading import attempt_scores
+from exam.models import QuizAttempt, UserAnswers
+from quiz.models import QuizSet
+
+SCORE_FIELDS = ["total_answered", "correct_count", "wrong_count", "score_pct"]
+
+
+class Command(BaseCommand):
+    help = "Backfill the stored score columns of submitted quiz attempts from their answers."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        last_id = 0
+        updated = 0
+
+        while True:
+            attempts = list(
+                QuizAttempt.objects.filter(
+                    is_submitted=True,
+                    id__gt=last_id
+                ).order_by("id")[:chunk_size]
+            )
+            if not attempts:
+                break
+            last_id = attempts[-1].id
+
+            answer_counts = {
+                row["attempt_id"]: row
+                for row in UserAnswers.objects.filter(
+                    attempt_id__in=[attempt.id for attempt in attempts]
+                ).values("attempt_id").annotate(
+                    total=Count("id"),
+                    correct=Count("id", filter=Q(is_correct=True))
+                )
+            }
+            question_counts = dict(
+                QuizSet.objects.filter(
+                    id__in={attempt.quiz_set_id for attempt in attempts}
+                ).values_list("id", "question_count")
+            )
+
+            for attempt in attempts:
+                counts = answer_counts.get(attempt.id, {"total": 0, "correct": 0})
+                scores = attempt_scores(
+                    questions_count=question_counts.get(attempt.quiz_set_id, 0),
+                    total_answered=counts["total"],
+                    correct_count=counts["correct"]
+                )
+                for field, value in scores.items():
+                    setattr(attempt, field, value)
+
+            with transaction.atomic():
+                QuizAttempt.objects.bulk_update(attempts, SCORE_FIELDS)
+            updated += len(attempts)
+            self.stdout.write(f"Backfilled {updated} attempts (last id {last_id})")
+
+        self.stdout.write(self.style.SUCCESS(f"Done, {updated} attempts backfilled."))
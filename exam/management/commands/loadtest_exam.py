@@ -0,0 +1,157 @@
+import random
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate
+from time import perf_counter
+from django.core.management.base import BaseCommand, CommandError
+from exam.models import QuizAttempt
+from quiz.models import QuizSet
+from resources import UserType, QuestionType
+from resources.load_driver import timed_request, percentile_ms
+from users.models import UserProfile
+
+# ONE EXAM SITTING OF ONE STUDENT, IN ORDER
+ENDPOINTS = [
+    "login",
+    "open paper",
+    "start attempt",
+    "submit",
+    "attempt result",
+    "results",
+    "leaderboard top",
+    "leaderboard result",
+]
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay an exam-day mix against a running server: every session logs a student in, opens a "
+        "paper, starts, submits, and reads the results and leader boards. Reports throughput and "
+        "p50/p95/p99 per endpoint. Seed the data first with seed_exam_data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+        parser.add_argument("--sessions", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=20)
+        parser.add_argument("--prefix", default="seed-", help="Username prefix of the students to log in as.")
+        parser.add_argument("--password", default="loadtest-password")
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        self.base_url = options["base_url"].rstrip("/")
+        self.password = options["password"]
+        self.rng = random.Random(options["seed"])
+        sessions = self.plan_sessions(options["prefix"], options["sessions"])
+        if not sessions:
+            raise CommandError(
+                f"No student with the prefix '{options['prefix']}' has a quiz set left to attempt, "
+                f"run seed_exam_data first."
+            )
+
+        started = perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as executor:
+            results = list(executor.map(self.run_session, sessions))
+        elapsed = perf_counter() - started
+
+        timings = defaultdict(list)
+        errors = defaultdict(int)
+        for session_results in results:
+            for endpoint, status_code, seconds in session_results:
+                timings[endpoint].append(seconds)
+                if not 200 <= status_code < 300:
+                    errors[endpoint] += 1
+        completed = sum(1 for session_results in results if len(session_results) == len(ENDPOINTS))
+        total = sum(len(seconds) for seconds in timings.values())
+
+        self.stdout.write(
+            f"{len(sessions)} sessions ({completed} completed), {total} requests in {elapsed:.2f}s, "
+            f"{total / elapsed:.1f} req/s, concurrency {options['concurrency']}"
+        )
+        self.stdout.write(
+            f"{'endpoint':<20} {'requests':>8} {'errors':>7} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+        )
+        for endpoint in ENDPOINTS:
+            seconds = timings.get(endpoint, [])
+            self.stdout.write(
+                f"{endpoint:<20} {len(seconds):>8} {errors[endpoint]:>7} {len(seconds) / elapsed:>8.1f} "
+                f"{percentile_ms(seconds, 50):>9.1f} {percentile_ms(seconds, 95):>9.1f} {percentile_ms(seconds, 99):>9.1f}"
+            )
+
+    def plan_sessions(self, prefix, count):
+        students = list(
+            UserProfile.objects.filter(
+                username__startswith=prefix,
+                role=UserType.STUDENT.value
+            ).order_by("id").values_list("id", "username")
+        )
+        quiz_sets = list(
+            QuizSet.objects.filter(
+                is_active=True,
+                question_count__gt=0
+            ).order_by("id").values_list("id", "topic_id", "difficulty_level", "set_type")
+        )
+        attempted = set(
+            QuizAttempt.objects.filter(
+                user__username__startswith=prefix
+            ).values_list("user_id", "quiz_set_id")
+        )
+
+        # EVERY SESSION IS A SET THE STUDENT HAS NOT SAT YET, A SECOND START WOULD BE REJECTED
+        sessions = []
+        self.rng.shuffle(students)
+        for user_id, username in students:
+            open_sets = [quiz_set for quiz_set in quiz_sets if (user_id, quiz_set[0]) not in attempted]
+            if not open_sets:
+                continue
+            sessions.append((user_id, username, self.rng.choice(open_sets)))
+            if len(sessions) == count:
+                break
+        return sessions
+
+    def run_session(self, session):
+        user_id, username, (quiz_set_id, topic_id, difficulty, set_type) = session
+        rng = random.Random(user_id)
+        results = []
+
+        def call(endpoint, path, data=None, token=None):
+            status_code, seconds, body = timed_request(f"{self.base_url}{path}", data=data, token=token)
+            results.append((endpoint, status_code, seconds))
+            if 200 <= status_code < 300 and body:
+                return body.get("data")
+            return None
+
+        tokens = call("login", "/api/users/login", {"username": username, "password": self.password})
+        if not tokens:
+            return results
+        token = tokens["access"]
+
+        paper = call("open paper", "/api/exam/quiz-set", {
+            "topic": topic_id,
+            "difficulty": difficulty,
+            "set_type": set_type,
+        }, token)
+        if not paper:
+            return results
+
+        attempt = call("start attempt", "/api/exam/attempt/", {
+            "user": user_id,
+            "quiz_set": quiz_set_id,
+            "start_at": formatdate(usegmt=True),
+        }, token)
+        if not attempt:
+            return results
+
+        call("submit", "/api/exam/attempt/submit", {
+            "user": user_id,
+            "attempt": attempt["id"],
+            "quiz_user_response": [
+                {"questionId": question["id"], "selectedOption": rng.choice(QuestionType.all_values())}
+                for question in paper["questions"]
+            ],
+        }, token)
+        call("attempt result", f"/api/exam/attempt/result?attempt={attempt['id']}", token=token)
+        call("results", "/api/exam/result", token=token)
+        call("leaderboard top", f"/api/exam/leaderboard/top?topic={topic_id}&difficulty={difficulty}", token=token)
+        call("leaderboard result", f"/api/exam/leaderboard/result?topic={topic_id}&difficulty={difficulty}", token=token)
+        return results
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from exam.grading import build_leader_board_entry
+from exam.models import QuizAttempt, LeaderBoardEntry
+
+
+class Command(BaseCommand):
+    help = "Rebuild the leader board table from the stored scores of submitted quiz attempts."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--chunk-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        last_id = 0
+        rebuilt = 0
+
+        with transaction.atomic():
+            LeaderBoardEntry.objects.all().delete()
+            while True:
+                attempts = list(
+                    QuizAttempt.objects.filter(
+                        is_submitted=True,
+                        id__gt=last_id
+                    ).select_related(
+                        "quiz_set"
+                    ).order_by("id")[:chunk_size]
+                )
+                if not attempts:
+                    break
+                last_id = attempts[-1].id
+                LeaderBoardEntry.objects.bulk_create(
+                    [build_leader_board_entry(attempt) for attempt in attempts]
+                )
+                rebuilt += len(attempts)
+                self.stdout.write(f"Rebuilt {rebuilt} leader board rows (last attempt id {last_id})")
+
+        self.stdout.write(self.style.SUCCESS(f"Done, {rebuilt} leader board rows rebuilt."))
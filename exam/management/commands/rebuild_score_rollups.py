@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, Q
+from exam.models import UserAnswers, UserScoreRollup
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per user, topic and difficulty score rollups from the stored answers."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        rows = UserAnswers.objects.values(
+            "attempt__user_id",
+            "attempt__quiz_set__topic_id",
+            "attempt__quiz_set__difficulty_level"
+        ).annotate(
+            total=Count("id"),
+            correct=Count("id", filter=Q(is_correct=True))
+        ).order_by()
+
+        rebuilt = 0
+        with transaction.atomic():
+            UserScoreRollup.objects.all().delete()
+            batch = []
+            for row in rows.iterator(chunk_size=options["batch_size"]):
+                batch.append(UserScoreRollup(
+                    user_id=row["attempt__user_id"],
+                    topic_id=row["attempt__quiz_set__topic_id"],
+                    difficulty_level=row["attempt__quiz_set__difficulty_level"],
+                    total_answers=row["total"],
+                    correct_answers=row["correct"],
+                    correct_percentage=100.0 * row["correct"] / row["total"]
+                ))
+                if len(batch) >= options["batch_size"]:
+                    UserScoreRollup.objects.bulk_create(batch)
+                    rebuilt += len(batch)
+                    batch = []
+            UserScoreRollup.objects.bulk_create(batch)
+            rebuilt += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(f"Done, {rebuilt} score rollups rebuilt."))
@@ -0,0 +1,209 @@
+import random
+from datetime import timedelta
+from time import perf_counter
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils.timezone import now
+from exam.models import QuizAttempt, UserAnswers
+from quiz.models import Question, QuizSet, Topic
+from resources import UserType, QuestionType, QuestionDifficultyType, chunked
+from resources.custom_enums import QuizSetType
+from users.models import UserProfile
+
+OPTIONS = QuestionType.all_values()
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate teachers, students, topics, question banks, quiz sets and submitted attempts with "
+        "answers. The same --seed gives the same data set."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--teachers", type=int, default=10)
+        parser.add_argument("--students", type=int, default=1000)
+        parser.add_argument("--topics", type=int, default=5)
+        parser.add_argument("--bank-size", type=int, default=60, help="Questions per topic and difficulty.")
+        parser.add_argument("--questions-per-set", type=int, default=20)
+        parser.add_argument("--set-types", type=int, default=2, choices=range(1, len(QuizSetType) + 1))
+        parser.add_argument("--attempts-per-student", type=int, default=3)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--prefix", default="seed-", help="Prefix of the generated usernames and topic names.")
+        parser.add_argument("--password", default="loadtest-password", help="Password of every generated user.")
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        if options["questions_per_set"] > options["bank_size"]:
+            raise CommandError("--questions-per-set can not be larger than --bank-size.")
+        prefix = options["prefix"]
+        if UserProfile.objects.filter(username__startswith=prefix).exists():
+            raise CommandError(f"Users with the prefix '{prefix}' already exist, pass another --prefix.")
+
+        self.rng = random.Random(options["seed"])
+        self.batch_size = options["batch_size"]
+        started = perf_counter()
+
+        with transaction.atomic():
+            teachers = self.create_users(prefix, "teacher", options["teachers"], UserType.TEACHER.value, options["password"])
+            students = self.create_users(prefix, "student", options["students"], UserType.STUDENT.value, options["password"])
+            topics = self.create_topics(prefix, options["topics"])
+            banks = self.create_question_banks(topics, teachers, options["bank_size"])
+            quiz_sets = self.create_quiz_sets(
+                topics,
+                teachers,
+                banks,
+                QuizSetType.all_values()[:options["set_types"]],
+                options["questions_per_set"]
+            )
+            attempts, answers = self.create_attempts(students, quiz_sets, options["attempts_per_student"])
+
+        # SCORES, LEADER BOARD, ROLLUPS AND DASHBOARD COUNTERS ARE DERIVED, bulk_create SENDS NO SIGNALS
+        for command in ["backfill_attempt_scores", "rebuild_leader_board", "rebuild_score_rollups", "reconcile_dashboard_counters"]:
+            call_command(command, stdout=self.stdout)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Done in {perf_counter() - started:.1f}s: {len(teachers)} teachers, {len(students)} students, "
+            f"{len(topics)} topics, {sum(len(bank) for bank in banks.values())} questions, {len(quiz_sets)} quiz sets, "
+            f"{attempts} attempts, {answers} answers."
+        ))
+
+    def bulk_create(self, model, objects):
+        for batch in chunked(objects, self.batch_size):
+            model.objects.bulk_create(batch)
+
+    def create_users(self, prefix, kind, count, role, password):
+        # ONE HASH FOR EVERY USER, HASHING THOUSANDS OF PASSWORDS WOULD TAKE MINUTES
+        encoded = make_password(password)
+        usernames = [f"{prefix}{kind}-{index}" for index in range(count)]
+        self.bulk_create(UserProfile, (
+            UserProfile(
+                username=username,
+                email=f"{username}@seed.local",
+                first_name=kind.title(),
+                last_name=str(index),
+                role=role,
+                password=encoded
+            )
+            for index, username in enumerate(usernames)
+        ))
+        # MYSQL DOES NOT RETURN THE IDS OF A bulk_create
+        ids = dict(UserProfile.objects.filter(username__startswith=f"{prefix}{kind}-").values_list("username", "id"))
+        return [ids[username] for username in usernames]
+
+    def create_topics(self, prefix, count):
+        names = [f"{prefix}topic-{index}" for index in range(count)]
+        self.bulk_create(Topic, (Topic(name=name) for name in names))
+        ids = dict(Topic.objects.filter(name__in=names).values_list("name", "id"))
+        return [ids[name] for name in names]
+
+    def create_question_banks(self, topics, teachers, bank_size):
+        banks = {}
+        for topic_index, topic_id in enumerate(topics):
+            teacher_id = teachers[topic_index % len(teachers)]
+            for difficulty in QuestionDifficultyType.all_values():
+                self.bulk_create(Question, (
+                    Question(
+                        question_text=f"Topic {topic_index} {difficulty} question {index}",
+                        option_a="Option A",
+                        option_b="Option B",
+                        option_c="Option C",
+                        option_d="Option D",
+                        correct_option=self.rng.choice(OPTIONS),
+                        topic_id=topic_id,
+                        difficulty_level=difficulty,
+                        user_id=teacher_id
+                    )
+                    for index in range(bank_size)
+                ))
+                banks[(topic_id, difficulty)] = list(
+                    Question.objects.filter(
+                        topic_id=topic_id,
+                        difficulty_level=difficulty
+                    ).order_by("id").values_list("id", "correct_option")
+                )
+        return banks
+
+    def create_quiz_sets(self, topics, teachers, banks, set_types, questions_per_set):
+        plans = []
+        for topic_index, topic_id in enumerate(topics):
+            for difficulty in QuestionDifficultyType.all_values():
+                for set_type in set_types:
+                    questions = self.rng.sample(banks[(topic_id, difficulty)], questions_per_set)
+                    plans.append((topic_id, difficulty, set_type, teachers[topic_index % len(teachers)], questions))
+
+        self.bulk_create(QuizSet, (
+            QuizSet(
+                topic_id=topic_id,
+                difficulty_level=difficulty,
+                set_type=set_type,
+                user_id=teacher_id,
+                is_active=True,
+                question_count=len(questions)
+            )
+            for topic_id, difficulty, set_type, teacher_id, questions in plans
+        ))
+        ids = {
+            (topic_id, difficulty, set_type): quiz_set_id
+            for quiz_set_id, topic_id, difficulty, set_type in QuizSet.objects.filter(
+                topic_id__in=topics
+            ).values_list("id", "topic_id", "difficulty_level", "set_type")
+        }
+        quiz_sets = [
+            (ids[(topic_id, difficulty, set_type)], questions)
+            for topic_id, difficulty, set_type, _, questions in plans
+        ]
+        self.bulk_create(QuizSet.questions.through, (
+            QuizSet.questions.through(quizset_id=quiz_set_id, question_id=question_id)
+            for quiz_set_id, questions in quiz_sets
+            for question_id, _ in questions
+        ))
+        return quiz_sets
+
+    def create_attempts(self, students, quiz_sets, attempts_per_student):
+        started_at = now()
+        plans = []
+        for student_id in students:
+            # EACH STUDENT GETS A SKILL, SCORES SPREAD LIKE A REAL CLASS INSTEAD OF AROUND 25%
+            skill = self.rng.uniform(0.3, 0.95)
+            for quiz_set_index in self.rng.sample(range(len(quiz_sets)), min(attempts_per_student, len(quiz_sets))):
+                plans.append((student_id, quiz_set_index, skill, self.rng.randint(60, 1200)))
+
+        self.bulk_create(QuizAttempt, (
+            QuizAttempt(
+                user_id=student_id,
+                quiz_set_id=quiz_sets[quiz_set_index][0],
+                is_submitted=True,
+                end_at=started_at + timedelta(seconds=seconds)
+            )
+            for student_id, quiz_set_index, _, seconds in plans
+        ))
+        attempt_ids = {
+            (user_id, quiz_set_id): attempt_id
+            for attempt_id, user_id, quiz_set_id in QuizAttempt.objects.filter(
+                quiz_set_id__in=[quiz_set_id for quiz_set_id, _ in quiz_sets]
+            ).values_list("id", "user_id", "quiz_set_id").iterator()
+        }
+
+        answers = 0
+
+        def generate_answers():
+            nonlocal answers
+            for student_id, quiz_set_index, skill, _ in plans:
+                quiz_set_id, questions = quiz_sets[quiz_set_index]
+                attempt_id = attempt_ids[(student_id, quiz_set_id)]
+                for question_id, correct_option in questions:
+                    is_correct = self.rng.random() < skill
+                    answers += 1
+                    yield UserAnswers(
+                        attempt_id=attempt_id,
+                        question_id=question_id,
+                        submitted_ans=correct_option if is_correct else self.rng.choice(
+                            [option for option in OPTIONS if option != correct_option]
+                        ),
+                        is_correct=is_correct
+                    )
+
+        self.bulk_create(UserAnswers, generate_answers())
+        return len(plans), answers
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.3 on 2026-10-18 17:57
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('quiz', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuizAttempt',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start_at', models.DateTimeField(auto_now_add=True)),
+                ('end_at', models.DateTimeField(null=True)),
+                ('is_submitted', models.BooleanField(default=False)),
+                ('quiz_set', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='quiz.quizset')),
+                ('user', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'quiz_attempt',
+                'managed': True,
+                'unique_together': {('user', 'quiz_set')},
+            },
+        ),
+        migrations.CreateModel(
+            name='UserAnswers',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('submitted_ans', models.CharField(choices=[('A', 'A'), ('B', 'B'), ('C', 'C'), ('D', 'D')], max_length=5)),
+                ('is_correct', models.BooleanField(default=False)),
+                ('attempt', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, to='exam.quizattempt')),
+                ('question', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, to='quiz.question')),
+            ],
+            options={
+                'db_table': 'user_answer',
+                'managed': True,
+                'unique_together': {('attempt', 'question')},
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.3 on 2026-10-18 18:01
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exam', '0002_quizattempt_score_columns'),
+        ('quiz', '0002_quizset_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderBoardEntry',
+            fields=[
+                ('attempt', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='leader_board_entry', serialize=False, to='exam.quizattempt')),
+                ('topic_name', models.CharField(max_length=50)),
+                ('difficulty_level', models.CharField(max_length=10)),
+                ('set_type', models.CharField(max_length=5)),
+                ('student_name', models.CharField(max_length=301)),
+                ('total_questions', models.PositiveIntegerField(default=0)),
+                ('correct_count', models.PositiveIntegerField(default=0)),
+                ('wrong_count', models.PositiveIntegerField(default=0)),
+                ('percentage', models.PositiveSmallIntegerField(default=0)),
+                ('completion_seconds', models.PositiveIntegerField(null=True)),
+                ('end_at', models.DateTimeField(null=True)),
+                ('quiz_set', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='quiz.quizset')),
+                ('topic', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='quiz.topic')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'leader_board',
+                'managed': True,
+                'indexes': [models.Index(fields=['set_type', 'correct_count', 'end_at', 'attempt'], name='leader_board_rank_idx'), models.Index(fields=['topic', 'difficulty_level', 'set_type', 'correct_count', 'end_at'], name='leader_board_topic_rank_idx'), models.Index(fields=['difficulty_level', 'set_type', 'correct_count', 'end_at'], name='leader_board_diff_rank_idx')],
+            },
+        ),
+    ]
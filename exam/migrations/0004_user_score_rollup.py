@@ -0,0 +1,35 @@
+# Generated by Django 5.2.3 on 2026-10-18 18:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exam', '0003_leader_board'),
+        ('quiz', '0002_quizset_version'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserScoreRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('difficulty_level', models.CharField(max_length=10)),
+                ('total_answers', models.PositiveIntegerField(default=0)),
+                ('correct_answers', models.PositiveIntegerField(default=0)),
+                ('correct_percentage', models.FloatField(default=0)),
+                ('topic', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='quiz.topic')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'user_score_rollup',
+                'managed': True,
+                'indexes': [models.Index(fields=['topic', 'difficulty_level', '-correct_percentage'], name='score_rollup_top_idx')],
+                'unique_together': {('user', 'topic', 'difficulty_level')},
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.3 on 2026-10-18 18:54
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exam', '0004_user_score_rollup'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='leaderboardentry',
+            name='student_name',
+        ),
+        migrations.RemoveField(
+            model_name='leaderboardentry',
+            name='topic_name',
+        ),
+    ]
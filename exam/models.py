@@ -1,6 +1,6 @@
 from users.models import UserProfile
 from django.db import models
-from quiz.models import QuizSet, Question
+from quiz.models import QuizSet, Question, Topic
 from resources import QuestionType
 
 
@@ -10,6 +10,10 @@ class QuizAttempt(models.Model):
     start_at = models.DateTimeField(auto_now_add=True)
     end_at = models.DateTimeField(null=True)
     is_submitted = models.BooleanField(default=False)
+    total_answered = models.PositiveIntegerField(default=0)
+    correct_count = models.PositiveIntegerField(default=0)
+    wrong_count = models.PositiveIntegerField(default=0)
+    score_pct = models.PositiveSmallIntegerField(default=0)
 
     class Meta:
         db_table = 'quiz_attempt'
@@ -45,3 +49,62 @@ class UserAnswers(models.Model):
         db_table = "user_answer"
         managed = True
         unique_together = ('attempt', 'question')
+
+
+class LeaderBoardEntry(models.Model):
+    attempt = models.OneToOneField(
+        QuizAttempt,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="leader_board_entry"
+    )
+    quiz_set = models.ForeignKey(QuizSet, on_delete=models.CASCADE)
+    topic = models.ForeignKey(Topic, on_delete=models.CASCADE)
+    difficulty_level = models.CharField(max_length=10)
+    set_type = models.CharField(max_length=5)
+    user = models.ForeignKey(UserProfile, on_delete=models.CASCADE)
+    total_questions = models.PositiveIntegerField(default=0)
+    correct_count = models.PositiveIntegerField(default=0)
+    wrong_count = models.PositiveIntegerField(default=0)
+    percentage = models.PositiveSmallIntegerField(default=0)
+    completion_seconds = models.PositiveIntegerField(null=True)
+    end_at = models.DateTimeField(null=True)
+
+    class Meta:
+        db_table = "leader_board"
+        managed = True
+        # RANK KEY: set_type, correct_count, end_at (attempt id breaks ties)
+        indexes = [
+            models.Index(
+                fields=["set_type", "correct_count", "end_at", "attempt"],
+                name="leader_board_rank_idx"
+            ),
+            models.Index(
+                fields=["topic", "difficulty_level", "set_type", "correct_count", "end_at"],
+                name="leader_board_topic_rank_idx"
+            ),
+            models.Index(
+                fields=["difficulty_level", "set_type", "correct_count", "end_at"],
+                name="leader_board_diff_rank_idx"
+            ),
+        ]
+
+
+class UserScoreRollup(models.Model):
+    user = models.ForeignKey(UserProfile, on_delete=models.CASCADE)
+    topic = models.ForeignKey(Topic, on_delete=models.CASCADE)
+    difficulty_level = models.CharField(max_length=10)
+    total_answers = models.PositiveIntegerField(default=0)
+    correct_answers = models.PositiveIntegerField(default=0)
+    correct_percentage = models.FloatField(default=0)
+
+    class Meta:
+        db_table = "user_score_rollup"
+        managed = True
+        unique_together = ("user", "topic", "difficulty_level")
+        indexes = [
+            models.Index(
+                fields=["topic", "difficulty_level", "-correct_percentage"],
+                name="score_rollup_top_idx"
+            ),
+        ]
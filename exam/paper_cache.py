@@ -0,0 +1,22 @@
+from django.conf import settings
+from resources import TieredCache
+
+exam_paper_cache = TieredCache(
+    prefix="exam-paper",
+    max_entries=settings.EXAM_PAPER_CACHE["MAX_ENTRIES"],
+    timeout=settings.EXAM_PAPER_CACHE["TIMEOUT"],
+)
+
+
+def exam_paper_key(topic_id, difficulty, set_type, quiz_set_id, version):
+    return f"{topic_id}:{difficulty}:{set_type}:{quiz_set_id}:v{version}"
+
+
+def quiz_set_paper_key(quiz_set):
+    return exam_paper_key(
+        quiz_set.topic_id,
+        quiz_set.difficulty_level,
+        quiz_set.set_type,
+        quiz_set.id,
+        quiz_set.version
+    )
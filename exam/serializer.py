@@ -1,4 +1,3 @@
-from django.utils import timezone
 from rest_framework import serializers, status
 from rest_framework.validators import UniqueTogetherValidator
 from resources.custom_enums import QuizSetType
@@ -7,33 +6,26 @@ from exam.models import (
     QuizAttempt,
     UserAnswers
 )
-from quiz.models import (
-    QuizSet,
-    Topic,
-    Question
-)
+from exam import grading
+from quiz.models import QuizSet
 from resources import (
     QuizExceptionHandler,
-    QuestionDifficultyType
+    QuestionDifficultyType,
+    timed_serializer
 )
 
 
+@timed_serializer
 class GetQuizSetSerializer(serializers.Serializer):
     topic = serializers.IntegerField(required=True, help_text="Topic Id expected")
     difficulty = serializers.CharField(required=True, help_text="Difficulty type expected")
     set_type = serializers.CharField(required=True, help_text="Topic set expected")
 
     def validate(self, attrs):
-        topic = attrs.get("topic")
         difficulty = attrs.get("difficulty")
         set_type = attrs.get("set_type")
 
-        if not Topic.objects.filter(id=topic).exists():
-            raise QuizExceptionHandler(
-                error_msg=f"The topic '{topic}' does not exist.",
-                error_code=status.HTTP_404_NOT_FOUND
-            )
-
+        # THE TOPIC IS CHECKED WHEN NO QUIZ SET MATCHES, SEE helper.get_quiz_set
         if difficulty not in QuestionDifficultyType.all_values():
             raise QuizExceptionHandler(
                 error_msg=f"The difficulty '{difficulty}' is not supported.",
@@ -48,10 +40,12 @@ class GetQuizSetSerializer(serializers.Serializer):
         return attrs
 
 
+@timed_serializer
 class QuizAttemptSerializer(serializers.ModelSerializer):
     class Meta:
         model = QuizAttempt
         fields = "__all__"
+        read_only_fields = ["total_answered", "correct_count", "wrong_count", "score_pct"]
         validators = [
             UniqueTogetherValidator
         ]
@@ -88,22 +82,26 @@ class QuizAttemptSerializer(serializers.ModelSerializer):
         return attrs
 
 
+@timed_serializer
 class QuizAttemptDeleteSerializer(serializers.Serializer):
     user = serializers.PrimaryKeyRelatedField(queryset=UserProfile.objects.all())
     quiz_set = serializers.PrimaryKeyRelatedField(queryset=QuizSet.objects.all())
 
 
+@timed_serializer
 class UserAnswersSerializer(serializers.ModelSerializer):
     class Meta:
         model = UserAnswers
         fields = "__all__"
 
 
+@timed_serializer
 class UserAnswerSubmissionSerializer(serializers.Serializer):
     questionId = serializers.IntegerField()
-    selectedOption = serializers.CharField()
+    selectedOption = serializers.CharField(max_length=UserAnswers._meta.get_field("submitted_ans").max_length)
 
 
+@timed_serializer
 class BulkUserAnswersSerializer(serializers.Serializer):
     user = serializers.IntegerField()
     attempt = serializers.IntegerField()
@@ -111,42 +109,24 @@ class BulkUserAnswersSerializer(serializers.Serializer):
 
     def validate(self, attrs):
         try:
-            attrs["attempt_obj"] = QuizAttempt.objects.get(id=attrs["attempt"], user_id=attrs["user"])
+            attrs["attempt_obj"] = QuizAttempt.objects.select_related(
+                "quiz_set__topic",
+                "user"
+            ).get(id=attrs["attempt"], user_id=attrs["user"])
         except QuizAttempt.DoesNotExist:
             raise serializers.ValidationError("Invalid user or attempt.")
+        if attrs["attempt_obj"].is_submitted:
+            raise serializers.ValidationError("Attempt already submitted.")
 
         return attrs
 
     def create(self, validated_data):
         attempt = validated_data["attempt_obj"]
         responses = validated_data["quiz_user_response"]
-
-        user_answers = []
-
-        # MARK QUIZ COMPLETE IN QUIZ ATTEMPT
-        QuizAttempt.objects.filter(
-            id=attempt.id,
-            user_id=attempt.user_id
-        ).update(
-            end_at=timezone.now(),
-            is_submitted=True
-        )
-
-        for response in responses:
-            question = Question.objects.get(id=response["questionId"])
-            submitted_ans = response["selectedOption"]
-
-            user_answer = UserAnswers(
-                attempt=attempt,
-                question=question,
-                submitted_ans=submitted_ans
-            )
-            user_answer.save()
-            user_answers.append(user_answer)
-
-        return user_answers
+        return grading.grade_submission(attempt, responses)
 
 
+@timed_serializer
 class QuizResultDetailSerializer(serializers.Serializer):
     topic_id = serializers.IntegerField(source='quiz_set.topic.id')
     topic_name = serializers.CharField(source='quiz_set.topic.name')
@@ -157,18 +137,9 @@ class QuizResultDetailSerializer(serializers.Serializer):
     quiz_set = serializers.IntegerField(source='quiz_set.id')
     start_at = serializers.DateTimeField()
     end_at = serializers.DateTimeField()
-    total_questions = serializers.SerializerMethodField()
-    correct_answers = serializers.SerializerMethodField()
-    wrong_answers = serializers.SerializerMethodField()
+    total_questions = serializers.IntegerField(source='total_answered')
+    correct_answers = serializers.IntegerField(source='correct_count')
+    wrong_answers = serializers.IntegerField(source='wrong_count')
 
     def get_completed_time(self, obj):
         return obj.quiz_completing_time
-
-    def get_total_questions(self, obj):
-        return UserAnswers.objects.filter(attempt=obj).count()
-
-    def get_correct_answers(self, obj):
-        return UserAnswers.objects.filter(attempt=obj, is_correct=True).count()
-
-    def get_wrong_answers(self, obj):
-        return UserAnswers.objects.filter(attempt=obj, is_correct=False).count()
@@ -0,0 +1,4 @@
+from django.dispatch import Signal
+
+# SENT BY exam.grading.grade_submission ONCE THE ATTEMPT IS STORED AS SUBMITTED
+attempt_submitted = Signal()
@@ -1,3 +1,854 @@
-from django.test import TestCase
+import json
+import os
+import threading
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.core.management.base import CommandError
+from django.test import LiveServerTestCase, TestCase, override_settings, tag
+from django.test.utils import CaptureQueriesContext
+from types import SimpleNamespace
+from unittest import mock, skipUnless
+from exam.models import LeaderBoardEntry, QuizAttempt, UserAnswers, UserScoreRollup
+from exam import grading, helper
+from exam.paper_cache import exam_paper_cache
+from exam.serializer import BulkUserAnswersSerializer
+from quiz import helper as quiz_helper
+from quiz import dashboard
+from quiz.models import DashboardCounter, Topic, Question, QuizSet
+from resources import QuizExceptionHandler, TieredCache, UserType
+from resources.query_budget import get_budget
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.backends import TokenBackend
+from users.helper import get_tokens_for_user
+from users.models import UserProfile
+from users.password_pool import PasswordCheckPool
 
-# Create your tests here.
+
+def benchmark(test_class):
+    # SLOW, KEPT OUT OF THE DEFAULT RUN: RUN_BENCHMARKS=1 python manage.py test --tag=benchmark
+    return tag("benchmark")(
+        skipUnless(os.environ.get("RUN_BENCHMARKS"), "set RUN_BENCHMARKS=1 to run the benchmarks")(test_class)
+    )
+
+
+def create_user(username, role=UserType.STUDENT.value):
+    return UserProfile.objects.create(
+        username=username,
+        email=f"{username}@example.com",
+        first_name=username.title(),
+        last_name="Test",
+        role=role
+    )
+
+
+def create_quiz_set(teacher, topic, questions_count, set_type="A", difficulty="Easy"):
+    questions = Question.objects.bulk_create([
+        Question(
+            question_text=f"{topic.name} question {index}",
+            option_a="a",
+            option_b="b",
+            option_c="c",
+            option_d="d",
+            correct_option="ABCD"[index % 4],
+            topic=topic,
+            difficulty_level=difficulty,
+            user=teacher
+        )
+        for index in range(questions_count)
+    ])
+    quiz_set = QuizSet.objects.create(
+        topic=topic,
+        set_type=set_type,
+        difficulty_level=difficulty,
+        user=teacher
+    )
+    quiz_set.questions.add(*questions)
+    return quiz_set, questions
+
+
+def wrong_option(question):
+    return "ABCD"[("ABCD".index(question.correct_option) + 1) % 4]
+
+
+def submission_payload(attempt, questions, wrong=0):
+    return {
+        "user": attempt.user_id,
+        "attempt": attempt.id,
+        "quiz_user_response": [
+            {
+                "questionId": question.id,
+                "selectedOption": wrong_option(question) if index < wrong else question.correct_option
+            }
+            for index, question in enumerate(questions)
+        ]
+    }
+
+
+class GradeSubmissionTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = create_user("teacher", UserType.TEACHER.value)
+        cls.student = create_user("student")
+        cls.topic = Topic.objects.create(name="Python")
+
+    def submit(self, attempt, questions, wrong=0):
+        _serializer = BulkUserAnswersSerializer(data=submission_payload(attempt, questions, wrong))
+        self.assertTrue(_serializer.is_valid(), _serializer.errors)
+        return _serializer.save()
+
+    def test_grades_submission_and_marks_attempt_submitted(self):
+        quiz_set, questions = create_quiz_set(self.teacher, self.topic, 10)
+        attempt = QuizAttempt.objects.create(user=self.student, quiz_set=quiz_set)
+
+        self.submit(attempt, questions, wrong=3)
+
+        attempt.refresh_from_db()
+        self.assertTrue(attempt.is_submitted)
+        self.assertIsNotNone(attempt.end_at)
+        self.assertEqual(UserAnswers.objects.filter(attempt=attempt).count(), 10)
+        self.assertEqual(UserAnswers.objects.filter(attempt=attempt, is_correct=True).count(), 7)
+        self.assertEqual(
+            (attempt.total_answered, attempt.correct_count, attempt.wrong_count, attempt.score_pct),
+            (10, 7, 3, 70)
+        )
+
+    def test_rejects_questions_outside_the_quiz_set(self):
+        quiz_set, questions = create_quiz_set(self.teacher, self.topic, 5)
+        _, other_questions = create_quiz_set(self.teacher, self.topic, 1, set_type="B")
+        attempt = QuizAttempt.objects.create(user=self.student, quiz_set=quiz_set)
+
+        with self.assertRaises(QuizExceptionHandler):
+            self.submit(attempt, questions + other_questions)
+
+        attempt.refresh_from_db()
+        self.assertFalse(attempt.is_submitted)
+        self.assertFalse(UserAnswers.objects.filter(attempt=attempt).exists())
+
+    def test_rejects_a_second_submission(self):
+        quiz_set, questions = create_quiz_set(self.teacher, self.topic, 4)
+        attempt = QuizAttempt.objects.create(user=self.student, quiz_set=quiz_set)
+        self.submit(attempt, questions[:2])
+
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens_for_user(self.student)['access']}")
+        response = client.post("/api/exam/attempt/submit", submission_payload(attempt, questions[2:]), format="json")
+        self.assertEqual(response.status_code, 406)
+        self.assertEqual(UserAnswers.objects.filter(attempt=attempt).count(), 2)
+        self.assertEqual(LeaderBoardEntry.objects.filter(attempt=attempt).count(), 1)
+
+        # A SUBMISSION THAT PASSED VALIDATION BEFORE THE FIRST ONE COMMITTED
+        with self.assertRaises(QuizExceptionHandler):
+            grading.grade_submission(attempt, submission_payload(attempt, questions[2:])["quiz_user_response"])
+        self.assertEqual(UserAnswers.objects.filter(attempt=attempt).count(), 2)
+
+    def test_failed_write_leaves_the_attempt_open(self):
+        quiz_set, questions = create_quiz_set(self.teacher, self.topic, 3)
+        attempt = QuizAttempt.objects.create(user=self.student, quiz_set=quiz_set)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens_for_user(self.student)['access']}")
+
+        with mock.patch("exam.grading.add_to_score_rollup", side_effect=RuntimeError("rollup failed")):
+            response = client.post("/api/exam/attempt/submit", submission_payload(attempt, questions), format="json")
+        self.assertEqual(response.status_code, 500)
+        attempt.refresh_from_db()
+        self.assertFalse(attempt.is_submitted)
+        self.assertFalse(UserAnswers.objects.filter(attempt=attempt).exists())
+        self.assertFalse(LeaderBoardEntry.objects.filter(attempt=attempt).exists())
+
+        response = client.post("/api/exam/attempt/submit", submission_payload(attempt, questions), format="json")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(UserAnswers.objects.filter(attempt=attempt).count(), 3)
+
+    def test_rejects_options_longer_than_the_column(self):
+        quiz_set, questions = create_quiz_set(self.teacher, self.topic, 2)
+        attempt = QuizAttempt.objects.create(user=self.student, quiz_set=quiz_set)
+        payload = submission_payload(attempt, questions)
+        payload["quiz_user_response"][0]["selectedOption"] = "A" * 6
+
+        _serializer = BulkUserAnswersSerializer(data=payload)
+        self.assertFalse(_serializer.is_valid())
+        self.assertIn("quiz_user_response", _serializer.errors)
+
+    def test_rejects_duplicate_answers(self):
+        quiz_set, questions = create_quiz_set(self.teacher, self.topic, 5)
+        attempt = QuizAttempt.objects.create(user=self.student, quiz_set=quiz_set)
+
+        with self.assertRaises(QuizExceptionHandler):
+            self.submit(attempt, questions + questions[:1])
+
+    def test_query_count_does_not_depend_on_paper_size(self):
+        query_counts = []
+        for index, questions_count in enumerate([5, 50, 150]):
+            quiz_set, questions = create_quiz_set(
+                self.teacher, self.topic, questions_count, set_type="ABC"[index]
+            )
+            student = create_user(f"student-{questions_count}")
+            attempt = QuizAttempt.objects.create(user=student, quiz_set=quiz_set)
+            with CaptureQueriesContext(connection) as context:
+                self.submit(attempt, questions)
+            query_counts.append(len(context.captured_queries))
+
+        self.assertEqual(len(set(query_counts)), 1, query_counts)
+
+
+class AttemptScoreColumnsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = create_user("teacher", UserType.TEACHER.value)
+        cls.student = create_user("student")
+        cls.topic = Topic.objects.create(name="Python")
+        cls.attempts = []
+        for set_type in "ABC":
+            quiz_set, questions = create_quiz_set(cls.teacher, cls.topic, 4, set_type=set_type)
+            attempt = QuizAttempt.objects.create(user=cls.student, quiz_set=quiz_set)
+            _serializer = BulkUserAnswersSerializer(data=submission_payload(attempt, questions[:3], wrong=1))
+            _serializer.is_valid(raise_exception=True)
+            _serializer.save()
+            cls.attempts.append(attempt)
+
+    def test_student_result_history_is_a_single_query(self):
+        with self.assertNumQueries(1):
+            results = helper.get_quiz_result(self.student.id, UserType.STUDENT.value)
+        self.assertEqual(len(results), 3)
+        self.assertEqual(
+            (results[0]["total_questions"], results[0]["correct_answers"], results[0]["wrong_answers"]),
+            (3, 2, 1)
+        )
+
+    def test_attempt_result_report_reads_stored_scores(self):
+        report = helper.get_quiz_attempt_result_report(self.student.id, self.attempts[0].id)
+        self.assertEqual(report, {
+            "totalQuestions": 4,
+            "correctAnswers": 2,
+            "incorrectAnswers": 1,
+            "percentage": 50,
+        })
+
+    def test_backfill_recomputes_scores_from_answers(self):
+        QuizAttempt.objects.update(total_answered=0, correct_count=0, wrong_count=0, score_pct=0)
+
+        call_command("backfill_attempt_scores", chunk_size=2, stdout=StringIO())
+
+        self.assertEqual(
+            list(QuizAttempt.objects.values_list("total_answered", "correct_count", "wrong_count", "score_pct")),
+            [(3, 2, 1, 50)] * 3
+        )
+
+
+def seed_teacher_results(teacher, sets_count, students_count, questions_count=4):
+    topics = Topic.objects.bulk_create([
+        Topic(name=f"{teacher.username} topic {index}") for index in range(sets_count)
+    ])
+    students = UserProfile.objects.bulk_create([
+        UserProfile(
+            username=f"{teacher.username}-student-{index}",
+            email=f"{teacher.username}-student-{index}@example.com",
+            role=UserType.STUDENT.value
+        )
+        for index in range(students_count)
+    ])
+    quiz_sets = [
+        create_quiz_set(teacher, topic, questions_count)[0]
+        for topic in topics
+    ]
+    QuizAttempt.objects.bulk_create([
+        QuizAttempt(
+            user=student,
+            quiz_set=quiz_set,
+            is_submitted=True,
+            total_answered=questions_count,
+            correct_count=questions_count if student_index % 3 == 0 else questions_count - 1,
+            wrong_count=0 if student_index % 3 == 0 else 1
+        )
+        for quiz_set in quiz_sets
+        for student_index, student in enumerate(students)
+    ], batch_size=2000)
+    return quiz_sets
+
+
+class TeacherResultReportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = create_user("teacher", UserType.TEACHER.value)
+
+    def test_report_shape_and_counts(self):
+        quiz_set = seed_teacher_results(self.teacher, sets_count=1, students_count=6)[0]
+        QuizAttempt.objects.create(user=self.teacher, quiz_set=quiz_set, is_submitted=True, correct_count=4)
+        empty_set, _ = create_quiz_set(self.teacher, quiz_set.topic, 2, set_type="B")
+
+        results = helper.get_quiz_result(self.teacher.id, UserType.TEACHER.value)
+
+        self.assertEqual(results, [
+            {
+                "quiz_set_id": quiz_set.id,
+                "topic_name": quiz_set.topic.name,
+                "difficulty_level": quiz_set.difficulty_level,
+                "set_type": quiz_set.set_type,
+                "student_attempts": 6,
+                "all_correct_students": 2,
+                "not_all_correct_students": 4,
+            },
+            {
+                "quiz_set_id": empty_set.id,
+                "topic_name": quiz_set.topic.name,
+                "difficulty_level": empty_set.difficulty_level,
+                "set_type": empty_set.set_type,
+                "student_attempts": 0,
+                "all_correct_students": 0,
+                "not_all_correct_students": 0,
+            },
+        ])
+
+    def test_set_without_questions_has_no_all_correct_students(self):
+        topic = Topic.objects.create(name="Python")
+        quiz_set, _ = create_quiz_set(self.teacher, topic, 0)
+        QuizAttempt.objects.create(user=create_user("student"), quiz_set=quiz_set, is_submitted=True)
+
+        result = helper.get_quiz_result(self.teacher.id, UserType.TEACHER.value)[0]
+
+        self.assertEqual(
+            (result["student_attempts"], result["all_correct_students"], result["not_all_correct_students"]),
+            (1, 0, 1)
+        )
+
+    def test_query_count_does_not_depend_on_sets_or_attempts(self):
+        seed_teacher_results(self.teacher, sets_count=2, students_count=3)
+        with self.assertNumQueries(1):
+            helper.get_quiz_result(self.teacher.id, UserType.TEACHER.value)
+
+        seed_teacher_results(create_user("teacher-2", UserType.TEACHER.value), sets_count=20, students_count=30)
+        with self.assertNumQueries(1):
+            helper.get_quiz_result(self.teacher.id, UserType.TEACHER.value)
+
+
+@benchmark
+class TeacherResultReportBenchmark(TestCase):
+    def test_100_sets_by_500_attempts(self):
+        teacher = create_user("teacher", UserType.TEACHER.value)
+        seed_teacher_results(teacher, sets_count=100, students_count=500)
+
+        with CaptureQueriesContext(connection) as context:
+            results = helper.get_quiz_result(teacher.id, UserType.TEACHER.value)
+
+        self.assertEqual(len(results), 100)
+        self.assertEqual(sum(item["student_attempts"] for item in results), 50000)
+        self.assertEqual(len(context.captured_queries), 1)
+
+
+class ExamPaperCacheTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = create_user("teacher", UserType.TEACHER.value)
+        cls.topic = Topic.objects.create(name="Python")
+        cls.quiz_set, cls.questions = create_quiz_set(cls.teacher, cls.topic, 3)
+
+    def setUp(self):
+        cache.clear()
+        exam_paper_cache.clear()
+
+    def get_paper(self):
+        return helper.get_quiz_set(self.topic.id, "Easy", "A")
+
+    def test_cached_paper_costs_one_lookup_query(self):
+        paper = self.get_paper()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.get_paper(), paper)
+
+    def test_unknown_topic_and_missing_set(self):
+        with self.assertRaisesMessage(QuizExceptionHandler, "does not exist"):
+            helper.get_quiz_set(0, "Easy", "A")
+        with self.assertRaisesMessage(QuizExceptionHandler, "No quiz set"):
+            helper.get_quiz_set(self.topic.id, "Hard", "A")
+
+    def test_update_quiz_set_invalidates_paper(self):
+        self.get_paper()
+        quiz_helper.update_quiz_set(self.quiz_set.id, {"questions": [self.questions[0].id]})
+        self.assertEqual(self.get_paper()["questions_count"], 1)
+
+    def test_question_edit_and_delete_invalidate_paper(self):
+        self.get_paper()
+        self.questions[0].question_text = "Edited"
+        self.questions[0].save()
+        self.assertEqual(self.get_paper()["questions"][0]["question_text"], "Edited")
+
+        quiz_helper.delete_question(self.questions[1].id)
+        self.assertEqual(self.get_paper()["questions_count"], 2)
+
+    def test_delete_quiz_set_evicts_paper(self):
+        self.get_paper()
+        quiz_helper.delete_quiz_set(self.quiz_set.id)
+        with self.assertRaises(QuizExceptionHandler):
+            self.get_paper()
+
+
+class TieredCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_concurrent_misses_build_once(self):
+        tiered_cache = TieredCache(prefix="test-stampede")
+        builds = []
+        start = threading.Barrier(50)
+
+        def builder():
+            builds.append(1)
+            threading.Event().wait(0.05)
+            return {"paper": True}
+
+        def open_paper():
+            start.wait()
+            self.assertEqual(tiered_cache.get_or_set("paper", builder), {"paper": True})
+
+        threads = [threading.Thread(target=open_paper) for _ in range(50)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(builds), 1)
+
+    def test_shared_tier_serves_other_processes(self):
+        first_process = TieredCache(prefix="test-shared")
+        second_process = TieredCache(prefix="test-shared")
+        first_process.get_or_set("paper", lambda: "built")
+        self.assertEqual(second_process.get_or_set("paper", lambda: "rebuilt"), "built")
+
+    def test_local_tier_is_bounded(self):
+        tiered_cache = TieredCache(prefix="test-lru", max_entries=2)
+        for key in ["a", "b", "c"]:
+            tiered_cache.get_or_set(key, lambda: key)
+        self.assertEqual(list(tiered_cache._local), ["test-lru:b", "test-lru:c"])
+
+
+class LeaderBoardTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = create_user("teacher", UserType.TEACHER.value)
+        cls.python = Topic.objects.create(name="Python")
+        cls.django = Topic.objects.create(name="Django")
+        cls.python_set, cls.python_questions = create_quiz_set(cls.teacher, cls.python, 4)
+        cls.django_set, cls.django_questions = create_quiz_set(cls.teacher, cls.django, 4, difficulty="Hard")
+        for index, wrong in enumerate([0, 2, 1]):
+            student = create_user(f"student-{index}")
+            for quiz_set, questions in [(cls.python_set, cls.python_questions), (cls.django_set, cls.django_questions)]:
+                attempt = QuizAttempt.objects.create(user=student, quiz_set=quiz_set)
+                _serializer = BulkUserAnswersSerializer(data=submission_payload(attempt, questions, wrong))
+                _serializer.is_valid(raise_exception=True)
+                _serializer.save()
+
+    def test_entries_are_written_on_submission(self):
+        rows = helper.get_leader_board_result(self.python.id, False, 50, 0)
+        self.assertEqual(
+            [(row["studentName"], row["correctCount"], row["percentage"]) for row in rows],
+            [("Student-1 Test", 2, "50%"), ("Student-2 Test", 3, "75%"), ("Student-0 Test", 4, "100%")]
+        )
+        self.assertEqual(rows[0], {
+            "topicName": "Python",
+            "difficultyLevel": "Easy",
+            "setType": "A",
+            "studentName": "Student-1 Test",
+            "totalQuestions": 4,
+            "correctCount": 2,
+            "wrongCount": 2,
+            "percentage": "50%",
+        })
+
+    def test_renames_show_up_on_the_board(self):
+        self.python.name = "Python3"
+        self.python.save()
+        UserProfile.objects.filter(username="student-1").update(first_name="Renamed")
+        rows = helper.get_leader_board_result(self.python.id, False, 50, 0)
+        self.assertEqual({row["topicName"] for row in rows}, {"Python3"})
+        self.assertEqual(rows[0]["studentName"], "Renamed Test")
+
+    def test_filters_limit_and_offset_in_one_query(self):
+        with self.assertNumQueries(1):
+            rows = helper.get_leader_board_result(False, "Hard", 2, 1)
+        self.assertEqual([row["topicName"] for row in rows], ["Django", "Django"])
+        self.assertEqual([row["correctCount"] for row in rows], [3, 4])
+        self.assertEqual(len(helper.get_leader_board_result(False, False, 50, 0)), 6)
+
+    def test_limit_is_capped_and_validated(self):
+        self.assertEqual(helper.get_limit_offset({"limit": "100000", "offset": "5"}), (500, 5))
+        with self.assertRaises(QuizExceptionHandler):
+            helper.get_limit_offset({"limit": "-1"})
+
+    def test_rebuild_matches_incremental_rows(self):
+        before = helper.get_leader_board_result(False, False, 50, 0)
+        call_command("rebuild_leader_board", chunk_size=4, stdout=StringIO())
+        self.assertEqual(helper.get_leader_board_result(False, False, 50, 0), before)
+
+
+class LeaderBoardTopTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = create_user("teacher", UserType.TEACHER.value)
+        cls.python = Topic.objects.create(name="Python")
+        cls.django = Topic.objects.create(name="Django")
+        cls.papers = [
+            create_quiz_set(cls.teacher, cls.python, 4),
+            create_quiz_set(cls.teacher, cls.python, 4, difficulty="Hard"),
+            create_quiz_set(cls.teacher, cls.django, 4),
+        ]
+        cls.students = [create_user(f"student-{index}") for index in range(4)]
+        # WRONG ANSWERS PER STUDENT FOR EACH PAPER
+        for student, wrongs in zip(cls.students, [(0, 4, 4), (1, 0, 0), (2, 2, 1), (4, 4, 0)]):
+            for (quiz_set, questions), wrong in zip(cls.papers, wrongs):
+                attempt = QuizAttempt.objects.create(user=student, quiz_set=quiz_set)
+                _serializer = BulkUserAnswersSerializer(data=submission_payload(attempt, questions, wrong))
+                _serializer.is_valid(raise_exception=True)
+                _serializer.save()
+
+    def ranking(self, topic=None, difficulty=None):
+        return [
+            (row["username"], row["percentage"])
+            for row in helper.get_leader_board_top_result(topic, difficulty)
+        ]
+
+    def test_top_for_one_topic_and_difficulty(self):
+        with self.assertNumQueries(2):
+            ranking = self.ranking(self.python.id, "Easy")
+        self.assertEqual(ranking, [("student-0", 100), ("student-1", 75), ("student-2", 50)])
+
+    def test_totals_sum_across_dimensions(self):
+        self.assertEqual(self.ranking(), [("student-1", 91), ("student-2", 58), ("student-0", 33)])
+        self.assertEqual(self.ranking(topic=self.python.id), [("student-1", 87), ("student-0", 50), ("student-2", 50)])
+        self.assertEqual(self.ranking(difficulty="Easy"), [("student-1", 87), ("student-2", 62), ("student-0", 50)])
+
+    def test_deleting_an_attempt_updates_the_rollup(self):
+        quiz_set = self.papers[0][0]
+        helper.delete_user_quiz_attempt(self.students[0], quiz_set)
+        self.assertEqual(self.ranking(self.python.id, "Easy"), [("student-1", 75), ("student-2", 50), ("student-3", 0)])
+
+    def test_cascaded_deletes_update_the_rollups(self):
+        def rollups():
+            return sorted(UserScoreRollup.objects.values_list(
+                "user_id", "topic_id", "difficulty_level", "total_answers", "correct_answers", "correct_percentage"
+            ))
+
+        for delete in [
+            lambda: self.papers[1][0].delete(),
+            lambda: self.papers[0][1][0].delete(),
+            lambda: Question.objects.filter(id__in=[question.id for question in self.papers[0][1][1:3]]).delete(),
+            lambda: self.django.delete(),
+        ]:
+            delete()
+            incremental = rollups()
+            call_command("rebuild_score_rollups", stdout=StringIO())
+            self.assertEqual(incremental, rollups())
+        self.assertEqual(self.ranking(self.python.id, "Hard"), [])
+        self.assertEqual(self.ranking(), [("student-0", 100), ("student-1", 100), ("student-2", 100)])
+
+    def test_rebuild_matches_incremental_rollups(self):
+        before = self.ranking()
+        call_command("rebuild_score_rollups", batch_size=2, stdout=StringIO())
+        self.assertEqual(self.ranking(), before)
+        self.assertEqual(self.ranking(self.python.id, "Easy"), [("student-0", 100), ("student-1", 75), ("student-2", 50)])
+
+
+class StreamingExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = create_user("teacher", UserType.TEACHER.value)
+        cls.topic = Topic.objects.create(name="Python")
+        quiz_set, questions = create_quiz_set(cls.teacher, cls.topic, 5)
+        for index in range(3):
+            attempt = QuizAttempt.objects.create(user=create_user(f"student-{index}"), quiz_set=quiz_set)
+            _serializer = BulkUserAnswersSerializer(data=submission_payload(attempt, questions))
+            _serializer.is_valid(raise_exception=True)
+            _serializer.save()
+
+    def client_for(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens_for_user(user)['access']}")
+        return client
+
+    def test_streams_the_full_answer_table_in_the_envelope(self):
+        with self.settings(KEYSET_PAGINATION={"PAGE_SIZE": 2, "MAX_PAGE_SIZE": 2, "STREAM_CHUNK_SIZE": 4}):
+            response = self.client_for(self.teacher).get("/api/exam/attempt/submit", {"stream": "true"})
+            with CaptureQueriesContext(connection) as context:
+                body = json.loads(b"".join(response.streaming_content))
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(len(body["data"]), 15)
+        self.assertEqual(
+            [row["id"] for row in body["data"]],
+            list(UserAnswers.objects.order_by("id").values_list("id", flat=True))
+        )
+        self.assertEqual((body["status_code"], body["message"]), (200, ""))
+        self.assertIn("time_stamp", body)
+        # ONE QUERY PER CHUNK OF 4 ROWS
+        self.assertEqual(len(context.captured_queries), 4)
+
+    def test_students_can_not_export(self):
+        response = self.client_for(create_user("student")).get("/api/exam/attempt/", {"stream": "true"})
+        self.assertEqual(response.status_code, 403)
+
+
+class ClaimsAuthenticationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = create_user("student")
+        cls.token = get_tokens_for_user(cls.student)["access"]
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {self.token}")
+
+    def test_token_is_decoded_once_without_loading_the_user(self):
+        with mock.patch.object(
+            TokenBackend, "decode", autospec=True, side_effect=TokenBackend.decode
+        ) as decode, CaptureQueriesContext(connection) as context:
+            response = self.client.get("/api/exam/result")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(decode.call_count, 1)
+        self.assertFalse([
+            query for query in context.captured_queries
+            if UserProfile._meta.db_table in query["sql"]
+        ])
+
+    def test_request_user_is_built_from_the_claims(self):
+        request = self.client.get("/api/exam/result").wsgi_request
+        self.assertEqual(request.token_claims["user_id"], str(self.student.id))
+        self.assertEqual(request.user.role, UserType.STUDENT.value)
+        self.assertEqual(request.user.first_name, "Student")
+
+    def test_invalid_token_is_rejected(self):
+        self.client.credentials(HTTP_AUTHORIZATION="Bearer not-a-token")
+        self.assertEqual(self.client.get("/api/exam/result").status_code, 401)
+
+
+ROUTE_FIXTURE_SIZES = {"small": 2, "large": 12}
+
+
+def seed_route_fixture(size):
+    """
+    A teacher with two topics of two quiz sets each, size questions per set
+    and size students who submitted every set. Each route must run the same
+    number of queries on the small and the large fixture.
+    """
+    admin = create_user("admin", UserType.ADMIN.value)
+    teacher = create_user("teacher", UserType.TEACHER.value)
+    students = [create_user(f"student-{index}") for index in range(size)]
+    topics = [Topic.objects.create(name=name) for name in ["Python", "Django"]]
+    quiz_sets = []
+    for topic in topics:
+        for set_type in ["A", "B"]:
+            quiz_set, questions = create_quiz_set(teacher, topic, size, set_type=set_type)
+            quiz_set.is_active = True
+            quiz_set.save()
+            quiz_sets.append((quiz_set, questions))
+
+    attempts = []
+    for student_index, student in enumerate(students):
+        for quiz_set, questions in quiz_sets:
+            attempt = QuizAttempt.objects.create(user=student, quiz_set=quiz_set)
+            _serializer = BulkUserAnswersSerializer(
+                data=submission_payload(attempt, questions, wrong=student_index % 3)
+            )
+            _serializer.is_valid(raise_exception=True)
+            _serializer.save()
+            attempts.append(attempt)
+
+    # A SET WITHOUT ATTEMPTS FOR THE START AND SUBMIT ROUTES
+    open_set, open_questions = create_quiz_set(teacher, topics[0], size, set_type="C")
+    return SimpleNamespace(
+        size=size,
+        admin=admin,
+        teacher=teacher,
+        students=students,
+        topics=topics,
+        quiz_sets=[quiz_set for quiz_set, _ in quiz_sets],
+        set_questions=[questions for _, questions in quiz_sets],
+        attempts=attempts,
+        open_set=open_set,
+        open_questions=open_questions
+    )
+
+
+class RouteQueryCountMixin:
+    """
+    Mixed into one TestCase per fixture size, see ROUTE_FIXTURE_SIZES. The
+    expected counts are the same for both sizes, so a route whose queries
+    grow with the data fails on the large fixture.
+    """
+    fixture_size = None
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.fixture = seed_route_fixture(ROUTE_FIXTURE_SIZES[cls.fixture_size])
+
+    def client_for(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens_for_user(user)['access']}")
+        return client
+
+    def assert_route_queries(self, expected, method, url, user=None, data=None, format="json", status_code=200):
+        client = self.client_for(user) if user else APIClient()
+        with CaptureQueriesContext(connection) as context:
+            response = getattr(client, method)(url, data, format=format)
+            # A STREAMED BODY RUNS ITS QUERIES WHILE IT IS CONSUMED
+            if response.streaming:
+                b"".join(response.streaming_content)
+        self.assertEqual(response.status_code, status_code, getattr(response, "data", None))
+        self.assertEqual(
+            len(context.captured_queries),
+            expected,
+            f"{method.upper()} {url}:\n" + "\n".join(query["sql"][:200] for query in context.captured_queries)
+        )
+        # settings.QUERY_BUDGET MUST COVER EVERY COUNT PINNED HERE, STREAMED BODIES ARE NOT BUDGETED
+        budget = get_budget(method.upper(), response.resolver_match.view_name)
+        if budget is not None and not response.streaming:
+            self.assertLessEqual(expected, budget, f"{method.upper()} {url} is over its QUERY_BUDGET")
+        return response
+
+
+class ExamRouteQueries(RouteQueryCountMixin):
+    def test_get_quiz_set(self):
+        quiz_set = self.fixture.quiz_sets[0]
+        payload = {"topic": quiz_set.topic_id, "difficulty": "Easy", "set_type": "A"}
+        exam_paper_cache.clear()
+        cache.clear()
+        self.assert_route_queries(3, "post", "/api/exam/quiz-set", self.fixture.students[0], payload)
+        self.assert_route_queries(1, "post", "/api/exam/quiz-set", self.fixture.students[0], payload)
+
+    def test_attempt_routes(self):
+        student = self.fixture.students[0]
+        self.assert_route_queries(1, "get", "/api/exam/attempt/", student)
+        self.assert_route_queries(
+            1, "get", f"/api/exam/attempt/?user={student.id}&quiz_set={self.fixture.quiz_sets[0].id}", student
+        )
+        self.assert_route_queries(1, "get", "/api/exam/attempt/?stream=true", self.fixture.teacher)
+        self.assert_route_queries(7, "post", "/api/exam/attempt/", student, {
+            "user": student.id,
+            "quiz_set": self.fixture.open_set.id,
+            "start_at": "Mon, 01 Jan 2024 10:00:00 GMT",
+        })
+        self.assert_route_queries(12, "delete", "/api/exam/attempt/", student, {
+            "user": student.id,
+            "quiz_set": self.fixture.quiz_sets[0].id,
+        })
+
+    def test_submit_routes(self):
+        student = self.fixture.students[0]
+        attempt = QuizAttempt.objects.create(user=student, quiz_set=self.fixture.open_set)
+        self.assert_route_queries(
+            12, "post", "/api/exam/attempt/submit", student,
+            submission_payload(attempt, self.fixture.open_questions, wrong=1)
+        )
+        # FIRST SUBMISSION: THE ROLLUP ROW IS INSERTED IN A SAVEPOINT, THE STUDENT IS COUNTED AS PARTICIPATED
+        newcomer = create_user("newcomer")
+        attempt = QuizAttempt.objects.create(user=newcomer, quiz_set=self.fixture.open_set)
+        self.assert_route_queries(
+            17, "post", "/api/exam/attempt/submit", newcomer,
+            submission_payload(attempt, self.fixture.open_questions, wrong=1)
+        )
+        self.assert_route_queries(1, "get", "/api/exam/attempt/submit", student)
+        self.assert_route_queries(1, "get", "/api/exam/attempt/submit?stream=true", self.fixture.teacher)
+
+    def test_result_routes(self):
+        student = self.fixture.students[0]
+        self.assert_route_queries(1, "get", f"/api/exam/attempt/result?attempt={self.fixture.attempts[0].id}", student)
+        self.assert_route_queries(1, "get", "/api/exam/result", student)
+        self.assert_route_queries(1, "get", "/api/exam/result", self.fixture.teacher)
+
+    def test_leader_board_routes(self):
+        topic = self.fixture.topics[0].id
+        student = self.fixture.students[0]
+        self.assert_route_queries(1, "get", f"/api/exam/leaderboard/result?topic={topic}&difficulty=Easy", student)
+        self.assert_route_queries(2, "get", "/api/exam/leaderboard/top", student)
+        self.assert_route_queries(2, "get", f"/api/exam/leaderboard/top?topic={topic}&difficulty=Easy", student)
+
+
+class SmallExamRouteQueryTests(ExamRouteQueries, TestCase):
+    fixture_size = "small"
+
+
+class LargeExamRouteQueryTests(ExamRouteQueries, TestCase):
+    fixture_size = "large"
+
+
+FAST_HASHER = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+
+def seed_exam_data(prefix, **options):
+    defaults = {
+        "teachers": 2,
+        "students": 5,
+        "topics": 2,
+        "bank_size": 6,
+        "questions_per_set": 4,
+        "set_types": 2,
+        "attempts_per_student": 3,
+        "seed": 7,
+    }
+    call_command("seed_exam_data", prefix=prefix, stdout=StringIO(), **{**defaults, **options})
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHER)
+class SeedExamDataTests(TestCase):
+    def test_data_set_and_derived_tables(self):
+        seed_exam_data("a-")
+
+        # 2 TOPICS x 3 DIFFICULTIES x 2 SET TYPES
+        self.assertEqual(QuizSet.objects.filter(question_count=4).count(), 12)
+        self.assertEqual(QuizAttempt.objects.filter(is_submitted=True).count(), 15)
+        self.assertEqual(UserAnswers.objects.count(), 60)
+        self.assertEqual(LeaderBoardEntry.objects.count(), 15)
+        for attempt in QuizAttempt.objects.all():
+            correct = UserAnswers.objects.filter(attempt=attempt, is_correct=True).count()
+            self.assertEqual((attempt.total_answered, attempt.correct_count), (4, correct))
+        self.assertEqual(DashboardCounter.objects.get(key=dashboard.GLOBAL_KEY).students_participated, 5)
+
+    def test_same_seed_same_data(self):
+        seed_exam_data("a-")
+        seed_exam_data("b-")
+
+        def answers(prefix):
+            return list(
+                UserAnswers.objects.filter(
+                    attempt__user__username__startswith=prefix
+                ).order_by("id").values_list(
+                    "question__question_text",
+                    "question__correct_option",
+                    "submitted_ans"
+                )
+            )
+        self.assertEqual(answers("a-"), answers("b-"))
+
+        with self.assertRaises(CommandError):
+            seed_exam_data("a-")
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHER)
+class LoadtestExamTests(LiveServerTestCase):
+    def test_every_session_completes(self):
+        # IDS ARE REUSED AFTER THE FLUSH, A PAPER CACHED BY AN EARLIER TEST WOULD BE SERVED
+        exam_paper_cache.clear()
+        cache.clear()
+        seed_exam_data("load-", students=3, attempts_per_student=1)
+        patcher = mock.patch(
+            "users.helper.get_password_pool",
+            return_value=PasswordCheckPool(workers=0, max_pending=0, timeout=30)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        out = StringIO()
+        # THE IN-MEMORY TEST DATABASE IS SHARED WITH THE SERVER THREAD, ONE SESSION AT A TIME
+        call_command(
+            "loadtest_exam",
+            base_url=self.live_server_url,
+            prefix="load-",
+            sessions=3,
+            concurrency=1,
+            stdout=out
+        )
+
+        self.assertIn("3 sessions (3 completed), 24 requests", out.getvalue())
+        self.assertEqual(QuizAttempt.objects.filter(is_submitted=True).count(), 6)
+        errors = [line.split()[-5] for line in out.getvalue().splitlines()[2:]]
+        self.assertEqual(errors, ["0"] * 8)
@@ -7,6 +7,12 @@ from exam.serializer import BulkUserAnswersSerializer
 from resources import decode_access_token
 from resources import (
     response_builder,
+    timed_view,
+    stream_response_builder,
+    paginate_by_id,
+    iterate_by_id,
+    check_export_role,
+    is_stream_request,
     QuizExceptionHandler
 )
 from exam import (
@@ -18,6 +24,7 @@ from exam import (
 
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
+@timed_view
 def get_quiz_set(request):
     try:
         validated_data = serializer.GetQuizSetSerializer(data=request.data)
@@ -45,6 +52,7 @@ def get_quiz_set(request):
         )
 
 
+@timed_view
 class QuizAttemptViewSet(APIView):
     permission_classes = [IsAuthenticated]
     def get(self, request, *args, **kwargs):
@@ -57,11 +65,18 @@ class QuizAttemptViewSet(APIView):
                     user=user,
                     quiz_set__id=quiz_set
                 ).values().first()
-            else:
-                data = models.QuizAttempt.objects.all().values()
+                return response_builder(
+                    result=data,
+                    status_code=status.HTTP_200_OK,
+                )
+            if is_stream_request(request):
+                check_export_role(request)
+                return stream_response_builder(iterate_by_id(models.QuizAttempt.objects.values()))
+            page = paginate_by_id(models.QuizAttempt.objects.values(), request)
             return response_builder(
-                result=data,
+                result=page.items,
                 status_code=status.HTTP_200_OK,
+                page=page
             )
         except QuizExceptionHandler as e:
             return response_builder(
@@ -129,15 +144,20 @@ class QuizAttemptViewSet(APIView):
             )
 
 
+@timed_view
 class QuizResponseViewSet(APIView):
     permission_classes = [IsAuthenticated]
     def get(self, request):
         try:
-            data = models.UserAnswers.objects.all().values()
+            if is_stream_request(request):
+                check_export_role(request)
+                return stream_response_builder(iterate_by_id(models.UserAnswers.objects.values()))
+            page = paginate_by_id(models.UserAnswers.objects.values(), request)
 
             return response_builder(
-                result=data,
-                status_code=status.HTTP_200_OK
+                result=page.items,
+                status_code=status.HTTP_200_OK,
+                page=page
             )
         except QuizExceptionHandler as e:
             return response_builder(
@@ -174,6 +194,7 @@ class QuizResponseViewSet(APIView):
                 result=str(e),
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+@timed_view
 class QuizAttemptResultView(APIView):
     permission_classes = [IsAuthenticated]
     def get(self, request):
@@ -204,6 +225,7 @@ class QuizAttemptResultView(APIView):
 
 
 
+@timed_view
 class QuizResultViewSet(APIView):
     permission_classes = [IsAuthenticated]
     def get(self, request):
@@ -225,14 +247,16 @@ class QuizResultViewSet(APIView):
                 result=str(e),
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+@timed_view
 class QuizResultLeaderBoardView(APIView):
     permission_classes = [IsAuthenticated]
     def get(self, request):
         try:
             topic = request.query_params.get("topic", False)
             difficulty = request.query_params.get("difficulty", False)
+            limit, offset = helper.get_limit_offset(request.query_params)
             return response_builder(
-                result=helper.get_leader_board_result(topic, difficulty),
+                result=helper.get_leader_board_result(topic, difficulty, limit, offset),
                 status_code=status.HTTP_200_OK
             )
         except QuizExceptionHandler as e:
@@ -245,6 +269,7 @@ class QuizResultLeaderBoardView(APIView):
                 result=str(e),
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
+@timed_view
 class QuizResultLeaderBoardTopView(APIView):
     permission_classes = [IsAuthenticated]
     def get(self, request):
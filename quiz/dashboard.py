@@ -0,0 +1,86 @@
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from exam.models import QuizAttempt
+from quiz.models import DashboardCounter, QuizSet
+
+GLOBAL_KEY = "global"
+
+
+def user_key(user_id):
+    return f"user:{user_id}"
+
+
+def count_dashboard(key, field=None):
+    # FULL RECOUNT, FOR A MISSING ROW, RARE CHANGES AND reconcile_dashboard_counters
+    quiz_sets = QuizSet.objects.all()
+    attempts = QuizAttempt.objects.filter(is_submitted=True)
+    if key != GLOBAL_KEY:
+        user_id = int(key.split(":", 1)[1])
+        quiz_sets = quiz_sets.filter(user_id=user_id)
+        attempts = attempts.filter(quiz_set__user_id=user_id).exclude(user_id=user_id)
+    counts = {
+        "total_quizzes": quiz_sets.count,
+        "active_quizzes": quiz_sets.filter(is_active=True).count,
+        "students_participated": attempts.values("user").distinct().count,
+    }
+    if field:
+        return counts[field]()
+    return {name: count() for name, count in counts.items()}
+
+
+def rebuild_counter(key):
+    counts = count_dashboard(key)
+    try:
+        with transaction.atomic():
+            counter, _ = DashboardCounter.objects.update_or_create(key=key, defaults=counts)
+    except IntegrityError:
+        # A CONCURRENT REQUEST CREATED THE ROW FIRST
+        counter = DashboardCounter.objects.get(key=key)
+    return counter
+
+
+def add_to_counters(keys, **deltas):
+    deltas = {field: delta for field, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    for key in keys:
+        updated = DashboardCounter.objects.filter(key=key).update(
+            **{field: F(field) + delta for field, delta in deltas.items()}
+        )
+        if not updated:
+            # NO ROW YET, THE RECOUNT ALREADY INCLUDES THIS CHANGE
+            rebuild_counter(key)
+
+
+def has_other_submission(attempt, teacher_id=None):
+    attempts = QuizAttempt.objects.filter(
+        user_id=attempt.user_id,
+        is_submitted=True
+    ).exclude(id=attempt.id)
+    if teacher_id is not None:
+        attempts = attempts.filter(quiz_set__user_id=teacher_id)
+    return attempts.exists()
+
+
+def count_student(attempt, teacher_id):
+    # A STUDENT IS COUNTED ON THE FIRST SUBMISSION ONLY
+    if not has_other_submission(attempt):
+        add_to_counters([GLOBAL_KEY], students_participated=1)
+    if attempt.user_id != teacher_id and not has_other_submission(attempt, teacher_id):
+        add_to_counters([user_key(teacher_id)], students_participated=1)
+
+
+def recount_field(keys, field):
+    for key in keys:
+        updated = DashboardCounter.objects.filter(key=key).update(**{field: count_dashboard(key, field)})
+        if not updated:
+            rebuild_counter(key)
+
+
+def get_dashboard_counters(user):
+    keys = [GLOBAL_KEY, user_key(user)]
+    counters = DashboardCounter.objects.in_bulk(keys)
+    for key in keys:
+        if key not in counters:
+            counters[key] = rebuild_counter(key)
+    return counters[GLOBAL_KEY], counters[user_key(user)]
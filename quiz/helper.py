@@ -1,6 +1,11 @@
+from collections import defaultdict
+from django.db.models import Count, Exists, F, OuterRef, Prefetch
+from django.db.models.functions import Lower
 from rest_framework import status
+from quiz import dashboard
 from quiz.models import Topic, Question, QuizSet
-from resources import QuizExceptionHandler
+from quiz.signals import tracked_delete
+from resources import QuizExceptionHandler, paginate_by_id, iterate_by_id
 from resources.custom_enums import QuestionDifficultyType, QuestionType
 from quiz.seralizer import (
     TopicSerializer,
@@ -9,6 +14,7 @@ from quiz.seralizer import (
     QuestionDetailsSerializer
 )
 from exam import models as exam_models
+from exam.paper_cache import exam_paper_cache, quiz_set_paper_key
 
 
 def get_all_topics(is_flat):
@@ -21,15 +27,35 @@ def get_all_topics(is_flat):
 
 
 def add_topic(validated_data):
-    for topic_name in validated_data:
-        serializer = TopicSerializer(data={"name": topic_name})
-        if not serializer.is_valid():
-            raise QuizExceptionHandler(
-                error_msg=serializer.errors,
-                error_code=status.HTTP_406_NOT_ACCEPTABLE,
-            )
-
-        serializer.save()
+    # ONE CASE-INSENSITIVE LOOKUP AND ONE INSERT FOR THE WHOLE LIST
+    existing = dict(
+        Topic.objects.annotate(
+            lower_name=Lower("name")
+        ).filter(
+            lower_name__in=[topic_name.lower() for topic_name in validated_data]
+        ).values_list("lower_name", "name")
+    )
+    new_topics = [topic_name for topic_name in validated_data if topic_name.lower() not in existing]
+    if new_topics:
+        # A CONCURRENT REQUEST MAY HAVE ADDED SOME OF THEM SINCE THE LOOKUP, RE-READ WHAT IS STORED NOW
+        Topic.objects.bulk_create([Topic(name=topic_name) for topic_name in new_topics], ignore_conflicts=True)
+        stored = dict(
+            Topic.objects.annotate(
+                lower_name=Lower("name")
+            ).filter(
+                lower_name__in=[topic_name.lower() for topic_name in new_topics]
+            ).values_list("lower_name", "name")
+        )
+        existing.update(
+            (topic_name.lower(), stored[topic_name.lower()])
+            for topic_name in new_topics
+            if stored.get(topic_name.lower(), topic_name) != topic_name
+        )
+        new_topics = [topic_name for topic_name in new_topics if topic_name.lower() not in existing]
+    return {
+        "created": new_topics,
+        "existing": [existing[topic_name.lower()] for topic_name in validated_data if topic_name.lower() in existing],
+    }
 
 
 def update_topic(topic_name, topic_id):
@@ -53,7 +79,7 @@ def delete_topic(topic_id):
             error_code=status.HTTP_404_NOT_FOUND,
         )
 
-    found_topic.delete()
+    tracked_delete(found_topic)
 
 
 def get_topics_difficulty():
@@ -64,7 +90,34 @@ def get_set_details():
     return [{"id": name, "name": name} for name in QuestionType.all_values()]
 
 
-def get_all_questions(request):
+def build_question_usage_index(question_ids):
+    # ONE PASS OVER THE quiz_set_questions THROUGH TABLE FOR ALL GIVEN QUESTIONS
+    usage_index = defaultdict(list)
+    used_in = QuizSet.questions.through.objects.filter(
+        question_id__in=question_ids
+    ).values(
+        "question_id",
+        "quizset__topic__name",
+        "quizset__set_type",
+        "quizset__difficulty_level"
+    )
+    for row in used_in:
+        usage_index[row["question_id"]].append({
+            "topic__name": row["quizset__topic__name"],
+            "set_type": row["quizset__set_type"],
+            "difficulty_level": row["quizset__difficulty_level"],
+        })
+    return usage_index
+
+
+def attach_question_usage(questions):
+    usage_index = build_question_usage_index([question.id for question in questions])
+    for question in questions:
+        question.used_in_quiz_sets = usage_index.get(question.id, [])
+    return questions
+
+
+def filter_questions(request):
     topic = request.query_params.get("topic", None)
     difficulty = request.query_params.get("difficulty", None)
 
@@ -72,22 +125,35 @@ def get_all_questions(request):
 
     if topic and difficulty:
         questions = Question.objects.filter(topic__id=int(topic), difficulty_level=difficulty)
+    return questions
+
+
+def export_questions(request):
+    return iterate_by_id(filter_questions(request).values())
+
+
+def get_all_questions(request):
+    questions = filter_questions(request)
 
-    total_questions_count = questions.count()
-    used_questions_count = QuizSet.objects.filter(
-        questions__id__in=questions.values_list("id", flat=True).distinct()
-    ).values_list("questions__id", flat=True).distinct().count()
+    # COUNTERS COVER THE WHOLE FILTER, THE USAGE INDEX ONLY THE CURRENT PAGE, SO ONE AGGREGATE FOR BOTH
+    counters = questions.aggregate(
+        total=Count("id"),
+        used=Count("id", filter=Exists(QuizSet.questions.through.objects.filter(question_id=OuterRef("id"))))
+    )
+    total_questions_count = counters["total"]
+    used_questions_count = counters["used"]
 
-    serializer = QuestionDetailsSerializer(questions, many=True)
+    page = paginate_by_id(questions, request)
+    serializer = QuestionDetailsSerializer(attach_question_usage(page.items), many=True)
 
     return {
         "questionsData": serializer.data,
         "questionsCounterDetails": {
-            "totalQuestions": questions.count(),
+            "totalQuestions": total_questions_count,
             "usedQuestions": used_questions_count,
             "remainingQuestions": (total_questions_count - used_questions_count),
         }
-    }
+    }, page
 
 
 def delete_question(question_id):
@@ -103,27 +169,54 @@ def delete_question(question_id):
             error_msg="Question not found",
             error_code=status.HTTP_404_NOT_FOUND,
         )
-    found_question.delete()
+    tracked_delete(found_question)
 
 
-def get_all_quiz_sets(q_set_id, difficulty_level, topic):
+def get_all_quiz_sets(q_set_id, difficulty_level, topic, request):
     quiz_sets = QuizSet.objects.filter(id=q_set_id) if q_set_id else QuizSet.objects.all()
     if difficulty_level:
         quiz_sets = quiz_sets.filter(difficulty_level__icontains=difficulty_level)
     if topic:
         quiz_sets = quiz_sets.filter(topic__id=topic)
-    serialize = QuizSetSerializer(quiz_sets, many=True)
+    page = paginate_by_id(
+        quiz_sets.prefetch_related(Prefetch("questions", queryset=Question.objects.only("id"))),
+        request
+    )
+    serialize = QuizSetSerializer(page.items, many=True)
+    return serialize.data, page
+
+
+def quiz_set_details_queryset(quiz_sets):
+    return quiz_sets.select_related("topic").prefetch_related("questions")
+
+
+def get_quiz_set_details(quiz_sets, user=None):
+    # EXPECTS SETS FROM quiz_set_details_queryset, THE USER'S COMPLETED SETS COST ONE QUERY
+    quiz_sets = list(quiz_sets)
+    completed_quiz_sets = set()
+    if user and quiz_sets:
+        completed_quiz_sets = set(
+            exam_models.QuizAttempt.objects.filter(
+                user_id=user,
+                quiz_set_id__in=[quiz_set.id for quiz_set in quiz_sets]
+            ).values_list("quiz_set_id", flat=True)
+        )
+    serialize = QuizSetDetailsSerializer(
+        quiz_sets,
+        many=True,
+        context={"user": user, "completed_quiz_sets": completed_quiz_sets}
+    )
     return serialize.data
 
 
-def get_all_quiz_sets_in_detail(q_set_id, difficulty_level, topic, user):
+def get_all_quiz_sets_in_detail(q_set_id, difficulty_level, topic, user, request):
     quiz_sets = QuizSet.objects.filter(id=q_set_id) if q_set_id else QuizSet.objects.all()
     if difficulty_level:
         quiz_sets = quiz_sets.filter(difficulty_level__icontains=difficulty_level)
     if topic:
         quiz_sets = quiz_sets.filter(topic__id=topic)
-    serialize = QuizSetDetailsSerializer(quiz_sets, many=True, context={"user": user})
-    return serialize.data
+    page = paginate_by_id(quiz_set_details_queryset(quiz_sets), request)
+    return get_quiz_set_details(page.items, user), page
 
 
 def add_quiz_set(validated_data):
@@ -156,6 +249,11 @@ def update_quiz_set(quiz_id, validated_data):
         if to_removed:
             found_quiz_set.questions.remove(*to_removed)
 
+        # save() WRITES EVERY FIELD, KEEP THE COUNT THE SIGNALS JUST STORED
+        found_quiz_set.question_count = len(set(new_q_list))
+
+    # NEW VERSION, CACHED EXAM PAPERS OF THE OLD ONE ARE NO LONGER SERVED
+    found_quiz_set.version = F("version") + 1
     found_quiz_set.save()
 
 
@@ -174,33 +272,18 @@ def delete_quiz_set(quiz_set_id):
             error_code=status.HTTP_404_NOT_FOUND,
         )
 
-    found_q_set.delete()
+    exam_paper_cache.delete(quiz_set_paper_key(found_q_set))
+    tracked_delete(found_q_set)
 
 
 def get_quiz_set_details_for_teachers_view(user):
-    all_quiz_sets = QuizSet.objects.all()
-    user_quiz_sets = all_quiz_sets.filter(user_id=user)
-
-    total_quizzes = all_quiz_sets.count()
-    active_quizzes = all_quiz_sets.filter(is_active=True).count()
-
-    total_students_participated = exam_models.QuizAttempt.objects.filter(
-        is_submitted=True
-    ).values('user').distinct().count()
-
-    user_total_quizzes = user_quiz_sets.count()
-    user_active_quizzes = user_quiz_sets.filter(is_active=True).count()
-
-    user_total_students_participated = exam_models.QuizAttempt.objects.filter(
-        is_submitted=True,
-        quiz_set__user_id=user
-    ).exclude(user_id=user).values('user').distinct().count()
-
+    # COUNTERS KEPT BY quiz.signals, ONE PRIMARY KEY READ
+    global_counter, user_counter = dashboard.get_dashboard_counters(user)
     return {
-        "totalQuizzes": total_quizzes,
-        "activeQuizzes": active_quizzes,
-        "totalStudentsParticipated": total_students_participated,
-        "userTotalQuizzes": user_total_quizzes,
-        "userActiveQuizzes": user_active_quizzes,
-        "userTotalStudentsParticipated": user_total_students_participated,
+        "totalQuizzes": global_counter.total_quizzes,
+        "activeQuizzes": global_counter.active_quizzes,
+        "totalStudentsParticipated": global_counter.students_participated,
+        "userTotalQuizzes": user_counter.total_quizzes,
+        "userActiveQuizzes": user_counter.active_quizzes,
+        "userTotalStudentsParticipated": user_counter.students_participated,
     }
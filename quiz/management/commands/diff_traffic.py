@@ -0,0 +1,74 @@
+from collections import defaultdict
+from django.core.management.base import BaseCommand, CommandError
+from resources.metrics import percentile
+from resources.traffic_capture import read_capture
+
+
+def summarize(log_file):
+    records = defaultdict(list)
+    try:
+        for record in read_capture(log_file):
+            records[f"{record['method']} {record['route']}"].append(record)
+    except FileNotFoundError:
+        raise CommandError(f"The log file '{log_file}' does not exist.")
+    return {
+        endpoint: {
+            "requests": len(route_records),
+            "p50_ms": percentile([record["ms"] for record in route_records], 50),
+            "p95_ms": percentile([record["ms"] for record in route_records], 95),
+            "avg_queries": sum(record["queries"] for record in route_records) / len(route_records),
+            "max_queries": max(record["queries"] for record in route_records),
+        }
+        for endpoint, route_records in records.items()
+    }
+
+
+def change(base, new):
+    return (new - base) / base * 100 if base else 0.0
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare two traffic capture logs of the same replayed traffic, per route: latency and query "
+        "counts of the base build against the new one."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("base_log")
+        parser.add_argument("new_log")
+        parser.add_argument("--threshold", type=float, default=20.0, help="p95 slowdown in percent that counts as a regression.")
+        parser.add_argument("--min-ms", type=float, default=1.0, help="Smaller p95 slowdowns are noise, not regressions.")
+        parser.add_argument("--fail-on-regression", action="store_true")
+
+    def handle(self, *args, **options):
+        base = summarize(options["base_log"])
+        new = summarize(options["new_log"])
+
+        regressions = []
+        self.stdout.write(
+            f"{'endpoint':<50} {'requests':>8} {'p50 ms':>15} {'p95 ms':>15} {'p95 %':>7} {'avg q':>13} {'max q':>9}"
+        )
+        for endpoint in sorted(base.keys() | new.keys()):
+            if endpoint not in base or endpoint not in new:
+                self.stdout.write(f"{endpoint:<50} only in the {'new' if endpoint in new else 'base'} log")
+                continue
+            old_row, new_row = base[endpoint], new[endpoint]
+            p95_change = change(old_row["p95_ms"], new_row["p95_ms"])
+            # MORE QUERIES IS ALWAYS A REGRESSION, LATENCY ONLY PAST THE THRESHOLD
+            regressed = (
+                new_row["avg_queries"] > old_row["avg_queries"]
+                or (p95_change > options["threshold"] and new_row["p95_ms"] - old_row["p95_ms"] >= options["min_ms"])
+            )
+            if regressed:
+                regressions.append(endpoint)
+            self.stdout.write(
+                f"{endpoint:<50} {new_row['requests']:>8} "
+                f"{old_row['p50_ms']:>7.1f}>{new_row['p50_ms']:<7.1f} {old_row['p95_ms']:>7.1f}>{new_row['p95_ms']:<7.1f} "
+                f"{p95_change:>+7.1f} {old_row['avg_queries']:>6.1f}>{new_row['avg_queries']:<6.1f} "
+                f"{old_row['max_queries']:>4}>{new_row['max_queries']:<4}"
+                + ("  REGRESSED" if regressed else "")
+            )
+
+        if regressions and options["fail_on_regression"]:
+            raise CommandError(f"{len(regressions)} routes regressed: {', '.join(regressions)}")
+        self.stdout.write(f"{len(regressions)} of {len(base.keys() & new.keys())} routes regressed.")
@@ -0,0 +1,36 @@
+import json
+from django.core.management.base import BaseCommand, CommandError
+from quiz.question_import import import_questions
+from resources import QuizExceptionHandler, iter_file_rows
+from users.models import UserProfile
+
+
+class Command(BaseCommand):
+    help = "Import a CSV or JSONL question bank, streaming the file in chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("path")
+        parser.add_argument("--user", required=True, help="Username of the owner of the imported questions.")
+        parser.add_argument("--format", choices=["csv", "jsonl"])
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        import_format = options["format"] or path.rsplit(".", 1)[-1].lower()
+        if import_format not in ["csv", "jsonl"]:
+            raise CommandError(f"Can not tell the format of '{path}', pass --format.")
+
+        user = UserProfile.objects.filter(username=options["user"]).first()
+        if not user:
+            raise CommandError(f"User with username '{options['user']}' does not exist.")
+
+        try:
+            with open(path, "rb") as binary_file:
+                report = import_questions(iter_file_rows(binary_file, import_format), user.id)
+        except QuizExceptionHandler as e:
+            raise CommandError(e.error_msg)
+
+        for error in report["errors"]:
+            self.stderr.write(f"Row {error['row']}: {json.dumps(error['errors'])}")
+        self.stdout.write(self.style.SUCCESS(
+            f"Done, {report['created']} questions imported, {report['failed']} rows failed."
+        ))
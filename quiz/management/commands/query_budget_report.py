@@ -0,0 +1,65 @@
+import json
+from collections import defaultdict
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from resources.metrics import percentile
+
+
+class Command(BaseCommand):
+    help = "Print per-endpoint SQL aggregates from the query budget log, worst endpoints first."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--log-file", default=None, help="Defaults to QUERY_BUDGET['LOG_FILE'].")
+        parser.add_argument("--over-budget", action="store_true", help="Only list endpoints that went over budget.")
+
+    def handle(self, *args, **options):
+        log_file = options["log_file"] or settings.QUERY_BUDGET["LOG_FILE"]
+        if not log_file:
+            raise CommandError("No log file, set QUERY_BUDGET_LOG or pass --log-file.")
+
+        records = defaultdict(list)
+        try:
+            with open(log_file) as log:
+                for line in log:
+                    if line.strip():
+                        record = json.loads(line)
+                        records[(record["method"], record["view"])].append(record)
+        except FileNotFoundError:
+            raise CommandError(f"The log file '{log_file}' does not exist.")
+
+        rows = []
+        for (method, view), view_records in records.items():
+            queries = [record["queries"] for record in view_records]
+            db_ms = [record["db_ms"] for record in view_records]
+            budget = view_records[-1]["budget"]
+            over_budget = sum(1 for record in view_records if record["budget"] is not None and record["queries"] > record["budget"])
+            if options["over_budget"] and not over_budget:
+                continue
+            slowest = max(view_records, key=lambda record: record["slowest_ms"])
+            rows.append({
+                "endpoint": f"{method} {view}",
+                "requests": len(view_records),
+                "avg_queries": sum(queries) / len(queries),
+                "max_queries": max(queries),
+                "budget": "-" if budget is None else budget,
+                "over_budget": over_budget,
+                "p50_db_ms": percentile(db_ms, 50),
+                "p95_db_ms": percentile(db_ms, 95),
+                "slowest_ms": slowest["slowest_ms"],
+                "slowest_sql": slowest["slowest_sql"] or "",
+            })
+
+        rows.sort(key=lambda row: (row["over_budget"], row["max_queries"]), reverse=True)
+        self.stdout.write(
+            f"{'endpoint':<45} {'requests':>8} {'avg q':>7} {'max q':>6} {'budget':>6} "
+            f"{'over':>5} {'p50 db ms':>10} {'p95 db ms':>10} {'slowest ms':>11}"
+        )
+        for row in rows:
+            self.stdout.write(
+                f"{row['endpoint']:<45} {row['requests']:>8} {row['avg_queries']:>7.1f} {row['max_queries']:>6} "
+                f"{row['budget']:>6} {row['over_budget']:>5} {row['p50_db_ms']:>10.2f} {row['p95_db_ms']:>10.2f} "
+                f"{row['slowest_ms']:>11.2f}"
+            )
+        for row in rows:
+            if row["over_budget"]:
+                self.stdout.write(f"\n{row['endpoint']} slowest statement:\n  {row['slowest_sql'][:200]}")
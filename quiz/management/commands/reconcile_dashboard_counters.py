@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from quiz import dashboard
+from quiz.models import DashboardCounter, QuizSet
+
+
+class Command(BaseCommand):
+    help = "Recount the teacher dashboard counters from the quiz sets and attempts and fix any drift."
+
+    def handle(self, *args, **options):
+        counters = DashboardCounter.objects.in_bulk()
+        keys = {dashboard.GLOBAL_KEY, *counters}
+        keys.update(
+            dashboard.user_key(user_id)
+            for user_id in QuizSet.objects.values_list("user_id", flat=True).distinct()
+        )
+
+        fixed = 0
+        for key in sorted(keys):
+            counts = dashboard.count_dashboard(key)
+            counter = counters.get(key)
+            current = {field: getattr(counter, field) for field in counts} if counter else None
+            if current == counts:
+                continue
+            DashboardCounter.objects.update_or_create(key=key, defaults=counts)
+            fixed += 1
+            self.stdout.write(f"{key}: {current} -> {counts}")
+
+        self.stdout.write(self.style.SUCCESS(f"Done, {len(keys)} counters checked, {fixed} fixed."))
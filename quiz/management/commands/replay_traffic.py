@@ -0,0 +1,80 @@
+from collections import Counter
+from time import perf_counter
+from urllib.parse import urlencode
+from django.core.management.base import BaseCommand, CommandError
+from resources.load_driver import timed_request
+from resources.traffic_capture import REDACTED, read_capture, is_redacted
+from users.helper import get_tokens_for_user
+from users.models import UserProfile
+
+
+class Command(BaseCommand):
+    help = (
+        "Send the requests of a traffic capture log, in order, to a running instance seeded with the same "
+        "fixture. Run that instance with TRAFFIC_CAPTURE_LOG set and compare its log with diff_traffic."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("log_file")
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+        parser.add_argument("--password", default="loadtest-password", help="Sent in place of redacted login passwords.")
+        parser.add_argument("--limit", type=int, default=None)
+
+    def handle(self, *args, **options):
+        base_url = options["base_url"].rstrip("/")
+        # THE ACCESS TOKENS ARE NOT CAPTURED, THEY ARE MINTED AGAIN FOR THE SAME USER IDS
+        tokens = {}
+        sent = 0
+        skipped = Counter()
+        status_changed = Counter()
+
+        started = perf_counter()
+        try:
+            for record in read_capture(options["log_file"]):
+                if options["limit"] is not None and sent >= options["limit"]:
+                    break
+                request, reason = self.build_request(record, options["password"])
+                if reason:
+                    skipped[reason] += 1
+                    continue
+
+                token = None
+                if record["user"] is not None:
+                    if record["user"] not in tokens:
+                        user = UserProfile.objects.filter(id=record["user"]).first()
+                        tokens[record["user"]] = get_tokens_for_user(user)["access"] if user else None
+                    token = tokens[record["user"]]
+                    if token is None:
+                        skipped["unknown user"] += 1
+                        continue
+
+                status_code, _, _ = timed_request(f"{base_url}{request['url']}", request["body"], token, record["method"])
+                sent += 1
+                if status_code // 100 != record["status"] // 100:
+                    status_changed[f"{record['method']} {record['route']} {record['status']} -> {status_code}"] += 1
+        except FileNotFoundError:
+            raise CommandError(f"The log file '{options['log_file']}' does not exist.")
+
+        self.stdout.write(f"Sent {sent} requests in {perf_counter() - started:.2f}s.")
+        for reason, count in skipped.most_common():
+            self.stdout.write(f"Skipped {count}: {reason}")
+        # A CHANGED STATUS CLASS USUALLY MEANS THE TARGET WAS NOT SEEDED LIKE THE CAPTURED INSTANCE
+        for change, count in status_changed.most_common():
+            self.stdout.write(self.style.WARNING(f"Status changed {count}x: {change}"))
+
+    def build_request(self, record, password):
+        if record["shape"] in ["multipart", "too large", "invalid json"]:
+            return None, f"{record['shape']} body"
+        if is_redacted(record["query"]):
+            return None, "redacted query"
+
+        body = record["body"]
+        if isinstance(body, dict) and body.get("password") == REDACTED:
+            body = {**body, "password": password}
+        if is_redacted(body):
+            return None, "redacted body"
+
+        url = record["path"]
+        if record["query"]:
+            url = f"{url}?{urlencode(record['query'])}"
+        return {"url": url, "body": body}, None
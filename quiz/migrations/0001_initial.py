@@ -0,0 +1,65 @@
+# Generated by Django 5.2.3 on 2026-10-18 17:57
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Topic',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=50, unique=True)),
+            ],
+            options={
+                'db_table': 'topic',
+                'managed': True,
+            },
+        ),
+        migrations.CreateModel(
+            name='Question',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('question_text', models.TextField()),
+                ('option_a', models.CharField(max_length=200)),
+                ('option_b', models.CharField(max_length=200)),
+                ('option_c', models.CharField(default='N/A', max_length=200)),
+                ('option_d', models.CharField(default='N/A', max_length=200)),
+                ('correct_option', models.CharField(choices=[('A', 'A'), ('B', 'B'), ('C', 'C'), ('D', 'D')], max_length=5)),
+                ('difficulty_level', models.CharField(choices=[('Easy', 'Easy'), ('Medium', 'Medium'), ('Hard', 'Hard')], max_length=10)),
+                ('user', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                ('topic', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='questions', to='quiz.topic')),
+            ],
+            options={
+                'db_table': 'question',
+                'managed': True,
+            },
+        ),
+        migrations.CreateModel(
+            name='QuizSet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('set_type', models.CharField(choices=[('A', 'A'), ('B', 'B'), ('C', 'C'), ('D', 'D')], default='A', max_length=5)),
+                ('difficulty_level', models.CharField(choices=[('Easy', 'Easy'), ('Medium', 'Medium'), ('Hard', 'Hard')], default='Easy', max_length=10)),
+                ('total_time', models.IntegerField(default=10)),
+                ('is_active', models.BooleanField(default=False)),
+                ('questions', models.ManyToManyField(related_name='in_quiz_sets', to='quiz.question')),
+                ('user', models.ForeignKey(editable=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+                ('topic', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='quiz_sets', to='quiz.topic')),
+            ],
+            options={
+                'db_table': 'quiz_set',
+                'managed': True,
+                'unique_together': {('topic', 'set_type', 'difficulty_level')},
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.3 on 2026-10-18 18:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizset',
+            name='version',
+            field=models.PositiveIntegerField(default=1, editable=False),
+        ),
+    ]
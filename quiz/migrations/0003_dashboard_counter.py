@@ -0,0 +1,26 @@
+# Generated by Django 5.2.3 on 2026-10-18 18:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0002_quizset_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardCounter',
+            fields=[
+                ('key', models.CharField(max_length=32, primary_key=True, serialize=False)),
+                ('total_quizzes', models.IntegerField(default=0)),
+                ('active_quizzes', models.IntegerField(default=0)),
+                ('students_participated', models.IntegerField(default=0)),
+            ],
+            options={
+                'db_table': 'dashboard_counter',
+                'managed': True,
+            },
+        ),
+    ]
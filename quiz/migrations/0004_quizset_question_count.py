@@ -0,0 +1,33 @@
+# Generated by Django 5.2.3 on 2026-10-18 18:17
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_question_count(apps, schema_editor):
+    QuizSet = apps.get_model('quiz', 'QuizSet')
+    question_counts = QuizSet.questions.through.objects.filter(
+        quizset_id=OuterRef('pk')
+    ).values('quizset_id').annotate(
+        total=Count('id')
+    ).values('total')[:1]
+    QuizSet.objects.update(
+        question_count=Coalesce(Subquery(question_counts), 0)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('quiz', '0003_dashboard_counter'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizset',
+            name='question_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_question_count, migrations.RunPython.noop),
+    ]
@@ -66,6 +66,9 @@ class QuizSet(models.Model):
     total_time = models.IntegerField(default=10)
     user = models.ForeignKey(UserProfile, on_delete=models.CASCADE, editable=False)
     is_active = models.BooleanField(default=False)
+    version = models.PositiveIntegerField(default=1, editable=False)
+    # KEPT IN SYNC WITH questions BY quiz.signals AND helper.update_quiz_set
+    question_count = models.PositiveIntegerField(default=0, editable=False)
 
 
     def save(self, *args, **kwargs):
@@ -87,6 +90,14 @@ class QuizSet(models.Model):
         managed = True
         unique_together = ("topic", "set_type", "difficulty_level")
 
-    @property
-    def questions_count(self):
-        return self.questions.count()
+
+class DashboardCounter(models.Model):
+    # "global" OR "user:<teacher id>", KEPT CURRENT BY quiz.signals
+    key = models.CharField(max_length=32, primary_key=True)
+    total_quizzes = models.IntegerField(default=0)
+    active_quizzes = models.IntegerField(default=0)
+    students_participated = models.IntegerField(default=0)
+
+    class Meta:
+        db_table = "dashboard_counter"
+        managed = True
@@ -0,0 +1,104 @@
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from quiz.models import Question, Topic
+from resources import QuestionType, QuestionDifficultyType, chunked, import_report
+
+CORRECT_OPTIONS = frozenset(QuestionType.all_values())
+DIFFICULTY_LEVELS = frozenset(QuestionDifficultyType.all_values())
+REQUIRED_FIELDS = ["question_text", "option_a", "option_b", "correct_option", "topic", "difficulty_level"]
+OPTION_FIELDS = ["option_a", "option_b", "option_c", "option_d"]
+TEXT_FIELDS = ["question_text", *OPTION_FIELDS, "correct_option", "difficulty_level"]
+OPTION_MAX_LENGTH = Question._meta.get_field("option_a").max_length
+
+
+class TopicResolver:
+    """
+    Maps the 'topic' column, a topic id or a topic name, to a topic id. Each
+    chunk costs at most one query for the keys not seen before, memory grows
+    with the number of topics, not with the file.
+    """
+
+    def __init__(self):
+        self._ids = {}
+
+    def load(self, values):
+        keys = {str(value).strip() for value in values if value not in [None, ""]} - self._ids.keys()
+        if not keys:
+            return
+        ids = [int(key) for key in keys if key.isdigit()]
+        names = [key for key in keys if not key.isdigit()]
+        for topic_id, name in Topic.objects.filter(Q(id__in=ids) | Q(name__in=names)).values_list("id", "name"):
+            self._ids[str(topic_id)] = topic_id
+            self._ids[name] = topic_id
+        for key in keys:
+            self._ids.setdefault(key, None)
+
+    def get(self, value):
+        return self._ids.get(str(value).strip())
+
+
+def build_question(row, topics, user_id):
+    errors = {}
+    # A JSONL VALUE CAN BE ANY JSON TYPE, THE TOPIC MAY BE AN ID
+    for field in TEXT_FIELDS:
+        if row.get(field) is not None and not isinstance(row[field], str):
+            errors[field] = ["Not a valid string."]
+    topic = row.get("topic")
+    if topic is not None and (isinstance(topic, bool) or not isinstance(topic, (str, int))):
+        errors["topic"] = ["Not a valid topic id or name."]
+    for field in REQUIRED_FIELDS:
+        if field not in errors and row.get(field) in [None, ""]:
+            errors[field] = ["This field is required."]
+    for field in OPTION_FIELDS:
+        if field not in errors and len(row.get(field) or "") > OPTION_MAX_LENGTH:
+            errors[field] = [f"Ensure this field has no more than {OPTION_MAX_LENGTH} characters."]
+    if "correct_option" not in errors and row["correct_option"] not in CORRECT_OPTIONS:
+        errors["correct_option"] = [f"'{row['correct_option']}' is not one of {sorted(CORRECT_OPTIONS)}."]
+    if "difficulty_level" not in errors and row["difficulty_level"] not in DIFFICULTY_LEVELS:
+        errors["difficulty_level"] = [f"'{row['difficulty_level']}' is not one of {sorted(DIFFICULTY_LEVELS)}."]
+    topic_id = None
+    if "topic" not in errors:
+        topic_id = topics.get(row["topic"])
+        if topic_id is None:
+            errors["topic"] = [f"The topic '{row['topic']}' does not exist."]
+    if errors:
+        return None, errors
+
+    return Question(
+        question_text=row["question_text"],
+        option_a=row["option_a"],
+        option_b=row["option_b"],
+        option_c=row.get("option_c") or "N/A",
+        option_d=row.get("option_d") or "N/A",
+        correct_option=row["correct_option"],
+        topic_id=topic_id,
+        difficulty_level=row["difficulty_level"],
+        user_id=user_id
+    ), None
+
+
+def import_questions(rows, user_id):
+    chunk_size = settings.QUESTION_IMPORT["CHUNK_SIZE"]
+    max_errors = settings.QUESTION_IMPORT["MAX_ERRORS"]
+    topics = TopicResolver()
+    created = 0
+    failed = 0
+    errors = []
+
+    # VALID ROWS ARE WRITTEN, A BROKEN FILE OR A DB ERROR ROLLS BACK THE WHOLE IMPORT
+    with transaction.atomic():
+        for chunk in chunked(rows, chunk_size):
+            topics.load(row.get("topic") for _, row in chunk)
+            questions = []
+            for row_number, row in chunk:
+                question, row_errors = build_question(row, topics, user_id)
+                if row_errors:
+                    failed += 1
+                    if len(errors) < max_errors:
+                        errors.append((row_number, row_errors))
+                else:
+                    questions.append(question)
+            Question.objects.bulk_create(questions)
+            created += len(questions)
+    return import_report(created, errors, failed)
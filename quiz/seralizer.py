@@ -1,5 +1,5 @@
 from rest_framework import serializers, status
-from resources import QuizExceptionHandler, QuestionDifficultyType
+from resources import QuizExceptionHandler, QuestionDifficultyType, timed_serializer
 from exam import models as exam_models
 from quiz.models import (
     Topic,
@@ -13,29 +13,30 @@ from resources.custom_enums import (
 )
 
 
+@timed_serializer
 class TopicSerializer(serializers.ModelSerializer):
     class Meta:
         model = Topic
         fields = '__all__'
 
 
+@timed_serializer
 class TopicAddCheckSerializer(serializers.Serializer):
     topics = serializers.ListField(
-        child=serializers.CharField(),
+        child=serializers.CharField(max_length=Topic._meta.get_field("name").max_length),
         allow_empty=False
     )
 
     def validate_topics(self, value):
+        # SAME NAME IN ANY CASE OR SPACING IS ONE TOPIC, THE FIRST SPELLING WINS
+        topics = {}
         for topic in value:
-            topic_clean = topic.strip().lower()
-            if Topic.objects.filter(name__iexact=topic_clean).exists():
-                raise QuizExceptionHandler(
-                    error_msg=f"The topic '{topic}' already exists.",
-                    error_code=status.HTTP_226_IM_USED
-                )
-        return value
+            topic_clean = " ".join(topic.split())
+            topics.setdefault(topic_clean.lower(), topic_clean)
+        return list(topics.values())
 
 
+@timed_serializer
 class TopicUpdateCheckSerializer(serializers.Serializer):
     topic = serializers.CharField(required=True)
 
@@ -61,6 +62,7 @@ class TopicUpdateCheckSerializer(serializers.Serializer):
         return topic
 
 
+@timed_serializer
 class SetCheckSerializer(serializers.Serializer):
     topic = serializers.IntegerField(required=True)
     difficulty = serializers.CharField(required=True)
@@ -82,6 +84,7 @@ class SetCheckSerializer(serializers.Serializer):
         return attrs
 
 
+@timed_serializer
 class QuestionSerializer(serializers.ModelSerializer):
     class Meta:
         model = Question
@@ -105,9 +108,10 @@ class QuestionSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         user = self.context["user"]
-        return Question.objects.create(user=user, **validated_data)
+        return Question.objects.create(user_id=user, **validated_data)
 
 
+@timed_serializer
 class QuestionDetailsSerializer(serializers.Serializer):
     id = serializers.SerializerMethodField()
     question_text = serializers.SerializerMethodField()
@@ -139,9 +143,11 @@ class QuestionDetailsSerializer(serializers.Serializer):
         return obj.difficulty_level
 
     def get_topic(self, obj):
-        return obj.topic.id
+        return obj.topic_id
 
     def get_is_used(self, obj):
+        if hasattr(obj, "used_in_quiz_sets"):
+            return obj.used_in_quiz_sets
         used_details = QuizSet.objects.filter(
             questions__id=obj.id
         ).values(
@@ -152,11 +158,19 @@ class QuestionDetailsSerializer(serializers.Serializer):
         return used_details
 
 
+class QuestionIdListField(serializers.ListField):
+    # PLAIN IDS IN AND OUT, THE ROWS ARE LOADED ONCE FOR THE WHOLE LIST IN validate
+    child = serializers.IntegerField(min_value=1)
+
+    def to_representation(self, data):
+        if hasattr(data, "all"):
+            return [question.pk for question in data.all()]
+        return super().to_representation(data)
+
+
+@timed_serializer
 class QuizSetSerializer(serializers.ModelSerializer):
-    questions = serializers.PrimaryKeyRelatedField(
-        queryset=Question.objects.all(),
-        many=True
-    )
+    questions = QuestionIdListField()
 
     class Meta:
         model = QuizSet
@@ -185,20 +199,49 @@ class QuizSetSerializer(serializers.ModelSerializer):
                 error_code=status.HTTP_406_NOT_ACCEPTABLE
             )
 
-        for q in attrs["questions"]:
-            if q.topic != topic:
-                raise QuizExceptionHandler(
-                    error_msg=f"Question '{q.question_text}' does not belong to Topic '{topic.name}'",
-                    error_code=status.HTTP_406_NOT_ACCEPTABLE
-                )
-            if q.difficulty_level != attrs["difficulty_level"]:
-                raise QuizExceptionHandler(
-                    error_msg=f"Difficulty mismatch for Question '{q.question_text}'",
-                    error_code=status.HTTP_406_NOT_ACCEPTABLE
-                )
+        attrs["questions"] = list(dict.fromkeys(attrs["questions"]))
+        found_questions = {
+            question_id: (topic_id, difficulty_level)
+            for question_id, topic_id, difficulty_level in Question.objects.filter(
+                id__in=attrs["questions"]
+            ).values_list("id", "topic_id", "difficulty_level")
+        }
+
+        missing = [question_id for question_id in attrs["questions"] if question_id not in found_questions]
+        if missing:
+            raise serializers.ValidationError({
+                "questions": [f"Questions {missing} do not exist."]
+            })
+
+        # EVERY MISMATCH IS REPORTED AT ONCE
+        errors = []
+        topic_mismatch = [
+            question_id for question_id in attrs["questions"]
+            if found_questions[question_id][0] != topic.id
+        ]
+        if topic_mismatch:
+            errors.append(f"Questions {topic_mismatch} do not belong to Topic '{topic.name}'.")
+        difficulty_mismatch = [
+            question_id for question_id in attrs["questions"]
+            if found_questions[question_id][1] != difficulty_level_key
+        ]
+        if difficulty_mismatch:
+            errors.append(f"Difficulty mismatch for Questions {difficulty_mismatch}.")
+        if errors:
+            raise QuizExceptionHandler(
+                error_msg=" ".join(errors),
+                error_code=status.HTTP_406_NOT_ACCEPTABLE
+            )
         return attrs
 
+    def create(self, validated_data):
+        questions = validated_data.pop("questions")
+        quiz_set = super().create(validated_data)
+        quiz_set.questions.add(*questions)
+        return quiz_set
+
 
+@timed_serializer
 class QuizSetDetailsSerializer(serializers.Serializer):
     quiz_set_id = serializers.SerializerMethodField()
     topic_id = serializers.SerializerMethodField()
@@ -214,12 +257,14 @@ class QuizSetDetailsSerializer(serializers.Serializer):
         return obj.id
 
     def get_topic_id(self, obj):
-        return obj.topic.id
+        return obj.topic_id
 
     def get_topic_name(self, obj):
         return obj.topic.name
 
     def get_is_completed(self, obj):
+        if "completed_quiz_sets" in self.context:
+            return obj.id in self.context["completed_quiz_sets"]
         return exam_models.QuizAttempt.objects.filter(
             user_id=self.context.get("user"),
             quiz_set__id=obj.id
@@ -232,7 +277,7 @@ class QuizSetDetailsSerializer(serializers.Serializer):
         return obj.set_type
 
     def get_questions_count(self, obj):
-        return obj.questions.count()
+        return obj.question_count
 
     def get_total_time(self, obj):
         return obj.total_time
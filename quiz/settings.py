@@ -41,6 +41,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'resources.metrics.MetricsMiddleware',
+    'resources.server_timing.ServerTimingMiddleware',
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.common.CommonMiddleware",
     'django.middleware.security.SecurityMiddleware',
@@ -50,6 +52,8 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'resources.traffic_capture.TrafficCaptureMiddleware',
+    'resources.query_budget.QueryBudgetMiddleware',
 ]
 
 ROOT_URLCONF = 'quiz.urls'
@@ -86,6 +90,17 @@ DATABASES = {
     }
 }
 
+if (DATABASES['default']['ENGINE'] or '').endswith('sqlite3'):
+    # CONCURRENT WRITERS WAIT FOR THE LOCK INSTEAD OF FAILING WITH "database is locked"
+    DATABASES['default']['OPTIONS'] = {'transaction_mode': 'IMMEDIATE', 'timeout': 20}
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    }
+}
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -132,11 +147,109 @@ AUTH_USER_MODEL = 'users.UserProfile'
 # REST SETTINGS
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'resources.authentication.ClaimsJWTAuthentication',
+    ),
+    'DEFAULT_RENDERER_CLASSES': (
+        'resources.server_timing.TimedJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
     )
 }
 
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=5),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
+    "TOKEN_USER_CLASS": "resources.authentication.ClaimsUser",
+}
+
+EXAM_PAPER_CACHE = {
+    "MAX_ENTRIES": 256,
+    "TIMEOUT": 60 * 60,
+}
+
+# 0 WORKERS CHECKS PASSWORDS INLINE IN THE REQUEST WORKER
+PASSWORD_CHECK_POOL = {
+    "WORKERS": int(os.environ.get('PASSWORD_CHECK_WORKERS', 2)),
+    "MAX_PENDING": int(os.environ.get('PASSWORD_CHECK_MAX_PENDING', 64)),
+    "TIMEOUT": 10,
+}
+
+ROSTER_IMPORT = {
+    "HASH_WORKERS": int(os.environ.get('ROSTER_HASH_WORKERS', os.cpu_count() or 1)),
+    "BATCH_SIZE": 1000,
+    "MAX_ROWS": 20000,
+}
+
+QUESTION_IMPORT = {
+    "CHUNK_SIZE": 2000,
+    "MAX_ERRORS": 1000,
+}
+
+# CLAIMS ARE ONLY CACHED IN A CACHE EVERY WORKER SEES, SEE users.helper.get_user_claims
+USER_CLAIMS_CACHE = {
+    "TIMEOUT": 60 * 60,
+    "SHARED": CACHES['default']['BACKEND'] not in [
+        'django.core.cache.backends.locmem.LocMemCache',
+        'django.core.cache.backends.dummy.DummyCache',
+    ],
+}
+
+LEADER_BOARD_PAGE = {
+    "DEFAULT_LIMIT": 50,
+    "MAX_LIMIT": 500,
+}
+
+KEYSET_PAGINATION = {
+    "PAGE_SIZE": 100,
+    "MAX_PAGE_SIZE": 1000,
+    "STREAM_CHUNK_SIZE": 2000,
+}
+
+# MAX SQL QUERIES PER REQUEST BY URL NAME, None TURNS THE CHECK OFF
+QUERY_BUDGET = {
+    "DEFAULT": 10,
+    "VIEWS": {
+        "topic": 5,
+        "PUT topic": 7,
+        "DELETE topic": 31,
+        "question": 4,
+        "GET question": 3,
+        "DELETE question": 11,
+        "quiz_set": 3,
+        "POST quiz_set": 12,
+        "PUT quiz_set": 14,
+        "DELETE quiz_set": 18,
+        "DELETE QuizAttemptViewSet": 12,
+        "POST QuizResponseViewSet": 17,
+        "QuizSetDetailsView": 1,
+        "get_quiz_set": 3,
+        "QuizAttemptResultView": 1,
+        "QuizResultViewSet": 2,
+        "QuizResultLeaderBoardView": 1,
+        "QuizResultLeaderBoardTopView": 2,
+        "token_refresh": 2,
+        "DELETE user-detail-delete": 40,
+        "question_import": None,
+        "user-import": None,
+    },
+    "LOG_FILE": os.environ.get('QUERY_BUDGET_LOG'),
+}
+
+# SANITIZED REQUEST RECORDS FOR replay_traffic AND diff_traffic, OFF WHEN NO LOG FILE IS SET
+TRAFFIC_CAPTURE = {
+    "LOG_FILE": os.environ.get('TRAFFIC_CAPTURE_LOG'),
+    "MAX_BODY_BYTES": 64 * 1024,
+}
+
+# PER-WORKER METRICS FILES ARE MERGED FROM DIR ON EVERY /metrics SCRAPE, UNSET KEEPS THEM IN THIS PROCESS.
+# /metrics ANSWERS ADMIN ACCESS TOKENS AND, WHEN SET, TOKEN AS A SCRAPER'S BEARER TOKEN
+METRICS = {
+    "DIR": os.environ.get('METRICS_DIR'),
+    "FLUSH_SECONDS": float(os.environ.get('METRICS_FLUSH_SECONDS', 1.0)),
+    "TOKEN": os.environ.get('METRICS_TOKEN'),
+}
+
+# Server-Timing HEADER ON EVERY RESPONSE, ?timing=true ALSO ADDS THE PHASES TO THE JSON ENVELOPE.
+# IT SHOWS QUERY COUNTS AND DB TIME TO EVERY CLIENT, SO OFF UNLESS DEBUG OR SERVER_TIMING_ENABLED=true
+SERVER_TIMING = {
+    "ENABLED": os.environ.get('SERVER_TIMING_ENABLED', 'true' if DEBUG else 'false') == 'true',
 }
@@ -0,0 +1,245 @@
+import threading
+from django.db.models import Count, F, OuterRef, Q, QuerySet, Subquery
+from django.db.models.functions import Coalesce
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save, pre_delete
+from django.dispatch import receiver
+from exam import grading
+from exam.models import QuizAttempt, UserAnswers
+from exam.signals import attempt_submitted
+from quiz import dashboard
+from quiz.models import Question, QuizSet, Topic
+from users.models import UserProfile
+
+
+def bump_quiz_set_versions(quiz_sets):
+    quiz_sets.update(version=F("version") + 1)
+
+
+# ROWS OF ONE delete() CALL, KEYED BY ITS origin, SEE track_delete
+_deletes = threading.local()
+
+
+def track_delete(model, origin):
+    # pre_delete, EVERY pre_delete OF A delete() CALL IS SENT BEFORE ITS FIRST post_delete
+    if not hasattr(_deletes, "pending"):
+        _deletes.pending = {}
+    batch = _deletes.pending.setdefault((model, id(origin)), {
+        "origin": origin,
+        "remaining": 0,
+        "values": set(),
+    })
+    batch["remaining"] += 1
+    return batch
+
+
+def finish_delete(model, origin):
+    # post_delete, THE VALUES COLLECTED FOR THE CALL ONCE ITS LAST ROW IS GONE, ELSE None
+    pending = getattr(_deletes, "pending", {})
+    batch = pending.get((model, id(origin)))
+    if batch is None:
+        return None
+    batch["remaining"] -= 1
+    if batch["remaining"]:
+        return None
+    del pending[(model, id(origin))]
+    return batch["values"]
+
+
+def tracked_delete(origin):
+    # A delete() THAT RAISES BETWEEN ITS pre_delete AND post_delete SIGNALS LEAVES ITS ROWS IN
+    # _deletes.pending, DROP THEM SO A LATER delete() ON THIS THREAD CAN NOT PICK THEM UP
+    try:
+        return origin.delete()
+    finally:
+        pending = getattr(_deletes, "pending", {})
+        for key in [key for key, batch in pending.items() if batch["origin"] is origin]:
+            del pending[key]
+
+
+def count_quiz_set_questions(quiz_sets, **fields):
+    question_counts = QuizSet.questions.through.objects.filter(
+        quizset_id=OuterRef("pk")
+    ).values("quizset_id").annotate(
+        total=Count("id")
+    ).values("total")[:1]
+    quiz_sets.update(question_count=Coalesce(Subquery(question_counts), 0), **fields)
+
+
+@receiver(post_save, sender=Question)
+def question_saved(sender, instance, created, **kwargs):
+    if not created:
+        bump_quiz_set_versions(QuizSet.objects.filter(questions=instance))
+
+
+def removed_questions(origin):
+    # THE QUESTIONS A delete() CALL STARTED FROM origin REMOVES, None WHEN NOT KNOWN UP FRONT
+    if isinstance(origin, QuerySet):
+        return origin if origin.model is Question else None
+    if isinstance(origin, Question):
+        return Question.objects.filter(id=origin.id)
+    if isinstance(origin, Topic):
+        return Question.objects.filter(topic=origin)
+    if isinstance(origin, UserProfile):
+        return Question.objects.filter(user=origin)
+    return None
+
+
+# HOW THE ANSWERS REMOVED BY DELETING A ROW OF EACH MODEL ARE REACHED FROM UserAnswers
+ANSWER_PATHS = {
+    Question: ["question"],
+    QuizAttempt: ["attempt"],
+    QuizSet: ["attempt__quiz_set"],
+    Topic: ["question__topic", "attempt__quiz_set__topic"],
+    UserProfile: ["question__user", "attempt__user", "attempt__quiz_set__user"],
+}
+
+
+def removed_answers(origin):
+    # THE ANSWERS A delete() CALL STARTED FROM origin REMOVES, None WHEN NOT KNOWN UP FRONT
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    if model not in ANSWER_PATHS:
+        return None
+    ids = origin.values("pk") if isinstance(origin, QuerySet) else [origin.pk]
+    condition = Q()
+    for path in ANSWER_PATHS[model]:
+        condition |= Q(**{f"{path}__in": ids})
+    return UserAnswers.objects.filter(condition)
+
+
+def subtract_removed_answers(batch, origin, instance_answers):
+    # pre_delete, THE QUESTION AND ATTEMPT CASCADES OF ONE CALL REMOVE THE SAME ANSWERS, SO ONCE PER CALL
+    answers = removed_answers(origin)
+    if answers is None:
+        grading.remove_answers_from_score_rollups(instance_answers)
+        return
+    batches = [_deletes.pending.get((model, id(origin))) for model in [Question, QuizAttempt]]
+    if any(found_batch and found_batch.get("rollups") for found_batch in batches):
+        return
+    batch["rollups"] = True
+    grading.remove_answers_from_score_rollups(answers)
+
+
+@receiver(pre_delete, sender=Question)
+def question_deleting(sender, instance, origin=None, **kwargs):
+    # THE CASCADE ON THE JOIN TABLE SENDS NO m2m_changed AND RUNS BEFORE ANY post_delete,
+    # SO THE QUIZ SETS ARE LOOKED UP HERE, ONCE FOR ALL QUESTIONS OF THE CALL WHEN POSSIBLE
+    batch = track_delete(Question, origin)
+    subtract_removed_answers(batch, origin, UserAnswers.objects.filter(question_id=instance.id))
+    questions = removed_questions(origin)
+    if questions is None:
+        questions = [instance.id]
+    elif batch["remaining"] > 1:
+        return
+    batch["values"].update(
+        QuizSet.questions.through.objects.filter(question__in=questions).values_list("quizset_id", flat=True)
+    )
+
+
+@receiver(post_delete, sender=Question)
+def question_deleted(sender, instance, origin=None, **kwargs):
+    quiz_set_ids = finish_delete(Question, origin)
+    if quiz_set_ids:
+        count_quiz_set_questions(QuizSet.objects.filter(id__in=quiz_set_ids), version=F("version") + 1)
+
+
+@receiver(post_save, sender=Topic)
+def topic_saved(sender, instance, created, **kwargs):
+    if not created:
+        bump_quiz_set_versions(QuizSet.objects.filter(topic=instance))
+
+
+@receiver(post_init, sender=QuizSet)
+def quiz_set_loaded(sender, instance, **kwargs):
+    # __dict__, READING A DEFERRED is_active WOULD LOAD IT
+    instance._counted_is_active = instance.__dict__.get("is_active")
+
+
+@receiver(post_save, sender=QuizSet)
+def quiz_set_counted(sender, instance, created, **kwargs):
+    keys = [dashboard.GLOBAL_KEY, dashboard.user_key(instance.user_id)]
+    if created:
+        dashboard.add_to_counters(keys, total_quizzes=1, active_quizzes=int(instance.is_active))
+    elif instance._counted_is_active is None:
+        # LOADED WITH is_active DEFERRED, THE OLD VALUE IS NOT KNOWN
+        dashboard.recount_field(keys, "active_quizzes")
+    else:
+        dashboard.add_to_counters(keys, active_quizzes=int(instance.is_active) - int(instance._counted_is_active))
+    instance._counted_is_active = instance.is_active
+
+
+@receiver(post_delete, sender=QuizSet)
+def quiz_set_uncounted(sender, instance, **kwargs):
+    dashboard.add_to_counters(
+        [dashboard.GLOBAL_KEY, dashboard.user_key(instance.user_id)],
+        total_quizzes=-1,
+        active_quizzes=-int(instance.is_active)
+    )
+
+
+@receiver(attempt_submitted)
+def student_counted(sender, attempt, **kwargs):
+    dashboard.count_student(attempt, attempt.quiz_set.user_id)
+
+
+@receiver(pre_delete, sender=QuizAttempt)
+def student_uncounting(sender, instance, origin=None, **kwargs):
+    batch = track_delete(QuizAttempt, origin)
+    subtract_removed_answers(batch, origin, UserAnswers.objects.filter(attempt_id=instance.id))
+    # ROWS OF A CASCADE ARE FRESH FROM THE DB, THE INSTANCE delete() WAS CALLED ON MAY BE STALE
+    if instance is origin:
+        submitted = QuizAttempt.objects.filter(id=instance.id, is_submitted=True).exists()
+    else:
+        submitted = instance.is_submitted
+    if submitted:
+        batch["values"].add((instance.user_id, instance.quiz_set_id))
+
+
+@receiver(post_delete, sender=QuizAttempt)
+def student_uncounted(sender, instance, origin=None, **kwargs):
+    removed = finish_delete(QuizAttempt, origin)
+    if not removed:
+        return
+    # A STUDENT STAYS COUNTED WHILE ANY OTHER SUBMISSION IS LEFT, GLOBALLY AND PER TEACHER
+    teachers = dict(QuizSet.objects.filter(
+        id__in={quiz_set_id for _, quiz_set_id in removed}
+    ).values_list("id", "user_id"))
+    pairs = {
+        (user_id, teachers[quiz_set_id])
+        for user_id, quiz_set_id in removed
+        if quiz_set_id in teachers and user_id != teachers[quiz_set_id]
+    }
+    students = {user_id for user_id, _ in removed}
+    left = QuizAttempt.objects.filter(user_id__in=students, is_submitted=True)
+    students -= set(left.values_list("user_id", flat=True))
+    if pairs:
+        pairs -= set(left.filter(
+            quiz_set__user_id__in={teacher_id for _, teacher_id in pairs}
+        ).values_list("user_id", "quiz_set__user_id"))
+    dashboard.add_to_counters([dashboard.GLOBAL_KEY], students_participated=-len(students))
+    for teacher_id in sorted({teacher_id for _, teacher_id in pairs}):
+        dashboard.add_to_counters(
+            [dashboard.user_key(teacher_id)],
+            students_participated=-sum(1 for _, pair_teacher in pairs if pair_teacher == teacher_id)
+        )
+
+
+@receiver(m2m_changed, sender=QuizSet.questions.through)
+def quiz_set_questions_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        # instance IS A QUESTION, pk_set HOLDS QUIZ SET IDS
+        if action == "pre_clear":
+            instance._cleared_quiz_set_ids = list(instance.in_quiz_sets.values_list("id", flat=True))
+        elif action == "post_clear":
+            count_quiz_set_questions(QuizSet.objects.filter(id__in=instance._cleared_quiz_set_ids))
+        elif action in ["post_add", "post_remove"]:
+            count_quiz_set_questions(QuizSet.objects.filter(id__in=pk_set))
+        return
+
+    if action == "post_add":
+        # pk_set ONLY HOLDS THE QUESTIONS THAT WERE NOT IN THE SET YET
+        QuizSet.objects.filter(id=instance.id).update(question_count=F("question_count") + len(pk_set))
+        instance.question_count += len(pk_set)
+    elif action in ["post_remove", "post_clear"]:
+        # pk_set OF A REMOVE IS WHAT WAS ASKED FOR, NOT WHAT WAS THERE, SO RECOUNT
+        count_quiz_set_questions(QuizSet.objects.filter(id=instance.id))
+        instance.refresh_from_db(fields=["question_count"])
@@ -0,0 +1,912 @@
+import importlib
+import json
+import os
+import tempfile
+import tracemalloc
+from io import StringIO
+from unittest import mock
+from django.apps import apps as django_apps
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.core.management.base import CommandError
+from django.test import LiveServerTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+from exam.models import QuizAttempt
+from exam.serializer import BulkUserAnswersSerializer
+from exam.tests import FAST_HASHER, RouteQueryCountMixin, benchmark, create_user, create_quiz_set, submission_payload
+from quiz import dashboard
+from quiz.seralizer import QuizSetSerializer
+from users.helper import get_tokens_for_user
+from quiz import helper, signals
+from quiz.models import DashboardCounter, Topic, Question, QuizSet
+from resources.custom_enums import QuestionDifficultyType, QuizSetType
+from resources import QuizExceptionHandler, UserType
+from resources.metrics import is_alive, registry
+from resources.query_budget import QueryBudgetExceeded, append_record
+from resources.traffic_capture import read_capture
+from users.password_pool import PasswordCheckPool
+
+
+class QuestionListTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = create_user("teacher", UserType.TEACHER.value)
+        cls.topic = Topic.objects.create(name="Python")
+        cls.quiz_set, cls.used_questions = create_quiz_set(cls.teacher, cls.topic, 3)
+        create_quiz_set(cls.teacher, cls.topic, 0, set_type="B")[0].questions.add(cls.used_questions[0])
+        Question.objects.create(
+            question_text="Unused",
+            option_a="a",
+            option_b="b",
+            correct_option="A",
+            topic=cls.topic,
+            difficulty_level="Easy",
+            user=cls.teacher
+        )
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.teacher)
+
+    def test_usage_and_counters(self):
+        response = self.client.get("/api/question")
+        data = response.json()["data"]
+
+        self.assertEqual(data["questionsCounterDetails"], {
+            "totalQuestions": 4,
+            "usedQuestions": 3,
+            "remainingQuestions": 1,
+        })
+        is_used = {item["id"]: item["is_used"] for item in data["questionsData"]}
+        self.assertEqual(
+            sorted(usage["set_type"] for usage in is_used[self.used_questions[0].id]),
+            ["A", "B"]
+        )
+        self.assertEqual(data["questionsData"][0]["topic"], self.topic.id)
+        self.assertEqual(is_used[max(is_used)], [])
+
+    def test_query_count_does_not_depend_on_bank_size(self):
+        # COUNTERS, PAGE, USAGE INDEX
+        with self.assertNumQueries(3):
+            self.client.get("/api/question")
+
+        create_quiz_set(self.teacher, self.topic, 50, set_type="C")
+        with self.assertNumQueries(3):
+            self.client.get("/api/question", {"topic": self.topic.id, "difficulty": "Easy"})
+
+
+def seed_quiz_sets(teacher, sets_count, questions_per_set=3):
+    combinations = [
+        (set_type, difficulty)
+        for set_type in QuizSetType.all_values()
+        for difficulty in QuestionDifficultyType.all_values()
+    ]
+    topics = Topic.objects.bulk_create([
+        Topic(name=f"Topic {index}")
+        for index in range(sets_count // len(combinations) + 1)
+    ])
+    quiz_sets = QuizSet.objects.bulk_create([
+        QuizSet(
+            topic=topics[index // len(combinations)],
+            set_type=combinations[index % len(combinations)][0],
+            difficulty_level=combinations[index % len(combinations)][1],
+            user=teacher,
+            question_count=questions_per_set
+        )
+        for index in range(sets_count)
+    ])
+    questions = Question.objects.bulk_create([
+        Question(
+            question_text=f"Question {index}",
+            option_a="a",
+            option_b="b",
+            correct_option="A",
+            topic=topics[0],
+            difficulty_level="Easy",
+            user=teacher
+        )
+        for index in range(questions_per_set)
+    ])
+    QuizSet.questions.through.objects.bulk_create([
+        QuizSet.questions.through(quizset_id=quiz_set.id, question_id=question.id)
+        for quiz_set in quiz_sets
+        for question in questions
+    ])
+    return quiz_sets
+
+
+class QuizSetDetailsReadPathTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = create_user("teacher", UserType.TEACHER.value)
+        cls.student = create_user("student")
+
+    def test_details_payload(self):
+        quiz_set = seed_quiz_sets(self.teacher, 2)[0]
+        QuizAttempt.objects.create(user=self.student, quiz_set=quiz_set)
+
+        data = helper.get_quiz_set_details(
+            helper.quiz_set_details_queryset(QuizSet.objects.order_by("id")),
+            self.student.id
+        )
+
+        self.assertEqual([item["is_completed"] for item in data], [True, False])
+        self.assertEqual(data[0]["topic_name"], quiz_set.topic.name)
+        self.assertEqual(data[0]["questions_count"], 3)
+        self.assertEqual(len(data[0]["questions"]), 3)
+
+    def test_query_count_at_1_10_and_1000_sets(self):
+        for sets_count in [1, 10, 1000]:
+            QuizSet.objects.all().delete()
+            Topic.objects.all().delete()
+            seed_quiz_sets(self.teacher, sets_count)
+            with self.subTest(sets_count=sets_count), self.assertNumQueries(3):
+                data = helper.get_quiz_set_details(
+                    helper.quiz_set_details_queryset(QuizSet.objects.all()),
+                    self.student.id
+                )
+            self.assertEqual(len(data), sets_count)
+
+
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = create_user("teacher", UserType.TEACHER.value)
+        seed_quiz_sets(cls.teacher, 7, questions_per_set=1)
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.teacher)
+
+    def test_walks_every_page_with_opaque_cursors(self):
+        seen = []
+        url = "/api/quiz-set?detail=true&page_size=3"
+        while url:
+            body = self.client.get(url).json()
+            seen.extend(item["quiz_set_id"] for item in body["data"])
+            self.assertLessEqual(len(body["data"]), 3)
+            url = body["next"]
+        self.assertEqual(seen, list(QuizSet.objects.order_by("id").values_list("id", flat=True)))
+
+    def test_page_size_is_capped(self):
+        with self.settings(KEYSET_PAGINATION={"PAGE_SIZE": 2, "MAX_PAGE_SIZE": 4}):
+            self.assertEqual(len(self.client.get("/api/quiz-set").json()["data"]), 2)
+            body = self.client.get("/api/quiz-set", {"page_size": 100}).json()
+        self.assertEqual(len(body["data"]), 4)
+        self.assertIn("cursor=", body["next"])
+
+    def test_invalid_cursor(self):
+        response = self.client.get("/api/quiz-set", {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, 406)
+
+
+
+class QuizSetValidationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = create_user("teacher", UserType.TEACHER.value)
+        cls.topic = Topic.objects.create(name="Python")
+        cls.other_topic = Topic.objects.create(name="Django")
+        cls.questions = Question.objects.bulk_create([
+            Question(
+                question_text=f"Question {index}",
+                option_a="a",
+                option_b="b",
+                correct_option="A",
+                topic=cls.topic,
+                difficulty_level="Easy",
+                user=cls.teacher
+            )
+            for index in range(100)
+        ])
+
+    def payload(self, question_ids):
+        return {
+            "topic": self.topic.id,
+            "set_type": "A",
+            "difficulty_level": "Easy",
+            "questions": question_ids
+        }
+
+    def test_validation_queries_do_not_depend_on_question_count(self):
+        for questions in [self.questions[:1], self.questions]:
+            serializer = QuizSetSerializer(data=self.payload([question.id for question in questions]))
+            # TOPIC, UNIQUE TOGETHER CHECK AND ONE QUERY FOR ALL QUESTIONS
+            with self.subTest(questions=len(questions)), self.assertNumQueries(3):
+                self.assertTrue(serializer.is_valid())
+
+    def test_every_mismatch_is_reported(self):
+        wrong_topic = Question.objects.create(
+            question_text="Other topic", option_a="a", option_b="b", correct_option="A",
+            topic=self.other_topic, difficulty_level="Easy", user=self.teacher
+        )
+        wrong_difficulty = Question.objects.create(
+            question_text="Hard", option_a="a", option_b="b", correct_option="A",
+            topic=self.topic, difficulty_level="Hard", user=self.teacher
+        )
+
+        serializer = QuizSetSerializer(data=self.payload([self.questions[0].id, wrong_topic.id, wrong_difficulty.id]))
+        with self.assertRaises(QuizExceptionHandler) as context:
+            serializer.is_valid()
+        self.assertIn(f"Questions [{wrong_topic.id}] do not belong", context.exception.error_msg)
+        self.assertIn(f"Difficulty mismatch for Questions [{wrong_difficulty.id}]", context.exception.error_msg)
+
+        serializer = QuizSetSerializer(data=self.payload([self.questions[0].id, 999998, 999999]))
+        self.assertFalse(serializer.is_valid())
+        self.assertIn("[999998, 999999]", str(serializer.errors["questions"]))
+
+    def test_create_and_list(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens_for_user(self.teacher)['access']}")
+        dashboard.get_dashboard_counters(self.teacher.id)
+
+        response = client.post("/api/quiz-set", self.payload([question.id for question in self.questions]), format="json")
+        self.assertEqual(response.status_code, 201)
+        quiz_set = QuizSet.objects.get()
+        self.assertEqual(quiz_set.questions.count(), 100)
+
+        create_quiz_set(self.teacher, self.other_topic, 5)
+        with self.assertNumQueries(2):
+            data = client.get("/api/quiz-set").json()["data"]
+        self.assertEqual([len(item["questions"]) for item in data], [100, 5])
+
+
+class TopicUpsertTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = create_user("teacher", UserType.TEACHER.value)
+        Topic.objects.create(name="Python")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.teacher)
+
+    def test_reports_created_and_existing_topics(self):
+        response = self.client.post(
+            "/api/topic",
+            {"topics": ["  python ", "Machine   Learning", "machine learning", "SQL"]},
+            format="json"
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"], {
+            "created": ["Machine Learning", "SQL"],
+            "existing": ["Python"],
+        })
+        self.assertEqual(Topic.objects.count(), 3)
+
+    def test_hundreds_of_topics_in_one_lookup_and_one_insert(self):
+        topics = [f"Topic {index}" for index in range(500)]
+        # SAVEPOINT PAIR, ONE LOOKUP, ONE INSERT, ONE RE-READ
+        with self.assertNumQueries(5):
+            response = self.client.post("/api/topic", {"topics": topics}, format="json")
+        self.assertEqual(len(response.json()["data"]["created"]), 500)
+
+    def test_rejects_names_longer_than_the_column(self):
+        response = self.client.post("/api/topic", {"topics": ["x" * 80]}, format="json")
+
+        self.assertEqual(response.status_code, 406)
+        self.assertFalse(Topic.objects.filter(name="x" * 80).exists())
+
+    def test_topic_added_by_a_concurrent_request_is_not_a_500(self):
+        Topic.objects.create(name="SQL")
+        annotate = Topic.objects.annotate
+        lookups = []
+
+        def stale_lookup(**kwargs):
+            # THE FIRST LOOKUP RAN BEFORE THE OTHER REQUEST COMMITTED "SQL"
+            lookups.append(kwargs)
+            return annotate(**kwargs).none() if len(lookups) == 1 else annotate(**kwargs)
+
+        with mock.patch.object(Topic.objects, "annotate", side_effect=stale_lookup), \
+                self.assertNoLogs("quiz.query_budget", "WARNING"):
+            response = self.client.post("/api/topic", {"topics": ["SQL", "Rust"]}, format="json")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Topic.objects.filter(name__in=["SQL", "Rust"]).count(), 2)
+
+
+class DashboardCounterTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = create_user("teacher", UserType.TEACHER.value)
+        cls.other_teacher = create_user("other-teacher", UserType.TEACHER.value)
+        cls.students = [create_user(f"student-{index}") for index in range(3)]
+        cls.topic = Topic.objects.create(name="Python")
+
+    def submit(self, user, quiz_set, questions):
+        attempt = QuizAttempt.objects.create(user=user, quiz_set=quiz_set)
+        _serializer = BulkUserAnswersSerializer(data=submission_payload(attempt, questions))
+        _serializer.is_valid(raise_exception=True)
+        _serializer.save()
+        return attempt
+
+    def assert_counters_match_recount(self):
+        for counter in DashboardCounter.objects.all():
+            self.assertEqual(
+                {field: getattr(counter, field) for field in dashboard.count_dashboard(counter.key)},
+                dashboard.count_dashboard(counter.key),
+                counter.key
+            )
+
+    def test_signals_keep_the_counters_exact(self):
+        first_set, first_questions = create_quiz_set(self.teacher, self.topic, 2)
+        second_set, second_questions = create_quiz_set(self.teacher, self.topic, 2, set_type="B")
+        other_set, other_questions = create_quiz_set(self.other_teacher, self.topic, 2, set_type="C")
+        first_set.is_active = True
+        first_set.save()
+
+        self.submit(self.students[0], first_set, first_questions)
+        self.submit(self.students[0], second_set, second_questions)
+        self.submit(self.students[1], other_set, other_questions)
+        self.submit(self.teacher, other_set, other_questions)
+        attempt = self.submit(self.students[2], second_set, second_questions)
+        self.assertEqual(DashboardCounter.objects.count(), 3)
+        self.assert_counters_match_recount()
+        self.assertEqual(DashboardCounter.objects.get(key=dashboard.GLOBAL_KEY).students_participated, 4)
+        self.assertEqual(DashboardCounter.objects.get(key=dashboard.user_key(self.teacher.id)).students_participated, 2)
+
+        attempt.delete()
+        first_set.delete()
+        self.assert_counters_match_recount()
+        self.assertEqual(DashboardCounter.objects.get(key=dashboard.user_key(self.teacher.id)).total_quizzes, 1)
+
+    def test_edits_and_deletes_apply_deltas_without_recounting(self):
+        quiz_set, questions = create_quiz_set(self.teacher, self.topic, 2)
+        self.submit(self.students[0], quiz_set, questions)
+        attempt = self.submit(self.students[1], quiz_set, questions)
+        loaded = QuizSet.objects.get(id=quiz_set.id)
+
+        with CaptureQueriesContext(connection) as context:
+            loaded.is_active = True
+            loaded.save()
+            loaded.save()
+            attempt.delete()
+        recounts = [query for query in context.captured_queries if "COUNT(*)" in query["sql"] or "COUNT(DISTINCT" in query["sql"]]
+        self.assertEqual(recounts, [])
+        self.assert_counters_match_recount()
+        self.assertEqual(DashboardCounter.objects.get(key=dashboard.GLOBAL_KEY).active_quizzes, 1)
+        self.assertEqual(DashboardCounter.objects.get(key=dashboard.GLOBAL_KEY).students_participated, 1)
+
+    def test_dashboard_is_one_read(self):
+        create_quiz_set(self.teacher, self.topic, 1)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens_for_user(self.teacher)['access']}")
+
+        with self.assertNumQueries(1):
+            data = client.get("/api/quiz-set-details").json()["data"]
+        self.assertEqual((data["totalQuizzes"], data["userTotalQuizzes"], data["activeQuizzes"]), (1, 1, 0))
+
+    def test_reconcile_fixes_drift(self):
+        create_quiz_set(self.teacher, self.topic, 1)
+        DashboardCounter.objects.filter(key=dashboard.GLOBAL_KEY).update(total_quizzes=42)
+
+        out = StringIO()
+        call_command("reconcile_dashboard_counters", stdout=out)
+        self.assertIn("1 fixed", out.getvalue())
+        self.assert_counters_match_recount()
+
+
+class QuestionCountTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = create_user("teacher", UserType.TEACHER.value)
+        cls.topic = Topic.objects.create(name="Python")
+
+    def setUp(self):
+        self.quiz_set, self.questions = create_quiz_set(self.teacher, self.topic, 4)
+
+    def stored_count(self, quiz_set=None):
+        return QuizSet.objects.values_list("question_count", flat=True).get(id=(quiz_set or self.quiz_set).id)
+
+    def test_forward_add_remove_and_clear(self):
+        self.assertEqual((self.quiz_set.question_count, self.stored_count()), (4, 4))
+
+        self.quiz_set.questions.add(*self.questions[:2])
+        self.assertEqual(self.stored_count(), 4)
+        self.quiz_set.questions.remove(self.questions[0], self.questions[0].id + 1000)
+        self.assertEqual((self.quiz_set.question_count, self.stored_count()), (3, 3))
+        self.quiz_set.questions.clear()
+        self.assertEqual((self.quiz_set.question_count, self.stored_count()), (0, 0))
+
+    def test_reverse_changes_and_question_delete(self):
+        other_set = create_quiz_set(self.teacher, self.topic, 0, set_type="B")[0]
+        question = self.questions[0]
+
+        question.in_quiz_sets.add(other_set)
+        self.assertEqual((self.stored_count(), self.stored_count(other_set)), (4, 1))
+        question.in_quiz_sets.remove(self.quiz_set)
+        self.assertEqual(self.stored_count(), 3)
+        question.in_quiz_sets.clear()
+        self.assertEqual(self.stored_count(other_set), 0)
+
+        self.questions[1].delete()
+        self.assertEqual(self.stored_count(), 2)
+
+    def test_failed_delete_leaves_nothing_pending(self):
+        with mock.patch("quiz.signals.subtract_removed_answers", side_effect=RuntimeError("delete failed")):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                signals.tracked_delete(self.questions[0])
+        self.assertEqual(signals._deletes.pending, {})
+        self.assertEqual(self.stored_count(), 4)
+
+        signals.tracked_delete(self.questions[1])
+        self.assertEqual(self.stored_count(), 3)
+
+    def test_cascaded_question_deletes(self):
+        other_set = create_quiz_set(self.teacher, self.topic, 0, set_type="B")[0]
+        other_set.questions.add(*self.questions[:3])
+        version = QuizSet.objects.get(id=self.quiz_set.id).version
+
+        # ONE LOOKUP AND ONE UPDATE FOR ALL QUIZ SETS OF THE CALL
+        with CaptureQueriesContext(connection) as context:
+            Question.objects.filter(id__in=[question.id for question in self.questions[:2]]).delete()
+        self.assertEqual(sum("UPDATE \"quiz_set\"" in query["sql"] for query in context.captured_queries), 1)
+        self.assertEqual((self.stored_count(), self.stored_count(other_set)), (2, 1))
+        self.assertEqual(QuizSet.objects.get(id=self.quiz_set.id).version, version + 1)
+
+        self.topic.delete()
+        self.assertFalse(QuizSet.objects.exists())
+
+    def test_update_quiz_set_keeps_the_count(self):
+        helper.update_quiz_set(self.quiz_set.id, {"questions": [question.id for question in self.questions[1:]]})
+        self.assertEqual(self.stored_count(), 3)
+
+    def test_backfill_migration(self):
+        QuizSet.objects.update(question_count=0)
+        backfill = importlib.import_module("quiz.migrations.0004_quizset_question_count").backfill_question_count
+        backfill(django_apps, None)
+        self.assertEqual(self.stored_count(), 4)
+
+
+def query_budget(views, default=None, log_file=None):
+    return {"DEFAULT": default, "VIEWS": views, "LOG_FILE": log_file}
+
+
+class QueryBudgetMiddlewareTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = create_user("teacher", UserType.TEACHER.value)
+        Topic.objects.create(name="Python")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.teacher)
+
+    def test_warns_over_budget(self):
+        with self.settings(QUERY_BUDGET=query_budget({"topic": 0})), \
+                self.assertLogs("quiz.query_budget", "WARNING") as logs:
+            self.assertEqual(self.client.get("/api/topic").status_code, 200)
+        self.assertIn("GET topic ran 1 queries, over its budget of 0", logs.output[0])
+
+    def test_raises_in_debug(self):
+        with self.settings(QUERY_BUDGET=query_budget({"topic": 0}), DEBUG=True):
+            with self.assertRaises(QueryBudgetExceeded), self.assertLogs("django.request", "ERROR"):
+                self.client.get("/api/topic")
+
+    def test_method_budget_wins_and_report(self):
+        log_file = os.path.join(tempfile.mkdtemp(), "queries.jsonl")
+        budgets = query_budget({"topic": 0, "GET topic": 1}, log_file=log_file)
+        with self.settings(QUERY_BUDGET=budgets), self.assertNoLogs("quiz.query_budget", "WARNING"):
+            self.client.get("/api/topic")
+            self.client.get("/api/topic")
+
+        out = StringIO()
+        with self.settings(QUERY_BUDGET=budgets):
+            call_command("query_budget_report", stdout=out)
+        row = [line for line in out.getvalue().splitlines() if line.startswith("GET topic")][0]
+        self.assertEqual(row.split()[2:7], ["2", "1.0", "1", "1", "0"])
+
+def capture_settings(log_file):
+    return {"LOG_FILE": log_file, "MAX_BODY_BYTES": 1024}
+
+
+def capture_traffic(log_file, teacher):
+    # A LOGIN, A JSON WRITE, A READ WITH QUERY PARAMS AND AN UPLOAD
+    with override_settings(TRAFFIC_CAPTURE=capture_settings(log_file)):
+        APIClient().post("/api/users/login", {"username": teacher.username, "password": "secret-password"}, format="json")
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens_for_user(teacher)['access']}")
+        client.post("/api/topic", {"topics": ["Rust"]}, format="json")
+        client.get("/api/quiz-set", {"difficulty": "Easy"})
+        client.post(
+            "/api/question/import",
+            {"file": SimpleUploadedFile("bank.csv", question_csv([["Q1", "a", "b", "", "", "A", "Python", "Easy"]]))},
+            format="multipart"
+        )
+
+
+class TrafficCaptureMixin:
+    def setUp(self):
+        self.teacher = create_user("teacher", UserType.TEACHER.value)
+        self.teacher.set_password("secret-password")
+        self.teacher.save()
+        Topic.objects.get_or_create(name="Python")
+        self.log_dir = tempfile.mkdtemp()
+        patcher = mock.patch(
+            "users.helper.get_password_pool",
+            return_value=PasswordCheckPool(workers=0, max_pending=0, timeout=30)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def log_path(self, name):
+        return os.path.join(self.log_dir, name)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHER)
+class TrafficCaptureTests(TrafficCaptureMixin, TestCase):
+    def test_records_are_sanitized(self):
+        log_file = self.log_path("capture.jsonl")
+        capture_traffic(log_file, self.teacher)
+
+        with open(log_file) as log:
+            self.assertNotIn("secret-password", log.read())
+        login, topic, quiz_sets, upload = read_capture(log_file)
+        self.assertEqual((login["route"], login["user"]), ("api/users/login", None))
+        self.assertEqual(login["body"], {"username": "teacher", "password": "***"})
+        self.assertEqual(
+            (topic["method"], topic["user"], topic["role"], topic["shape"], topic["queries"]),
+            ("POST", self.teacher.id, UserType.TEACHER.value, {"topics": ["str", 1]}, 5)
+        )
+        self.assertEqual(quiz_sets["query"], {"difficulty": "Easy"})
+        self.assertEqual((upload["body"], upload["shape"], upload["status"]), (None, "multipart", 200))
+
+    def test_diff_flags_more_queries(self):
+        def write_log(name, queries):
+            path = self.log_path(name)
+            for ms in [5, 6, 7]:
+                append_record(path, {"method": "GET", "route": "api/topic", "ms": ms, "queries": queries})
+            return path
+
+        base, new = write_log("base.jsonl", 1), write_log("new.jsonl", 3)
+        out = StringIO()
+        call_command("diff_traffic", base, new, stdout=out)
+        self.assertIn("REGRESSED", out.getvalue())
+        self.assertIn("1 of 1 routes regressed", out.getvalue())
+        call_command("diff_traffic", base, base, "--fail-on-regression", stdout=StringIO())
+        with self.assertRaises(CommandError):
+            call_command("diff_traffic", base, new, "--fail-on-regression", stdout=StringIO())
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHER)
+class TrafficReplayTests(TrafficCaptureMixin, LiveServerTestCase):
+    def test_replay_and_diff(self):
+        captured, replayed = self.log_path("captured.jsonl"), self.log_path("replayed.jsonl")
+        capture_traffic(captured, self.teacher)
+
+        out = StringIO()
+        with override_settings(TRAFFIC_CAPTURE=capture_settings(replayed)):
+            call_command("replay_traffic", captured, base_url=self.live_server_url, password="secret-password", stdout=out)
+        self.assertIn("Sent 3 requests", out.getvalue())
+        self.assertIn("Skipped 1: multipart body", out.getvalue())
+        self.assertNotIn("Status changed", out.getvalue())
+        self.assertEqual(
+            [record["route"] for record in read_capture(replayed)],
+            ["api/users/login", "api/topic", "api/quiz-set"]
+        )
+
+        out = StringIO()
+        call_command("diff_traffic", captured, replayed, stdout=out)
+        self.assertIn("POST api/question/import", out.getvalue())
+        self.assertIn("only in the base log", out.getvalue())
+
+
+def metric_lines(response, prefix):
+    return [line for line in response.content.decode().splitlines() if line.startswith(prefix)]
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHER, METRICS={"DIR": None, "FLUSH_SECONDS": 0, "TOKEN": "scrape-token"})
+class MetricsTests(TrafficCaptureMixin, TestCase):
+    def setUp(self):
+        super().setUp()
+        registry.reset()
+
+    def test_requests_logins_and_exam_events(self):
+        client = APIClient()
+        client.post("/api/users/login", {"username": "teacher", "password": "secret-password"}, format="json")
+        client.post("/api/users/login", {"username": "teacher", "password": "wrong"}, format="json")
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens_for_user(self.teacher)['access']}")
+        client.get("/api/topic")
+
+        student = create_user("student")
+        quiz_set, questions = create_quiz_set(self.teacher, Topic.objects.get(name="Python"), 2)
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens_for_user(student)['access']}")
+        client.post("/api/exam/attempt/", {
+            "user": student.id,
+            "quiz_set": quiz_set.id,
+            "start_at": "Mon, 01 Jan 2024 10:00:00 GMT",
+        }, format="json")
+        with self.captureOnCommitCallbacks(execute=True):
+            client.post(
+                "/api/exam/attempt/submit",
+                submission_payload(QuizAttempt.objects.get(user=student), questions),
+                format="json"
+            )
+
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer scrape-token")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(metric_lines(response, "quiz_logins_total"), [
+            'quiz_logins_total{result="success"} 1',
+            'quiz_logins_total{result="wrong_password"} 1',
+        ])
+        self.assertEqual(metric_lines(response, "quiz_attempts_started_total"), ["quiz_attempts_started_total 1"])
+        self.assertEqual(metric_lines(response, "quiz_submissions_graded_total"), ["quiz_submissions_graded_total 1"])
+        self.assertIn(
+            'quiz_http_request_duration_seconds_count{method="POST",status="406",view="login"} 1',
+            metric_lines(response, "quiz_http_request_duration_seconds_count")
+        )
+        self.assertIn(
+            'quiz_http_request_queries_bucket{method="GET",status="200",view="topic",le="1"} 1',
+            metric_lines(response, "quiz_http_request_queries_bucket")
+        )
+        self.assertIn(
+            'quiz_view_handler_duration_seconds_count{method="GET",status="200",view="TopicView"} 1',
+            metric_lines(response, "quiz_view_handler_duration_seconds_count")
+        )
+        self.assertEqual(len(metric_lines(response, "quiz_http_response_size_bytes_count")), 5)
+        self.assertEqual(metric_lines(response, "quiz_http_requests_in_flight"), [
+            'quiz_http_requests_in_flight{method="GET"} 1',
+            'quiz_http_requests_in_flight{method="POST"} 0',
+        ])
+
+    def test_only_the_scrape_token_and_admins_can_read(self):
+        admin = create_user("admin", UserType.ADMIN.value)
+        for authorization, status_code in [
+            (None, 403),
+            ("Bearer wrong-token", 403),
+            (f"Bearer {get_tokens_for_user(self.teacher)['access']}", 403),
+            (f"Bearer {get_tokens_for_user(admin)['access']}", 200),
+            ("Bearer scrape-token", 200),
+        ]:
+            headers = {"HTTP_AUTHORIZATION": authorization} if authorization else {}
+            self.assertEqual(self.client.get("/metrics", **headers).status_code, status_code, authorization)
+
+    def test_workers_are_merged_from_dir(self):
+        metrics_dir = tempfile.mkdtemp()
+        dead_pid = next(pid for pid in range(4194304, 0, -1) if not is_alive(pid))
+
+        def write_worker(pid, logins, in_flight):
+            with open(os.path.join(metrics_dir, f"metrics-{pid}.json"), "w") as metrics_file:
+                json.dump({
+                    "values": [
+                        ["quiz_logins_total", [["result", "success"]], logins],
+                        ["quiz_http_requests_in_flight", [["method", "GET"]], in_flight],
+                    ],
+                    "histograms": [
+                        ["quiz_http_request_queries", [["method", "GET"], ["status", 200], ["view", "topic"]], [0, 1, 0, 0, 0, 0, 0, 0, 0, 0, 1.0]],
+                    ],
+                }, metrics_file)
+
+        write_worker(dead_pid, logins=2, in_flight=5)
+        write_worker(os.getppid(), logins=3, in_flight=1)
+        registry.inc("quiz_logins_total", result="success")
+        with self.settings(METRICS={"DIR": metrics_dir, "FLUSH_SECONDS": 0, "TOKEN": "scrape-token"}):
+            response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer scrape-token")
+
+        self.assertTrue(os.path.exists(os.path.join(metrics_dir, f"metrics-{os.getpid()}.json")))
+        self.assertEqual(metric_lines(response, "quiz_logins_total"), ['quiz_logins_total{result="success"} 6'])
+        # THE DEAD WORKER'S 5 ARE DROPPED, THE SCRAPE ITSELF IS IN FLIGHT HERE
+        self.assertEqual(metric_lines(response, "quiz_http_requests_in_flight"), [
+            'quiz_http_requests_in_flight{method="GET"} 2',
+        ])
+        self.assertIn(
+            'quiz_http_request_queries_count{method="GET",status="200",view="topic"} 2',
+            metric_lines(response, "quiz_http_request_queries_count")
+        )
+
+
+def timing_entries(response):
+    # [(NAME, DESC)] OF THE Server-Timing HEADER, DURATIONS DROPPED
+    entries = []
+    for entry in response["Server-Timing"].split(", "):
+        parts = dict(part.split("=", 1) for part in entry.split(";")[1:])
+        entries.append((entry.split(";")[0], parts.get("desc", "").strip('"') or None))
+    return entries
+
+
+@override_settings(SERVER_TIMING={"ENABLED": True})
+class ServerTimingTests(TestCase):
+    def setUp(self):
+        self.teacher = create_user("teacher", UserType.TEACHER.value)
+        create_quiz_set(self.teacher, Topic.objects.create(name="Python"), 3)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens_for_user(self.teacher)['access']}")
+
+    def test_header_breaks_down_the_phases(self):
+        response = self.client.get("/api/quiz-set", {"detail": "true"})
+        self.assertEqual(timing_entries(response), [
+            ("auth", None),
+            ("serialize", "QuizSetDetailsSerializer"),
+            ("render", None),
+            ("db", "2 queries"),
+            ("total", None),
+        ])
+
+        response = self.client.post("/api/topic", {"topics": ["Go"]}, format="json")
+        self.assertIn(("validate", "TopicAddCheckSerializer"), timing_entries(response))
+
+    def test_envelope_timing_is_opt_in(self):
+        self.assertNotIn("timing", self.client.get("/api/topic").json())
+
+        timing = self.client.get("/api/topic", {"timing": "true"}).json()["timing"]
+        self.assertEqual(
+            [entry["name"] for entry in timing],
+            ["auth", "serialize", "db", "total"]
+        )
+        self.assertEqual(timing[1]["desc"], "TopicSerializer")
+
+    def test_disabled(self):
+        with self.settings(SERVER_TIMING={"ENABLED": False}):
+            response = self.client.get("/api/topic", {"timing": "true"})
+        self.assertFalse(response.has_header("Server-Timing"))
+        self.assertNotIn("timing", response.json())
+
+
+QUESTION_CSV_HEADER = "question_text,option_a,option_b,option_c,option_d,correct_option,topic,difficulty_level"
+
+
+def question_csv(rows):
+    return "\n".join([QUESTION_CSV_HEADER] + [",".join(row) for row in rows]).encode()
+
+
+class QuestionImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = create_user("teacher", UserType.TEACHER.value)
+        cls.python = Topic.objects.create(name="Python")
+        cls.django = Topic.objects.create(name="Django")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens_for_user(self.teacher)['access']}")
+
+    def upload(self, name, content):
+        return self.client.post(
+            "/api/question/import",
+            {"file": SimpleUploadedFile(name, content)},
+            format="multipart"
+        )
+
+    def test_csv_import_with_row_errors(self):
+        response = self.upload("bank.csv", question_csv([
+            ["Q1", "a", "b", "c", "d", "A", "Python", "Easy"],
+            ["Q2", "a", "b", "", "", "B", str(self.django.id), "Hard"],
+            ["Q3", "a", "b", "", "", "E", "Python", "Easy"],
+            ["Q4", "a", "b", "", "", "A", "Rust", "Easy"],
+            ["", "a", "b", "", "", "A", "Python", "Simple"],
+        ]))
+
+        report = response.json()["data"]
+        self.assertEqual((report["created"], report["failed"]), (2, 3))
+        self.assertEqual(
+            [(error["row"], sorted(error["errors"])) for error in report["errors"]],
+            [(4, ["correct_option"]), (5, ["topic"]), (6, ["difficulty_level", "question_text"])]
+        )
+        q2 = Question.objects.get(question_text="Q2")
+        self.assertEqual((q2.topic_id, q2.option_c, q2.user_id), (self.django.id, "N/A", self.teacher.id))
+
+    def test_queries_per_chunk_do_not_depend_on_rows(self):
+        content = "\n".join(
+            f'{{"question_text": "Q{index}", "option_a": "a", "option_b": "b", "correct_option": "A", '
+            f'"topic": "{"Python" if index % 2 else "Django"}", "difficulty_level": "Easy"}}'
+            for index in range(9)
+        ).encode()
+        # SAVEPOINT PAIR, ONE TOPIC LOOKUP AND ONE INSERT PER CHUNK OF 3
+        with self.settings(QUESTION_IMPORT={"CHUNK_SIZE": 3, "MAX_ERRORS": 10}), self.assertNumQueries(6):
+            response = self.upload("bank.jsonl", content)
+        self.assertEqual(response.json()["data"]["created"], 9)
+
+    def test_jsonl_values_of_the_wrong_type(self):
+        content = "\n".join(json.dumps(row) for row in [
+            {"question_text": "Q1", "option_a": "a", "option_b": "b", "correct_option": ["A"], "topic": "Python", "difficulty_level": "Easy"},
+            {"question_text": {"en": "Q2"}, "option_a": 1, "option_b": "b", "correct_option": "A", "topic": True, "difficulty_level": "Easy"},
+            {"question_text": "Q3", "option_a": "a", "option_b": "b", "correct_option": "A", "topic": self.python.id, "difficulty_level": "Easy"},
+        ]).encode()
+
+        response = self.upload("bank.jsonl", content)
+        self.assertEqual(response.status_code, 200)
+        report = response.json()["data"]
+        self.assertEqual((report["created"], report["failed"]), (1, 2))
+        self.assertEqual(
+            [(error["row"], sorted(error["errors"])) for error in report["errors"]],
+            [(1, ["correct_option"]), (2, ["option_a", "question_text", "topic"])]
+        )
+
+    def test_error_report_is_capped(self):
+        with self.settings(QUESTION_IMPORT={"CHUNK_SIZE": 3, "MAX_ERRORS": 2}):
+            report = self.upload("bank.csv", question_csv([["Q", "a", "b", "", "", "X", "Python", "Easy"]] * 5)).json()["data"]
+        self.assertEqual((report["failed"], len(report["errors"])), (5, 2))
+
+    def test_command(self):
+        with tempfile.NamedTemporaryFile("wb", suffix=".csv", delete=False) as bank:
+            bank.write(question_csv([["Q1", "a", "b", "", "", "A", "Python", "Easy"]]))
+        self.addCleanup(os.remove, bank.name)
+
+        out = StringIO()
+        call_command("import_questions", bank.name, user="teacher", stdout=out)
+        self.assertIn("1 questions imported", out.getvalue())
+
+
+@benchmark
+class QuestionImportBenchmark(TestCase):
+    def test_100k_questions(self):
+        teacher = create_user("teacher", UserType.TEACHER.value)
+        Topic.objects.create(name="Python")
+        with tempfile.NamedTemporaryFile("wb", suffix=".csv", delete=False) as bank:
+            bank.write((QUESTION_CSV_HEADER + "\n").encode())
+            for index in range(100000):
+                bank.write(f"Question {index},a,b,c,d,A,Python,Easy\n".encode())
+        self.addCleanup(os.remove, bank.name)
+
+        tracemalloc.start()
+        call_command("import_questions", bank.name, user=teacher.username, stdout=StringIO())
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        self.assertEqual(Question.objects.count(), 100000)
+        # CHUNKED, THE PEAK DOES NOT GROW WITH THE FILE
+        self.assertLess(peak, 32 * 2 ** 20)
+
+
+class QuizRouteQueries(RouteQueryCountMixin):
+    def test_topic_routes(self):
+        teacher = self.fixture.teacher
+        self.assert_route_queries(1, "get", "/api/topic", teacher)
+        self.assert_route_queries(1, "get", "/api/topic?flat=true", teacher)
+        self.assert_route_queries(5, "post", "/api/topic", teacher, {"topics": ["Rust", "python"]})
+        self.assert_route_queries(7, "put", f"/api/topic?id={self.fixture.topics[0].id}", teacher, {"topic": "Flask"})
+        self.assert_route_queries(30, "delete", f"/api/topic?id={self.fixture.topics[1].id}", teacher)
+        self.assert_route_queries(0, "get", "/api/topic/difficulty", teacher)
+        self.assert_route_queries(0, "get", "/api/topic/difficulty/set", teacher)
+
+    def test_question_routes(self):
+        teacher = self.fixture.teacher
+        self.assert_route_queries(3, "get", "/api/question", teacher)
+        self.assert_route_queries(1, "get", "/api/question?stream=true", teacher)
+        self.assert_route_queries(4, "post", "/api/question", teacher, {
+            "question_text": "New question",
+            "option_a": "a",
+            "option_b": "b",
+            "correct_option": "A",
+            "topic": self.fixture.topics[0].id,
+            "difficulty_level": "Easy",
+        })
+        self.assert_route_queries(11, "delete", f"/api/question?id={self.fixture.set_questions[0][0].id}", teacher)
+        self.assert_route_queries(
+            4, "post", "/api/question/import", teacher,
+            {"file": SimpleUploadedFile("bank.csv", question_csv([["Q1", "a", "b", "", "", "A", "Python", "Easy"]]))},
+            format="multipart"
+        )
+
+    def test_quiz_set_routes(self):
+        teacher = self.fixture.teacher
+        self.assert_route_queries(2, "get", "/api/quiz-set", teacher)
+        self.assert_route_queries(2, "get", "/api/quiz-set?detail=true", teacher)
+        # THE FIRST WRITE REBUILDS THE DASHBOARD COUNTERS
+        dashboard.get_dashboard_counters(teacher.id)
+        self.assert_route_queries(11, "post", "/api/quiz-set", teacher, {
+            "topic": self.fixture.topics[0].id,
+            "set_type": "D",
+            "difficulty_level": "Easy",
+            "questions": [question.id for question in self.fixture.open_questions],
+        }, status_code=201)
+        # THE PAYLOAD PASSES THE UNIQUE CHECK, ONLY THE QUESTIONS ARE UPDATED
+        self.assert_route_queries(14, "put", f"/api/quiz-set?id={self.fixture.quiz_sets[2].id}", teacher, {
+            "topic": self.fixture.topics[1].id,
+            "set_type": "C",
+            "difficulty_level": "Easy",
+            "questions": [question.id for question in self.fixture.set_questions[3]],
+        })
+        self.assert_route_queries(18, "delete", f"/api/quiz-set?id={self.fixture.quiz_sets[1].id}", teacher)
+        self.assert_route_queries(1, "get", "/api/quiz-set-details", teacher)
+
+
+class SmallQuizRouteQueryTests(QuizRouteQueries, TestCase):
+    fixture_size = "small"
+
+
+class LargeQuizRouteQueryTests(QuizRouteQueries, TestCase):
+    fixture_size = "large"
@@ -1,9 +1,11 @@
 from django.contrib import admin
 from django.urls import path, include
 from quiz import views
+from resources.metrics import metrics_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', metrics_view, name='metrics'),
     path('api/users/', include('users.urls')),
     path('api/exam/', include('exam.urls')),
 
@@ -11,6 +13,7 @@ urlpatterns = [
     path('api/topic/difficulty', views.get_topics_difficulty, name='difficulty'),
     path('api/topic/difficulty/set', views.get_set_details, name='set_details'),
     path('api/question', views.QuestionView.as_view(), name='question'),
+    path('api/question/import', views.QuestionImportView.as_view(), name='question_import'),
     path('api/quiz-set', views.QuizSetView.as_view(), name='quiz_set'),
     path('api/quiz-set-details', views.QuizSetDetailsView.as_view(), name='QuizSetDetailsView'),
 ]
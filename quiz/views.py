@@ -1,6 +1,7 @@
 from django.db import transaction
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 from resources import decode_access_token
@@ -8,13 +9,21 @@ from quiz import (
     helper,
     seralizer
 )
+from quiz.question_import import import_questions
 from resources import (
     response_builder,
-    QuizExceptionHandler
+    timed_view,
+    stream_response_builder,
+    check_export_role,
+    check_user_role,
+    is_stream_request,
+    iter_import_rows,
+    QuizExceptionHandler,
+    UserType
 )
-from users.models import UserProfile
 
 
+@timed_view
 class TopicView(APIView):
     permission_classes = [IsAuthenticated]
     def get(self, request, *args, **kwargs):
@@ -46,11 +55,10 @@ class TopicView(APIView):
                     status_code=status.HTTP_406_NOT_ACCEPTABLE
                 )
 
-            helper.add_topic(validated_data.data['topics'])
-
             return response_builder(
-                result="Topic added successfully",
-                status_code=status.HTTP_200_OK
+                result=helper.add_topic(validated_data.data['topics']),
+                status_code=status.HTTP_200_OK,
+                message="Topic added successfully"
             )
         except QuizExceptionHandler as e:
             return response_builder(
@@ -120,6 +128,7 @@ class TopicView(APIView):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@timed_view
 def get_topics_difficulty(request):
     try:
         return response_builder(
@@ -140,6 +149,7 @@ def get_topics_difficulty(request):
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
+@timed_view
 def get_set_details(request):
     try:
         return response_builder(
@@ -158,13 +168,19 @@ def get_set_details(request):
         )
 
 
+@timed_view
 class QuestionView(APIView):
     permission_classes = [IsAuthenticated]
     def get(self, request, *args, **kwargs):
         try:
+            if is_stream_request(request):
+                check_export_role(request)
+                return stream_response_builder(helper.export_questions(request))
+            data, page = helper.get_all_questions(request)
             return response_builder(
-                result=helper.get_all_questions(request),
-                status_code=status.HTTP_200_OK
+                result=data,
+                status_code=status.HTTP_200_OK,
+                page=page
             )
         except QuizExceptionHandler as e:
             return response_builder(
@@ -186,7 +202,7 @@ class QuestionView(APIView):
             validated_data = seralizer.QuestionSerializer(
                 data=request.data,
                 many=is_bulk,
-                context={"user": UserProfile.objects.get(id=user)}
+                context={"user": user}
             )
             if not validated_data.is_valid():
                 return response_builder(
@@ -233,6 +249,31 @@ class QuestionView(APIView):
             )
 
 
+@timed_view
+class QuestionImportView(APIView):
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+    def post(self, request):
+        try:
+            check_user_role(request, [UserType.ADMIN.value, UserType.TEACHER.value])
+            user_data = decode_access_token(request)
+            return response_builder(
+                result=import_questions(iter_import_rows(request), user_data.get("user_id")),
+                status_code=status.HTTP_200_OK
+            )
+        except QuizExceptionHandler as e:
+            return response_builder(
+                result=e.error_msg,
+                status_code=e.error_code
+            )
+        except Exception as e:
+            return response_builder(
+                result=str(e),
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+@timed_view
 class QuizSetView(APIView):
     permission_classes = [IsAuthenticated]
     def get(self, request, *args, **kwargs):
@@ -244,15 +285,14 @@ class QuizSetView(APIView):
             user = request.query_params.get("user", False)
 
             if in_detail in ["True", "true", "TRUE", "T", "1"]:
-                return response_builder(
-                    result=helper.get_all_quiz_sets_in_detail(q_set_id, difficulty_level, topic, user),
-                    status_code=status.HTTP_200_OK
-                )
+                data, page = helper.get_all_quiz_sets_in_detail(q_set_id, difficulty_level, topic, user, request)
             else:
-                return response_builder(
-                    result=helper.get_all_quiz_sets(q_set_id, difficulty_level, topic),
-                    status_code=status.HTTP_200_OK
-                )
+                data, page = helper.get_all_quiz_sets(q_set_id, difficulty_level, topic, request)
+            return response_builder(
+                result=data,
+                status_code=status.HTTP_200_OK,
+                page=page
+            )
         except QuizExceptionHandler as e:
             return response_builder(
                 result=e.error_msg,
@@ -343,6 +383,7 @@ class QuizSetView(APIView):
             )
 
 
+@timed_view
 class QuizSetDetailsView(APIView):
     def get(self, request, *args, **kwargs):
         try:
@@ -4,14 +4,39 @@ from .custom_enums import (
     QuestionDifficultyType,
 
 )
-from .custom_res_gen import response_builder
+from .custom_res_gen import response_builder, stream_response_builder
 from .custom_exception import QuizExceptionHandler
-from .token_decode import decode_access_token
+from .token_decode import (
+    decode_access_token,
+    check_user_role,
+    check_export_role,
+    is_stream_request
+)
+from .cache import TieredCache
+from .pagination import KeysetPage, paginate_by_id, iterate_by_id
+from .bulk_import import read_import_rows, iter_import_rows, iter_file_rows, chunked, import_report
+from .metrics import timed_view
+from .server_timing import timed_serializer
 __all__ = [
     'UserType',
     'QuestionType',
     'QuestionDifficultyType',
     'response_builder',
+    'stream_response_builder',
     'QuizExceptionHandler',
-    'decode_access_token'
+    'decode_access_token',
+    'check_user_role',
+    'check_export_role',
+    'is_stream_request',
+    'TieredCache',
+    'KeysetPage',
+    'paginate_by_id',
+    'iterate_by_id',
+    'read_import_rows',
+    'iter_import_rows',
+    'iter_file_rows',
+    'chunked',
+    'import_report',
+    'timed_view',
+    'timed_serializer'
 ]
\ No newline at end of file
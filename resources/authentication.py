@@ -0,0 +1,38 @@
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.models import TokenUser
+from resources.server_timing import phase
+
+
+class ClaimsUser(TokenUser):
+    # BUILT FROM THE CLAIMS ADDED BY users.helper.get_tokens_for_user, NO DB ROW
+
+    @cached_property
+    def email(self):
+        return self.token.get("email", "")
+
+    @cached_property
+    def first_name(self):
+        return self.token.get("firstName", "")
+
+    @cached_property
+    def last_name(self):
+        return self.token.get("lastName", "")
+
+    @cached_property
+    def name(self):
+        return self.token.get("name", "")
+
+    @cached_property
+    def role(self):
+        return self.token.get("role")
+
+
+class ClaimsJWTAuthentication(JWTStatelessUserAuthentication):
+    def authenticate(self, request):
+        with phase("auth"):
+            authenticated = super().authenticate(request)
+        if authenticated is not None:
+            # VERIFIED ONCE HERE, VIEWS READ request.token_claims INSTEAD OF DECODING AGAIN
+            request._request.token_claims = authenticated[1].payload
+        return authenticated
@@ -0,0 +1,110 @@
+import csv
+import io
+import json
+from itertools import islice
+from rest_framework import status
+from resources.custom_exception import QuizExceptionHandler
+
+IMPORT_FORMATS = ["csv", "jsonl"]
+
+
+def get_import_format(request, uploaded_file):
+    import_format = request.query_params.get("format")
+    if not import_format:
+        import_format = uploaded_file.name.rsplit(".", 1)[-1] if "." in uploaded_file.name else ""
+    import_format = import_format.lower()
+    if import_format not in IMPORT_FORMATS:
+        raise QuizExceptionHandler(
+            error_msg=f"Unsupported import format '{import_format}', expected one of {IMPORT_FORMATS}.",
+            error_code=status.HTTP_406_NOT_ACCEPTABLE
+        )
+    return import_format
+
+
+def iter_csv_rows(lines):
+    # ROW NUMBERS COUNT THE HEADER AS ROW 1, LIKE A SPREADSHEET
+    for row_number, row in enumerate(csv.DictReader(lines), start=2):
+        yield row_number, {
+            key.strip(): value.strip()
+            for key, value in row.items()
+            if key and value not in [None, ""]
+        }
+
+
+def iter_jsonl_rows(lines):
+    for row_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        if not isinstance(row, dict):
+            raise QuizExceptionHandler(
+                error_msg=f"Line {row_number} is not a JSON object.",
+                error_code=status.HTTP_406_NOT_ACCEPTABLE
+            )
+        yield row_number, row
+
+
+def iter_file_rows(binary_file, import_format):
+    # READS ONE LINE AT A TIME, MEMORY DOES NOT GROW WITH THE FILE
+    lines = io.TextIOWrapper(binary_file, encoding="utf-8-sig", newline="")
+    try:
+        if import_format == "csv":
+            yield from iter_csv_rows(lines)
+        else:
+            yield from iter_jsonl_rows(lines)
+    except UnicodeDecodeError:
+        raise QuizExceptionHandler(
+            error_msg="The file must be UTF-8 encoded.",
+            error_code=status.HTTP_406_NOT_ACCEPTABLE
+        )
+    finally:
+        lines.detach()
+
+
+def iter_import_rows(request):
+    uploaded_file = request.FILES.get("file")
+    if not uploaded_file:
+        raise QuizExceptionHandler(
+            error_msg="Upload the rows as a 'file' field.",
+            error_code=status.HTTP_406_NOT_ACCEPTABLE
+        )
+    import_format = get_import_format(request, uploaded_file)
+    uploaded_file.seek(0)
+    return iter_file_rows(uploaded_file.file, import_format)
+
+
+def read_import_rows(request, max_rows):
+    rows = []
+    for row in iter_import_rows(request):
+        rows.append(row)
+        if len(rows) > max_rows:
+            raise QuizExceptionHandler(
+                error_msg=f"The file has more than {max_rows} rows, at most {max_rows} can be imported at once.",
+                error_code=status.HTTP_406_NOT_ACCEPTABLE
+            )
+    if not rows:
+        raise QuizExceptionHandler(
+            error_msg="The file has no rows.",
+            error_code=status.HTTP_406_NOT_ACCEPTABLE
+        )
+    return rows
+
+
+def chunked(items, size):
+    items = iter(items)
+    while chunk := list(islice(items, size)):
+        yield chunk
+
+
+def import_report(created, errors, failed=None):
+    return {
+        "created": created,
+        "failed": len(errors) if failed is None else failed,
+        "errors": [
+            {"row": row_number, "errors": row_errors}
+            for row_number, row_errors in errors
+        ],
+    }
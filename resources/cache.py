@@ -0,0 +1,100 @@
+import threading
+from collections import OrderedDict
+from time import monotonic, sleep
+from django.core.cache import caches
+
+_MISSING = object()
+
+
+class TieredCache:
+    """
+    Two cache tiers: a per-process LRU in front of a Django cache shared by
+    all workers. Only one caller rebuilds a missing key: threads of a process
+    queue on a local lock, processes on a lock key in the shared cache.
+    """
+
+    def __init__(self, prefix, max_entries=256, timeout=3600, lock_timeout=10,
+                 wait_interval=0.05, cache_alias="default"):
+        self.prefix = prefix
+        self.max_entries = max_entries
+        self.timeout = timeout
+        self.lock_timeout = lock_timeout
+        self.wait_interval = wait_interval
+        self.cache_alias = cache_alias
+        self._local = OrderedDict()
+        self._local_lock = threading.Lock()
+        self._build_locks = {}
+
+    @property
+    def shared(self):
+        return caches[self.cache_alias]
+
+    def make_key(self, key):
+        return f"{self.prefix}:{key}"
+
+    def get_or_set(self, key, builder):
+        key = self.make_key(key)
+        value = self._get_local(key)
+        if value is not _MISSING:
+            return value
+
+        value = self.shared.get(key, _MISSING)
+        if value is not _MISSING:
+            self._set_local(key, value)
+            return value
+
+        with self._build_lock(key):
+            value = self._get_local(key)
+            if value is _MISSING:
+                value = self._get_shared_or_build(key, builder)
+                self._set_local(key, value)
+        with self._local_lock:
+            self._build_locks.pop(key, None)
+        return value
+
+    def delete(self, key):
+        key = self.make_key(key)
+        with self._local_lock:
+            self._local.pop(key, None)
+        self.shared.delete(key)
+
+    def clear(self):
+        with self._local_lock:
+            self._local.clear()
+
+    def _get_shared_or_build(self, key, builder):
+        lock_key = f"{key}:lock"
+        deadline = monotonic() + self.lock_timeout
+        while True:
+            value = self.shared.get(key, _MISSING)
+            if value is not _MISSING:
+                return value
+            if self.shared.add(lock_key, 1, self.lock_timeout):
+                try:
+                    value = builder()
+                    self.shared.set(key, value, self.timeout)
+                    return value
+                finally:
+                    self.shared.delete(lock_key)
+            if monotonic() >= deadline:
+                # THE OTHER BUILDER IS STUCK, DO NOT KEEP THE REQUEST WAITING
+                return builder()
+            sleep(self.wait_interval)
+
+    def _build_lock(self, key):
+        with self._local_lock:
+            return self._build_locks.setdefault(key, threading.Lock())
+
+    def _get_local(self, key):
+        with self._local_lock:
+            value = self._local.get(key, _MISSING)
+            if value is not _MISSING:
+                self._local.move_to_end(key)
+            return value
+
+    def _set_local(self, key, value):
+        with self._local_lock:
+            self._local[key] = value
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_entries:
+                self._local.popitem(last=False)
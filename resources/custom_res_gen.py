@@ -1,16 +1,52 @@
+from django.http import StreamingHttpResponse
 from django.utils.timezone import now
 from rest_framework import status
 from rest_framework.response import Response
+from rest_framework.utils.encoders import JSONEncoder
+from resources.server_timing import current_timing
 
 
-def response_builder(result=None, status_code=status.HTTP_200_OK, message=""):
+def response_builder(result=None, status_code=status.HTTP_200_OK, message="", page=None):
     if result is None:
         result = []
+    payload = {
+        "data": result,
+        "status_code": status_code,
+        "message": message,
+        "time_stamp": now()
+    }
+    if page is not None:
+        payload["next"] = page.next_link
+    timing = current_timing()
+    if timing is not None and timing.in_envelope:
+        # PHASES SO FAR, RENDERING HAS NOT STARTED YET
+        payload["timing"] = timing.envelope()
     return Response(
-        {"data": result,
-         "status_code": status_code,
-         "message": message,
-         "time_stamp": now()
-         },
+        payload,
         status=status_code
-    )
\ No newline at end of file
+    )
+
+
+def stream_response_builder(rows, status_code=status.HTTP_200_OK, message=""):
+    # SAME ENVELOPE AS response_builder, WRITTEN ONE CHUNK OF ROWS AT A TIME
+    encoder = JSONEncoder()
+
+    def envelope():
+        yield '{"data": ['
+        separator = ""
+        for chunk in rows:
+            if not chunk:
+                continue
+            yield separator + ",".join(encoder.encode(row) for row in chunk)
+            separator = ","
+        yield '], "status_code": %s, "message": %s, "time_stamp": %s}' % (
+            encoder.encode(status_code),
+            encoder.encode(message),
+            encoder.encode(now())
+        )
+
+    return StreamingHttpResponse(
+        envelope(),
+        status=status_code,
+        content_type="application/json"
+    )
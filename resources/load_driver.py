@@ -0,0 +1,39 @@
+import json
+from time import perf_counter
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+from resources.metrics import percentile
+
+
+def timed_request(url, data=None, token=None, method=None):
+    # (STATUS, SECONDS, PARSED BODY), STATUS 0 WHEN THE SERVER COULD NOT BE REACHED
+    headers = {"Content-Type": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    request = Request(
+        url,
+        data=json.dumps(data).encode() if data is not None else None,
+        headers=headers,
+        method=method
+    )
+    started = perf_counter()
+    try:
+        with urlopen(request) as response:
+            body = response.read()
+            status_code = response.status
+    except HTTPError as e:
+        body = e.read()
+        status_code = e.code
+    except URLError:
+        body = b""
+        status_code = 0
+    elapsed = perf_counter() - started
+    try:
+        payload = json.loads(body) if body else None
+    except ValueError:
+        payload = None
+    return status_code, elapsed, payload
+
+
+def percentile_ms(seconds, percent):
+    return percentile(seconds, percent) * 1000
@@ -0,0 +1,281 @@
+import functools
+import hmac
+import json
+import os
+import threading
+from bisect import bisect_left
+from time import monotonic, perf_counter
+from django.conf import settings
+from django.db import connection
+from django.http import HttpResponse
+from rest_framework.views import APIView
+from rest_framework_simplejwt.exceptions import TokenBackendError
+from resources.custom_enums import UserType
+from resources.query_budget import QueryRecorder
+from resources.token_decode import decode_access_token, get_token_from_request
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (100, 1000, 10000, 100000, 1000000, 10000000)
+
+# NAME: (TYPE, HELP, BUCKETS)
+METRICS = {
+    "quiz_http_requests_in_flight": ("gauge", "Requests being handled right now.", None),
+    "quiz_http_request_duration_seconds": ("histogram", "Time from the first middleware to the response.", LATENCY_BUCKETS),
+    "quiz_http_request_queries": ("histogram", "SQL queries run by a request.", QUERY_BUCKETS),
+    "quiz_http_response_size_bytes": ("histogram", "Body size of non-streaming responses.", SIZE_BUCKETS),
+    "quiz_view_handler_duration_seconds": ("histogram", "Time spent inside an APIView handler method.", LATENCY_BUCKETS),
+    "quiz_attempts_started_total": ("counter", "Quiz attempts started.", None),
+    "quiz_submissions_graded_total": ("counter", "Quiz submissions graded.", None),
+    "quiz_logins_total": ("counter", "Login attempts by result.", None),
+}
+
+FILE_PREFIX = "metrics-"
+
+
+class MetricsRegistry:
+    """
+    Counters, gauges and histograms of this process. With METRICS["DIR"] set
+    every worker writes its values to "<DIR>/metrics-<pid>.json" at most once
+    per METRICS["FLUSH_SECONDS"], and collect() adds up the files of all
+    workers. Gauges of workers that are gone are left out, their counters
+    and histograms are kept.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.values = {}
+        self.histograms = {}
+        self.flushed_at = 0.0
+        self.dirty = False
+
+    def inc(self, name, amount=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+            self.dirty = True
+
+    def dec(self, name, amount=1, **labels):
+        self.inc(name, -amount, **labels)
+
+    def observe(self, name, value, **labels):
+        buckets = METRICS[name][2]
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            # ONE SLOT PER BUCKET PLUS +Inf, THEN THE SUM
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = [0] * (len(buckets) + 1) + [0.0]
+            histogram[bisect_left(buckets, value)] += 1
+            histogram[-1] += value
+            self.dirty = True
+
+    def reset(self):
+        with self.lock:
+            self.values.clear()
+            self.histograms.clear()
+            self.dirty = True
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "values": [[name, labels, value] for (name, labels), value in self.values.items()],
+                "histograms": [[name, labels, histogram[:]] for (name, labels), histogram in self.histograms.items()],
+            }
+
+    def flush(self, force=False):
+        directory = settings.METRICS["DIR"]
+        if not directory or not (self.dirty or force):
+            return
+        if not force and monotonic() - self.flushed_at < settings.METRICS["FLUSH_SECONDS"]:
+            return
+        self.flushed_at = monotonic()
+        self.dirty = False
+        path = os.path.join(directory, f"{FILE_PREFIX}{os.getpid()}.json")
+        # WRITE THEN RENAME, A SCRAPE NEVER READS HALF A FILE
+        with open(f"{path}.tmp", "w") as metrics_file:
+            json.dump(self.snapshot(), metrics_file, separators=(",", ":"))
+        os.replace(f"{path}.tmp", path)
+
+    def collect(self):
+        directory = settings.METRICS["DIR"]
+        if not directory:
+            return [(self.snapshot(), True)]
+        self.flush(force=True)
+        snapshots = []
+        for file_name in os.listdir(directory):
+            if not (file_name.startswith(FILE_PREFIX) and file_name.endswith(".json")):
+                continue
+            try:
+                with open(os.path.join(directory, file_name)) as metrics_file:
+                    snapshot = json.load(metrics_file)
+            except (OSError, ValueError):
+                continue
+            snapshots.append((snapshot, is_alive(int(file_name[len(FILE_PREFIX):-len(".json")]))))
+        return snapshots
+
+
+def is_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def merge(snapshots):
+    values = {}
+    histograms = {}
+    for snapshot, alive in snapshots:
+        for name, labels, value in snapshot["values"]:
+            if METRICS[name][0] == "gauge" and not alive:
+                continue
+            key = (name, tuple(tuple(label) for label in labels))
+            values[key] = values.get(key, 0) + value
+        for name, labels, histogram in snapshot["histograms"]:
+            key = (name, tuple(tuple(label) for label in labels))
+            if key in histograms:
+                histograms[key] = [total + value for total, value in zip(histograms[key], histogram)]
+            else:
+                histograms[key] = histogram
+    return values, histograms
+
+
+def percentile(values, percent):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(int(len(values) * percent / 100), len(values) - 1)]
+
+
+def format_labels(labels, **extra):
+    labels = list(labels) + list(extra.items())
+    if not labels:
+        return ""
+    escaped = (
+        (key, str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+        for key, value in labels
+    )
+    return "{" + ",".join(f'{key}="{value}"' for key, value in escaped) + "}"
+
+
+def format_number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render(snapshots):
+    # PROMETHEUS TEXT FORMAT 0.0.4
+    values, histograms = merge(snapshots)
+    lines = []
+    for name, (metric_type, help_text, buckets) in METRICS.items():
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        if metric_type != "histogram":
+            for (key_name, labels), value in sorted(values.items()):
+                if key_name == name:
+                    lines.append(f"{name}{format_labels(labels)} {format_number(value)}")
+            continue
+        for (key_name, labels), histogram in sorted(histograms.items()):
+            if key_name != name:
+                continue
+            cumulative = 0
+            for bound, count in zip(list(buckets) + ["+Inf"], histogram[:-1]):
+                cumulative += count
+                lines.append(f"{name}_bucket{format_labels(labels, le=bound)} {cumulative}")
+            lines.append(f"{name}_sum{format_labels(labels)} {format_number(histogram[-1])}")
+            lines.append(f"{name}_count{format_labels(labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+
+def is_admin(request):
+    try:
+        return decode_access_token(request).get("role") == UserType.ADMIN.value
+    except TokenBackendError:
+        return False
+
+
+def metrics_view(request):
+    # A SCRAPER SENDS METRICS["TOKEN"] AS ITS BEARER TOKEN, PEOPLE AN ADMIN ACCESS TOKEN
+    token = get_token_from_request(request)
+    scrape_token = settings.METRICS["TOKEN"]
+    if not (token and (scrape_token and hmac.compare_digest(token, scrape_token) or is_admin(request))):
+        return HttpResponse("Forbidden", status=403, content_type="text/plain; charset=utf-8")
+    return HttpResponse(render(registry.collect()), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+def timed_view(view):
+    """
+    Times the handler methods of an APIView class, or an @api_view function,
+    into quiz_view_handler_duration_seconds, labeled by view, method and status.
+    """
+    if not isinstance(view, type):
+        return _timed_handler(view.__name__, view)
+    for method in view.http_method_names:
+        handler = getattr(view, method, None)
+        # THE OPTIONS HANDLER EVERY APIView INHERITS IS NOT WORTH A SERIES
+        if handler is not None and handler is not getattr(APIView, method, None):
+            setattr(view, method, _timed_handler(view.__name__, handler))
+    return view
+
+
+def _timed_handler(view, handler):
+    @functools.wraps(handler)
+    def wrapper(*args, **kwargs):
+        # (self, request) FOR METHODS, (request,) FOR FUNCTIONS
+        request = args[1] if len(args) > 1 else args[0]
+        started = perf_counter()
+        status_code = 500
+        try:
+            response = handler(*args, **kwargs)
+            status_code = response.status_code
+            return response
+        finally:
+            registry.observe(
+                "quiz_view_handler_duration_seconds",
+                perf_counter() - started,
+                view=view,
+                method=request.method,
+                status=status_code
+            )
+    return wrapper
+
+
+class MetricsMiddleware:
+    """
+    Records latency, in-flight requests, query count and response size of
+    every request, labeled by the resolved URL name. Unresolved paths share
+    the "unmatched" label so scanners can not grow the registry.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        started = perf_counter()
+        # THE URL NAME IS ONLY KNOWN AFTER ROUTING, THE GAUGE IS LABELED BY METHOD
+        registry.inc("quiz_http_requests_in_flight", method=request.method)
+        try:
+            with connection.execute_wrapper(recorder):
+                response = self.get_response(request)
+        finally:
+            registry.dec("quiz_http_requests_in_flight", method=request.method)
+        elapsed = perf_counter() - started
+
+        resolver_match = getattr(request, "resolver_match", None)
+        labels = {
+            "view": resolver_match.view_name if resolver_match else "unmatched",
+            "method": request.method,
+            "status": response.status_code,
+        }
+        registry.observe("quiz_http_request_duration_seconds", elapsed, **labels)
+        registry.observe("quiz_http_request_queries", recorder.queries, **labels)
+        if not response.streaming:
+            registry.observe("quiz_http_response_size_bytes", len(response.content), **labels)
+        registry.flush()
+        return response
@@ -0,0 +1,89 @@
+import base64
+import binascii
+import json
+from dataclasses import dataclass
+from django.conf import settings
+from rest_framework import status
+from resources.custom_exception import QuizExceptionHandler
+
+
+@dataclass
+class KeysetPage:
+    items: list
+    next_cursor: str = None
+    next_link: str = None
+
+
+def encode_cursor(last_id):
+    return base64.urlsafe_b64encode(
+        json.dumps({"id": last_id}).encode()
+    ).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        last_id = json.loads(base64.urlsafe_b64decode(padded.encode()))["id"]
+        if not isinstance(last_id, int):
+            raise ValueError(last_id)
+        return last_id
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        raise QuizExceptionHandler(
+            error_msg=f"Invalid cursor '{cursor}'.",
+            error_code=status.HTTP_406_NOT_ACCEPTABLE
+        )
+
+
+def get_page_size(query_params):
+    page_size = query_params.get("page_size", settings.KEYSET_PAGINATION["PAGE_SIZE"])
+    try:
+        page_size = int(page_size)
+    except (TypeError, ValueError):
+        raise QuizExceptionHandler(
+            error_msg=f"Invalid page size '{page_size}'.",
+            error_code=status.HTTP_406_NOT_ACCEPTABLE
+        )
+    if page_size <= 0:
+        raise QuizExceptionHandler(
+            error_msg="The page size must be positive.",
+            error_code=status.HTTP_406_NOT_ACCEPTABLE
+        )
+    return min(page_size, settings.KEYSET_PAGINATION["MAX_PAGE_SIZE"])
+
+
+def paginate_by_id(queryset, request):
+    page_size = get_page_size(request.query_params)
+    cursor = request.query_params.get("cursor")
+    if cursor:
+        queryset = queryset.filter(id__gt=decode_cursor(cursor))
+
+    # ONE EXTRA ROW TELLS IF THERE IS A NEXT PAGE
+    items = list(queryset.order_by("id")[:page_size + 1])
+    if len(items) <= page_size:
+        return KeysetPage(items=items)
+
+    items = items[:page_size]
+    last = items[-1]
+    next_cursor = encode_cursor(last["id"] if isinstance(last, dict) else last.id)
+    query_params = request.query_params.copy()
+    query_params["cursor"] = next_cursor
+    return KeysetPage(
+        items=items,
+        next_cursor=next_cursor,
+        next_link=request.build_absolute_uri(f"{request.path}?{query_params.urlencode()}")
+    )
+
+
+def iterate_by_id(queryset, chunk_size=None):
+    # CONSTANT MEMORY ON EVERY BACKEND, mysqlclient BUFFERS A WHOLE .iterator() RESULT
+    chunk_size = chunk_size or settings.KEYSET_PAGINATION["STREAM_CHUNK_SIZE"]
+    last_id = 0
+    while True:
+        chunk = list(queryset.filter(id__gt=last_id).order_by("id")[:chunk_size])
+        if not chunk:
+            return
+        yield chunk
+        if len(chunk) < chunk_size:
+            return
+        last = chunk[-1]
+        last_id = last["id"] if isinstance(last, dict) else last.id
@@ -0,0 +1,107 @@
+import json
+import logging
+import threading
+from time import perf_counter
+from django.conf import settings
+from django.db import connection
+from django.utils.timezone import now
+
+logger = logging.getLogger("quiz.query_budget")
+
+_log_lock = threading.Lock()
+
+SQL_PREVIEW_LENGTH = 500
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryRecorder:
+    def __init__(self):
+        self.queries = 0
+        self.total_seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_sql = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = perf_counter() - started
+            self.queries += 1
+            self.total_seconds += elapsed
+            if elapsed >= self.slowest_seconds:
+                self.slowest_seconds = elapsed
+                self.slowest_sql = sql[:SQL_PREVIEW_LENGTH]
+
+
+def get_budget(method, view_name):
+    # "POST quiz_set" WINS OVER "quiz_set", WHICH WINS OVER THE DEFAULT
+    budgets = settings.QUERY_BUDGET
+    for key in [f"{method} {view_name}", view_name]:
+        if key in budgets["VIEWS"]:
+            return budgets["VIEWS"][key]
+    return budgets["DEFAULT"]
+
+
+def append_record(log_file, record):
+    # ONE JSON OBJECT PER LINE, THE LOCK KEEPS LINES OF CONCURRENT REQUESTS WHOLE
+    with _log_lock, open(log_file, "a") as log:
+        log.write(json.dumps(record, separators=(",", ":")) + "\n")
+
+
+def write_record(record):
+    log_file = settings.QUERY_BUDGET["LOG_FILE"]
+    if not log_file:
+        return
+    append_record(log_file, record)
+
+
+class QueryBudgetMiddleware:
+    """
+    Counts the SQL run by each request and checks it against the budget of
+    the resolved URL name in settings.QUERY_BUDGET. Queries run while a
+    streaming response is consumed happen after this returns and are not
+    counted.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+
+        resolver_match = getattr(request, "resolver_match", None)
+        if resolver_match is None:
+            return response
+
+        # NAMESPACED, "login" IS BOTH THE API LOGIN AND "admin:login"
+        view_name = resolver_match.view_name
+        budget = get_budget(request.method, view_name)
+        record = {
+            "view": view_name,
+            "method": request.method,
+            "path": request.path,
+            "status": response.status_code,
+            "queries": recorder.queries,
+            "db_ms": round(recorder.total_seconds * 1000, 3),
+            "slowest_ms": round(recorder.slowest_seconds * 1000, 3),
+            "slowest_sql": recorder.slowest_sql,
+            "budget": budget,
+            "time": now().isoformat(),
+        }
+        write_record(record)
+
+        if budget is not None and recorder.queries > budget:
+            message = (
+                f"{request.method} {view_name} ran {recorder.queries} queries, "
+                f"over its budget of {budget}. Slowest: {recorder.slowest_sql}"
+            )
+            if settings.DEBUG:
+                raise QueryBudgetExceeded(message)
+            logger.warning(message)
+        return response
@@ -0,0 +1,118 @@
+import functools
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+from django.conf import settings
+from django.db import connection
+from rest_framework.renderers import JSONRenderer
+from resources.query_budget import QueryRecorder
+
+# ?timing=true ALSO PUTS THE PHASES IN THE response_builder ENVELOPE
+ENVELOPE_PARAM = "timing"
+
+_timings = threading.local()
+
+
+class ServerTiming:
+    def __init__(self, in_envelope=False):
+        self.started = perf_counter()
+        self.recorder = QueryRecorder()
+        self.in_envelope = in_envelope
+        # (NAME, DESC): SECONDS, IN THE ORDER THE PHASES FIRST RAN
+        self.phases = {}
+        self.running = set()
+
+    def add(self, name, seconds, desc=None):
+        key = (name, desc)
+        self.phases[key] = self.phases.get(key, 0.0) + seconds
+
+    def entries(self):
+        # DB TIME OVERLAPS THE PHASES THAT RAN THE QUERIES, LAZY QUERYSETS RUN WHILE SERIALIZING
+        entries = [(name, desc, seconds) for (name, desc), seconds in self.phases.items()]
+        entries.append(("db", f"{self.recorder.queries} queries", self.recorder.total_seconds))
+        entries.append(("total", None, perf_counter() - self.started))
+        return entries
+
+    def header(self):
+        return ", ".join(
+            f'{name};desc="{desc}";dur={seconds * 1000:.3f}' if desc else f"{name};dur={seconds * 1000:.3f}"
+            for name, desc, seconds in self.entries()
+        )
+
+    def envelope(self):
+        return [
+            {"name": name, "desc": desc, "ms": round(seconds * 1000, 3)}
+            for name, desc, seconds in self.entries()
+        ]
+
+
+def current_timing():
+    return getattr(_timings, "current", None)
+
+
+@contextmanager
+def phase(name, desc=None):
+    # A NO-OP OUTSIDE A REQUEST, AND INSIDE A PHASE OF THE SAME NAME (NESTED SERIALIZERS)
+    timing = current_timing()
+    if timing is None or name in timing.running:
+        yield
+        return
+    timing.running.add(name)
+    started = perf_counter()
+    try:
+        yield
+    finally:
+        timing.running.discard(name)
+        timing.add(name, perf_counter() - started, desc)
+
+
+def timed_serializer(serializer_class):
+    """
+    Times is_valid() as "validate" and to_representation() as "serialize",
+    described by the serializer class name.
+    """
+    name = serializer_class.__name__
+    for method, phase_name in [("is_valid", "validate"), ("to_representation", "serialize")]:
+        setattr(serializer_class, method, _timed_method(getattr(serializer_class, method), phase_name, name))
+    return serializer_class
+
+
+def _timed_method(method, phase_name, desc):
+    @functools.wraps(method)
+    def wrapper(*args, **kwargs):
+        with phase(phase_name, desc):
+            return method(*args, **kwargs)
+    return wrapper
+
+
+class TimedJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with phase("render"):
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+class ServerTimingMiddleware:
+    """
+    Adds a Server-Timing header to every response: the auth, validate,
+    serialize and render phases timed inside the request, plus its DB time
+    and total. Streaming responses get the phases up to their first byte.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.SERVER_TIMING["ENABLED"]:
+            return self.get_response(request)
+
+        timing = ServerTiming(
+            in_envelope=request.GET.get(ENVELOPE_PARAM, False) in ["True", "true", "TRUE", "T", "1"]
+        )
+        _timings.current = timing
+        try:
+            with connection.execute_wrapper(timing.recorder):
+                response = self.get_response(request)
+        finally:
+            _timings.current = None
+        response["Server-Timing"] = timing.header()
+        return response
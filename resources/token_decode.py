@@ -3,6 +3,8 @@ from rest_framework_simplejwt.backends import TokenBackend
 from rest_framework_simplejwt.exceptions import TokenError
 from quiz import settings
 from resources import QuizExceptionHandler
+from resources.custom_enums import UserType
+from resources.server_timing import phase
 
 
 def get_token_from_request(request):
@@ -13,6 +15,9 @@ def get_token_from_request(request):
 
 
 def decode_access_token(request):
+    claims = getattr(request, "token_claims", None)
+    if claims is not None:
+        return claims
     try:
         token = get_token_from_request(request)
         if not token:
@@ -21,7 +26,26 @@ def decode_access_token(request):
                 error_code=status.HTTP_401_UNAUTHORIZED,
             )
         token_backend = TokenBackend(algorithm='HS256', signing_key=settings.SECRET_KEY)
-        decoded_data = token_backend.decode(token, verify=True)
+        with phase("auth"):
+            decoded_data = token_backend.decode(token, verify=True)
         return decoded_data
     except TokenError as e:
         return {"error": "Invalid token", "details": str(e)}
+
+
+def check_user_role(request, allowed_roles):
+    role = decode_access_token(request).get("role")
+    if role not in allowed_roles:
+        raise QuizExceptionHandler(
+            error_msg=f"The role '{role}' is not allowed to do this.",
+            error_code=status.HTTP_403_FORBIDDEN,
+        )
+    return role
+
+
+def check_export_role(request):
+    return check_user_role(request, [UserType.ADMIN.value, UserType.TEACHER.value])
+
+
+def is_stream_request(request):
+    return request.query_params.get("stream", False) in ["True", "true", "TRUE", "T", "1"]
@@ -0,0 +1,120 @@
+import json
+from time import perf_counter
+from django.conf import settings
+from django.db import connection
+from django.utils.timezone import now
+from resources.query_budget import QueryRecorder, append_record
+
+REDACTED = "***"
+
+# PASSWORDS, TOKENS AND PERSONAL DATA NEVER REACH THE LOG
+SENSITIVE_FIELDS = frozenset([
+    "password",
+    "refresh",
+    "access",
+    "token",
+    "email",
+    "first_name",
+    "last_name",
+    "contact_no",
+    "age",
+    "gender",
+])
+
+
+def sanitize(value):
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if str(key).lower() in SENSITIVE_FIELDS else sanitize(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [sanitize(item) for item in value]
+    return value
+
+
+def body_shape(value):
+    # {"quiz_user_response": [{"questionId": "int", ...}, 20]}, LISTS GIVE THEIR FIRST ITEM AND LENGTH
+    if isinstance(value, dict):
+        return {key: body_shape(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [body_shape(value[0]), len(value)] if value else []
+    return type(value).__name__
+
+
+def read_body(request):
+    # ONLY JSON BODIES ARE KEPT, UPLOADS ARE STREAMED AND NEVER READ INTO MEMORY HERE
+    if request.content_type == "multipart/form-data":
+        return None, "multipart"
+    if request.content_type != "application/json":
+        return None, None
+    if int(request.META.get("CONTENT_LENGTH") or 0) > settings.TRAFFIC_CAPTURE["MAX_BODY_BYTES"]:
+        return None, "too large"
+    try:
+        body = json.loads(request.body or b"null")
+    except ValueError:
+        return None, "invalid json"
+    return sanitize(body), body_shape(body)
+
+
+class TrafficCaptureMiddleware:
+    """
+    Appends one sanitized record per API request to TRAFFIC_CAPTURE["LOG_FILE"]:
+    route, query params, JSON body, user, status, latency and query count.
+    replay_traffic sends a log to another instance, diff_traffic compares the
+    logs the two instances wrote.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        log_file = settings.TRAFFIC_CAPTURE["LOG_FILE"]
+        if not log_file:
+            return self.get_response(request)
+
+        body, shape = read_body(request)
+        recorder = QueryRecorder()
+        started = perf_counter()
+        with connection.execute_wrapper(recorder):
+            response = self.get_response(request)
+        elapsed = perf_counter() - started
+
+        resolver_match = getattr(request, "resolver_match", None)
+        if resolver_match is None or resolver_match.route.startswith("admin/"):
+            return response
+
+        # DRF PUTS THE AUTHENTICATED USER ON THE DJANGO REQUEST
+        user = getattr(request, "user", None)
+        is_authenticated = bool(user and user.is_authenticated)
+        append_record(log_file, {
+            "time": now().isoformat(),
+            "method": request.method,
+            "route": resolver_match.route,
+            "view": resolver_match.view_name,
+            "path": request.path,
+            "query": sanitize({key: request.GET.get(key) for key in request.GET}),
+            "body": body,
+            "shape": shape,
+            "user": int(user.id) if is_authenticated else None,
+            "role": getattr(user, "role", None) if is_authenticated else None,
+            "status": response.status_code,
+            "ms": round(elapsed * 1000, 3),
+            "queries": recorder.queries,
+        })
+        return response
+
+
+def read_capture(log_file):
+    with open(log_file) as log:
+        for line in log:
+            if line.strip():
+                yield json.loads(line)
+
+
+def is_redacted(value):
+    if isinstance(value, dict):
+        return any(is_redacted(item) for item in value.values())
+    if isinstance(value, list):
+        return any(is_redacted(item) for item in value)
+    return value == REDACTED
@@ -1,22 +1,68 @@
 from rest_framework import status
 from rest_framework_simplejwt.tokens import RefreshToken
 from resources import QuizExceptionHandler
+from resources.metrics import registry
+from resources.server_timing import phase
+from users.password_pool import get_password_pool
+from django.conf import settings
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 User = get_user_model()
 
+def build_user_claims(user):
+    return {
+        'username': user.username,
+        'email': user.email,
+        'firstName': user.first_name,
+        'lastName': user.last_name,
+        'name': f"{user.first_name} {user.last_name}",
+        'gender': user.gender,
+        'age': user.age,
+        'contactNo': user.contact_no,
+        'role': user.role,
+    }
+
+
+def user_claims_key(user_id):
+    return f"user-claims:{user_id}"
+
+
+def cache_user_claims(user):
+    cached = {
+        'claims': build_user_claims(user),
+        'is_active': user.is_active,
+    }
+    if settings.USER_CLAIMS_CACHE["SHARED"]:
+        cache.set(user_claims_key(user.id), cached, settings.USER_CLAIMS_CACHE["TIMEOUT"])
+    return cached
+
+
+def get_user_claims(user_id):
+    # THE SIGNALS ONLY CLEAR THE CACHE OF THEIR OWN WORKER, A PER-PROCESS CACHE WOULD KEEP
+    # A DEACTIVATED USER REFRESHING, SO WITHOUT A SHARED CACHE EVERY REFRESH READS THE ROW
+    if settings.USER_CLAIMS_CACHE["SHARED"]:
+        cached = cache.get(user_claims_key(user_id))
+        if cached is not None:
+            return cached
+    user = User.objects.filter(id=user_id).first()
+    if not user:
+        return None
+    return cache_user_claims(user)
+
+
+def invalidate_user_claims(user_id):
+    cache.delete(user_claims_key(user_id))
+
+
+def add_user_claims(token, claims):
+    for claim, value in claims.items():
+        token[claim] = value
+    return token
+
+
 def get_tokens_for_user(user):
     refresh = RefreshToken.for_user(user)
-
-    access_token = refresh.access_token
-    access_token['username'] = user.username
-    access_token['email'] = user.email
-    access_token['firstName'] = user.first_name
-    access_token['lastName'] = user.last_name
-    access_token['name'] = f"{user.first_name} {user.last_name}"
-    access_token['gender'] = user.gender
-    access_token['age'] = user.age
-    access_token['contactNo'] = user.contact_no
-    access_token['role'] = user.role
+    access_token = add_user_claims(refresh.access_token, cache_user_claims(user)['claims'])
 
     return {
         'access': str(access_token),
@@ -27,16 +73,26 @@ def login(username, password):
     user = User.objects.filter(username=username).first()
 
     if not user:
+        registry.inc("quiz_logins_total", result="unknown_user")
         raise QuizExceptionHandler(
             error_msg=f"User with username '{username}' does not exist.",
             error_code=status.HTTP_404_NOT_FOUND,
         )
 
     # NOW CHECK THE PASSWORD
-    if not user.check_password(password):
+    with phase("auth", "password check"):
+        is_correct, must_update = get_password_pool().check(password, user.password)
+    if not is_correct:
+        registry.inc("quiz_logins_total", result="wrong_password")
         raise QuizExceptionHandler(
             error_msg=f"Incorrect password. Please try again.",
             error_code=status.HTTP_406_NOT_ACCEPTABLE,
         )
 
+    if must_update:
+        # NEW ITERATION COUNT OR HASHER, AS check_password's setter WOULD
+        user.set_password(password)
+        user.save(update_fields=["password"])
+
+    registry.inc("quiz_logins_total", result="success")
     return get_tokens_for_user(user)
@@ -0,0 +1,109 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter, sleep
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from resources import UserType
+from resources.load_driver import timed_request, percentile_ms
+from users.helper import get_tokens_for_user
+from users.models import UserProfile
+
+
+class Command(BaseCommand):
+    help = (
+        "Fire a burst of concurrent logins at a running server while probing an exam endpoint, "
+        "and report the login p99 and the probe latency before and during the burst."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--base-url", default="http://127.0.0.1:8000")
+        parser.add_argument("--logins", type=int, default=500)
+        parser.add_argument("--concurrency", type=int, default=50)
+        parser.add_argument("--password", default="loadtest-password")
+        parser.add_argument(
+            "--reset-passwords",
+            action="store_true",
+            help="Set --password on loadtest-* users that already exist, they are left as they are otherwise."
+        )
+        parser.add_argument("--probe-path", default="/api/exam/leaderboard/top")
+        parser.add_argument("--baseline-seconds", type=float, default=3.0)
+
+    def handle(self, *args, **options):
+        base_url = options["base_url"].rstrip("/")
+        usernames = [f"loadtest-{index}" for index in range(options["logins"])]
+        kept = self.create_users(usernames, options["password"], options["reset_passwords"])
+        if kept:
+            self.stdout.write(self.style.WARNING(
+                f"{kept} loadtest-* users already exist and keep their passwords, "
+                f"pass --reset-passwords to set them to --password."
+            ))
+
+        probe_user = UserProfile.objects.get(username=usernames[0])
+        probe_token = get_tokens_for_user(probe_user)["access"]
+        probe_url = f"{base_url}{options['probe_path']}"
+        probe = {"baseline": [], "burst": []}
+        phase = {"name": "baseline"}
+        stop = threading.Event()
+
+        def run_probe():
+            while not stop.is_set():
+                probe[phase["name"]].append(timed_request(probe_url, token=probe_token)[1])
+                sleep(0.01)
+
+        probe_thread = threading.Thread(target=run_probe, daemon=True)
+        probe_thread.start()
+        sleep(options["baseline_seconds"])
+        phase["name"] = "burst"
+
+        login_url = f"{base_url}/api/users/login"
+        started = perf_counter()
+        with ThreadPoolExecutor(max_workers=options["concurrency"]) as executor:
+            results = list(executor.map(
+                lambda username: timed_request(
+                    login_url,
+                    data={"username": username, "password": options["password"]}
+                ),
+                usernames
+            ))
+        elapsed = perf_counter() - started
+        stop.set()
+        probe_thread.join()
+
+        statuses = {}
+        for status_code, _, _ in results:
+            statuses[status_code] = statuses.get(status_code, 0) + 1
+        durations = [duration for _, duration, _ in results]
+
+        self.stdout.write(f"{len(results)} logins in {elapsed:.2f}s ({len(results) / elapsed:.0f}/s), statuses {statuses}")
+        self.stdout.write(
+            f"login     p50 {percentile_ms(durations, 50):.1f} ms  p99 {percentile_ms(durations, 99):.1f} ms"
+        )
+        for name in ["baseline", "burst"]:
+            self.stdout.write(
+                f"probe {name:<8} p50 {percentile_ms(probe[name], 50):.1f} ms  "
+                f"p99 {percentile_ms(probe[name], 99):.1f} ms  ({len(probe[name])} requests)"
+            )
+
+    def create_users(self, usernames, password, reset_passwords=False):
+        # THE NUMBER OF EXISTING USERS WHOSE PASSWORD WAS LEFT ALONE
+        existing = set(
+            UserProfile.objects.filter(username__in=usernames).values_list("username", flat=True)
+        )
+        # ONE HASH FOR EVERY LOAD TEST USER, HASHING IS WHAT THE SERVER IS TESTED ON
+        encoded = make_password(password)
+        UserProfile.objects.bulk_create([
+            UserProfile(
+                username=username,
+                email=f"{username}@loadtest.local",
+                first_name="Load",
+                last_name="Test",
+                role=UserType.STUDENT.value,
+                password=encoded
+            )
+            for username in usernames
+            if username not in existing
+        ])
+        if not reset_passwords:
+            return len(existing)
+        UserProfile.objects.filter(username__in=existing).update(password=encoded)
+        return 0
@@ -0,0 +1,145 @@
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, TimeoutError
+from concurrent.futures.process import BrokenProcessPool
+from time import perf_counter
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password, verify_password
+from rest_framework import status
+from resources import QuizExceptionHandler
+from resources.metrics import percentile
+
+
+def _init_worker():
+    # NO-OP WHEN FORKED FROM A READY PROCESS, NEEDED WITH THE spawn START METHOD
+    django.setup()
+
+
+def _verify_password(password, encoded):
+    # (IS CORRECT, MUST UPDATE), THE WORKER CAN NOT SAVE AN UPGRADED HASH, THE CALLER DOES
+    return verify_password(password, encoded)
+
+
+def hash_passwords(passwords, workers):
+    # ONE SHORT-LIVED POOL PER IMPORT, THE LOGIN POOL STAYS FREE FOR LOGINS
+    if not workers or len(passwords) < 2:
+        return [make_password(password) for password in passwords]
+    workers = min(workers, len(passwords))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        return list(executor.map(make_password, passwords, chunksize=max(len(passwords) // (workers * 4), 1)))
+
+
+class PasswordCheckPool:
+    """
+    Runs the PBKDF2 check of a login in a small process pool so it does not
+    hold the request worker. At most max_pending checks wait for the pool,
+    the next login gets a 503 right away instead of queueing.
+    """
+
+    def __init__(self, workers, max_pending, timeout, samples=1000):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._checked = 0
+        self._rejected = 0
+        self._timed_out = 0
+        self._durations = deque(maxlen=samples)
+
+    def check(self, password, encoded):
+        if not self.workers:
+            return self._timed(_verify_password, password, encoded)
+
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._rejected += 1
+                raise QuizExceptionHandler(
+                    error_msg="Too many logins in progress. Please try again shortly.",
+                    error_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                )
+            self._pending += 1
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+            executor = self._executor
+
+        future = None
+        try:
+            future = executor.submit(_verify_password, password, encoded)
+            # THE SLOT IS FREED WHEN THE WORKER IS DONE, cancel() CAN NOT STOP A TIMED OUT CHECK
+            future.add_done_callback(self._release)
+            return self._timed(future.result, self.timeout)
+        except BrokenProcessPool:
+            # A WORKER DIED (OOM KILL), THE NEXT CHECK STARTS A FRESH POOL
+            with self._lock:
+                if self._executor is executor:
+                    self._executor = None
+            executor.shutdown(wait=False)
+            raise QuizExceptionHandler(
+                error_msg="Login is unavailable right now. Please try again shortly.",
+                error_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        except TimeoutError:
+            future.cancel()
+            with self._lock:
+                self._timed_out += 1
+            raise QuizExceptionHandler(
+                error_msg="Login timed out. Please try again shortly.",
+                error_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        finally:
+            if future is None:
+                # submit() FAILED, NO WORKER TOOK THE CHECK
+                self._release()
+
+    def _release(self, future=None):
+        with self._lock:
+            self._pending -= 1
+
+    def stats(self):
+        with self._lock:
+            durations = list(self._durations)
+            return {
+                "workers": self.workers,
+                "max_pending": self.max_pending,
+                "pending": self._pending,
+                "checked": self._checked,
+                "rejected": self._rejected,
+                "timed_out": self._timed_out,
+                "p50_ms": round(percentile(durations, 50) * 1000, 1),
+                "p99_ms": round(percentile(durations, 99) * 1000, 1),
+                "max_ms": round(max(durations, default=0.0) * 1000, 1),
+            }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def _timed(self, func, *args):
+        # TIME INCLUDES THE WAIT FOR A FREE WORKER
+        started = perf_counter()
+        result = func(*args)
+        with self._lock:
+            self._checked += 1
+            self._durations.append(perf_counter() - started)
+        return result
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_password_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = PasswordCheckPool(
+                workers=settings.PASSWORD_CHECK_POOL["WORKERS"],
+                max_pending=settings.PASSWORD_CHECK_POOL["MAX_PENDING"],
+                timeout=settings.PASSWORD_CHECK_POOL["TIMEOUT"],
+            )
+        return _pool
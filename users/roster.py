@@ -0,0 +1,76 @@
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.db.models.functions import Lower
+from rest_framework.exceptions import ValidationError
+from resources import UserType, chunked, import_report
+from users.models import UserProfile
+from users.password_pool import hash_passwords
+from users.seralizer import RosterRowSerializer
+
+
+def find_existing(field, values):
+    # BATCHED SET LOOKUPS, ONE QUERY PER BATCH_SIZE VALUES, __in ALONE IS CASE-SENSITIVE
+    existing = set()
+    for chunk in chunked(sorted({value.lower() for value in values}), settings.ROSTER_IMPORT["BATCH_SIZE"]):
+        existing.update(
+            UserProfile.objects.annotate(
+                lowered=Lower(field)
+            ).filter(
+                lowered__in=chunk
+            ).values_list("lowered", flat=True)
+        )
+    return existing
+
+
+def validate_roster(rows):
+    row_serializer = RosterRowSerializer()
+    valid_rows = []
+    errors = []
+    for row_number, row in rows:
+        try:
+            valid_rows.append((row_number, row_serializer.run_validation(row)))
+        except ValidationError as e:
+            errors.append((row_number, e.detail))
+
+    existing = {
+        field: find_existing(field, [data[field] for _, data in valid_rows])
+        for field in ["username", "email"]
+    }
+    seen = {"username": set(), "email": set()}
+    unique_rows = []
+    for row_number, data in valid_rows:
+        row_errors = {}
+        for field in ["username", "email"]:
+            value = data[field].lower()
+            if value in existing[field]:
+                row_errors[field] = [f"A user with this {field} already exists."]
+            elif value in seen[field]:
+                row_errors[field] = [f"The {field} is repeated in an earlier row."]
+            seen[field].add(value)
+        if row_errors:
+            errors.append((row_number, row_errors))
+        else:
+            unique_rows.append(data)
+    return unique_rows, sorted(errors, key=lambda error: error[0])
+
+
+def import_roster(rows):
+    unique_rows, errors = validate_roster(rows)
+
+    # ROWS WITHOUT A PASSWORD GET AN UNUSABLE ONE, SET LATER THROUGH A RESET
+    passwords = [data.pop("password", None) for data in unique_rows]
+    given = [password for password in passwords if password]
+    hashed = iter(hash_passwords(given, settings.ROSTER_IMPORT["HASH_WORKERS"]))
+    users = [
+        UserProfile(
+            role=UserType.STUDENT.value,
+            password=next(hashed) if password else make_password(None),
+            **data
+        )
+        for data, password in zip(unique_rows, passwords)
+    ]
+
+    with transaction.atomic():
+        UserProfile.objects.bulk_create(users, batch_size=settings.ROSTER_IMPORT["BATCH_SIZE"])
+    return import_report(len(users), errors)
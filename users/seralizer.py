@@ -1,10 +1,15 @@
+from django.contrib.auth.validators import UnicodeUsernameValidator
 from rest_framework import serializers
 from rest_framework_simplejwt.serializers import TokenRefreshSerializer
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
 
-from users import models
+from resources import timed_serializer
+from users import helper, models
 
 
+@timed_serializer
 class UserProfileSerializer(serializers.ModelSerializer):
     name = serializers.SerializerMethodField(read_only=True)
 
@@ -38,27 +43,53 @@ class UserProfileSerializer(serializers.ModelSerializer):
         return user
 
 
+@timed_serializer
+class RosterRowSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = models.UserProfile
+        fields = [
+            'username',
+            'email',
+            'password',
+            'first_name',
+            'last_name',
+            'gender',
+            'age',
+            'contact_no'
+        ]
+        # UNIQUENESS IS CHECKED FOR THE WHOLE ROSTER AT ONCE IN users.roster
+        extra_kwargs = {
+            'username': {'validators': [UnicodeUsernameValidator()]},
+            'email': {'validators': []},
+            'password': {'write_only': True, 'required': False}
+        }
+
+
+@timed_serializer
 class UserLoginSerializer(serializers.Serializer):
     username = serializers.CharField(required=True)
     password = serializers.CharField(required=True)
 
+@timed_serializer
 class CustomTokenRefreshSerializer(TokenRefreshSerializer):
     def validate(self, attrs):
-        data = super().validate(attrs)
-        refresh = RefreshToken(attrs['refresh'])
-
-        user = models.UserProfile.objects.get(id=refresh['user_id'])
+        # ROTATION AND BLACKLISTING STAY WITH simplejwt, IT ALSO CHECKS THE USER ROW
+        try:
+            data = super().validate(attrs)
+        except models.UserProfile.DoesNotExist:
+            raise AuthenticationFailed(
+                self.error_messages['no_active_account'],
+                'no_active_account',
+            )
+        access_token = AccessToken(data['access'])
 
-        access_token = refresh.access_token
-        access_token['username'] = user.username
-        access_token['email'] = user.email
-        access_token['firstName'] = user.first_name
-        access_token['lastName'] = user.last_name
-        access_token['name'] = f"{user.first_name} {user.last_name}"
-        access_token['gender'] = user.gender
-        access_token['age'] = user.age
-        access_token['contactNo'] = user.contact_no
-        access_token['role'] = user.role
+        # THE CLAIMS COME FROM THE CLAIMS CACHE
+        cached = helper.get_user_claims(access_token.payload.get(api_settings.USER_ID_CLAIM))
+        if not cached or not cached['is_active']:
+            raise AuthenticationFailed(
+                self.error_messages['no_active_account'],
+                'no_active_account',
+            )
 
-        data['access'] = str(access_token)
+        data['access'] = str(helper.add_user_claims(access_token, cached['claims']))
         return data
@@ -0,0 +1,14 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from users.helper import invalidate_user_claims
+from users.models import UserProfile
+
+
+@receiver(post_save, sender=UserProfile)
+def user_saved(sender, instance, **kwargs):
+    invalidate_user_claims(instance.id)
+
+
+@receiver(post_delete, sender=UserProfile)
+def user_deleted(sender, instance, **kwargs):
+    invalidate_user_claims(instance.id)
@@ -1,3 +1,375 @@
-from django.test import TestCase
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from unittest import mock
+from django.contrib.auth.hashers import make_password
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken
+from exam.tests import RouteQueryCountMixin, benchmark, create_user
+from resources import QuizExceptionHandler, UserType
+from users.helper import get_tokens_for_user
+from users.management.commands import loadtest_login
+from users.models import UserProfile
+from users.password_pool import PasswordCheckPool
 
-# Create your tests here.
+
+@override_settings(USER_CLAIMS_CACHE={"TIMEOUT": 60 * 60, "SHARED": True})
+class TokenRefreshTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = create_user("student")
+        self.refresh = get_tokens_for_user(self.user)["refresh"]
+        self.client = APIClient()
+
+    def refresh_access(self):
+        return self.client.post("/api/users/token/refresh/", {"refresh": self.refresh})
+
+    def test_refresh_claims_come_from_the_claims_cache(self):
+        # simplejwt's OWN USER ROW CHECK, THE CLAIMS ARE NOT REBUILT
+        with self.assertNumQueries(1):
+            response = self.refresh_access()
+
+        self.assertEqual(response.status_code, 200)
+        access = AccessToken(response.json()["access"])
+        self.assertEqual(access["role"], self.user.role)
+        self.assertEqual(access["name"], "Student Test")
+
+    def test_profile_save_invalidates_the_claims(self):
+        self.user.first_name = "Renamed"
+        self.user.save()
+
+        with self.assertNumQueries(2):
+            self.refresh_access()
+        with self.assertNumQueries(1):
+            response = self.refresh_access()
+        self.assertEqual(AccessToken(response.json()["access"])["firstName"], "Renamed")
+
+    def test_inactive_or_deleted_user_can_not_refresh(self):
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.refresh_access().status_code, 401)
+
+        self.user.delete()
+        self.assertEqual(self.refresh_access().status_code, 401)
+
+    def test_per_process_cache_reads_the_user_row(self):
+        # ANOTHER WORKER DEACTIVATED THE USER, THIS WORKER'S CACHE WAS NEVER CLEARED
+        with self.settings(USER_CLAIMS_CACHE={"TIMEOUT": 60 * 60, "SHARED": False}):
+            self.assertEqual(self.refresh_access().status_code, 200)
+            UserProfile.objects.filter(id=self.user.id).update(is_active=False)
+            self.assertEqual(self.refresh_access().status_code, 401)
+
+    def test_rotation_settings_are_honoured(self):
+        with mock.patch.object(api_settings, "ROTATE_REFRESH_TOKENS", True):
+            response = self.refresh_access()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.json()["refresh"], self.refresh)
+        self.assertEqual(AccessToken(response.json()["access"])["role"], self.user.role)
+
+
+@benchmark
+class TokenRefreshBenchmark(TestCase):
+    def test_refresh_throughput(self):
+        refresh = get_tokens_for_user(create_user("student"))["refresh"]
+        client = APIClient()
+
+        for _ in range(1000):
+            response = client.post("/api/users/token/refresh/", {"refresh": refresh})
+
+        self.assertEqual(response.status_code, 200)
+
+
+class PasswordCheckPoolTests(SimpleTestCase):
+    encoded = make_password("secret-password")
+
+    def test_checks_in_worker_processes(self):
+        pool = PasswordCheckPool(workers=1, max_pending=4, timeout=30)
+        self.addCleanup(pool.shutdown)
+
+        self.assertEqual(pool.check("secret-password", self.encoded), (True, False))
+        self.assertEqual(pool.check("wrong-password", self.encoded), (False, False))
+        self.assertEqual(pool.stats()["checked"], 2)
+        self.assertEqual(pool.stats()["pending"], 0)
+
+    def test_full_queue_is_rejected_with_503(self):
+        pool = PasswordCheckPool(workers=1, max_pending=0, timeout=30)
+
+        with self.assertRaises(QuizExceptionHandler) as context:
+            pool.check("secret-password", self.encoded)
+
+        self.assertEqual(context.exception.error_code, 503)
+        self.assertEqual(pool.stats()["rejected"], 1)
+        self.assertIsNone(pool._executor)
+
+    def test_broken_pool_is_replaced(self):
+        pool = PasswordCheckPool(workers=1, max_pending=4, timeout=30)
+        self.addCleanup(pool.shutdown)
+        broken = mock.Mock(**{"submit.side_effect": BrokenProcessPool("worker died")})
+        pool._executor = broken
+
+        with self.assertRaises(QuizExceptionHandler) as context:
+            pool.check("secret-password", self.encoded)
+
+        self.assertEqual(context.exception.error_code, 503)
+        self.assertIsNone(pool._executor)
+        self.assertEqual(pool.stats()["pending"], 0)
+        broken.shutdown.assert_called_once_with(wait=False)
+        self.assertEqual(pool.check("secret-password", self.encoded), (True, False))
+
+    def test_timed_out_check_holds_its_slot_until_the_worker_is_done(self):
+        pool = PasswordCheckPool(workers=1, max_pending=1, timeout=0.01)
+        running = Future()
+        running.set_running_or_notify_cancel()
+        pool._executor = mock.Mock(**{"submit.return_value": running})
+
+        with self.assertRaises(QuizExceptionHandler):
+            pool.check("secret-password", self.encoded)
+        self.assertEqual((pool.stats()["timed_out"], pool.stats()["pending"]), (1, 1))
+        with self.assertRaises(QuizExceptionHandler):
+            pool.check("secret-password", self.encoded)
+        self.assertEqual(pool.stats()["rejected"], 1)
+
+        running.set_result((True, False))
+        self.assertEqual(pool.stats()["pending"], 0)
+
+    def test_zero_workers_checks_inline(self):
+        pool = PasswordCheckPool(workers=0, max_pending=0, timeout=30)
+        self.assertEqual(pool.check("secret-password", self.encoded), (True, False))
+        self.assertIsNone(pool._executor)
+
+
+class LoginTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.student = create_user("student")
+        cls.student.set_password("secret-password")
+        cls.student.save()
+        cls.admin = create_user("admin", UserType.ADMIN.value)
+
+    def setUp(self):
+        self.pool = PasswordCheckPool(workers=0, max_pending=0, timeout=30)
+        patcher = mock.patch("users.helper.get_password_pool", return_value=self.pool)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def login(self, password):
+        return APIClient().post("/api/users/login", {"username": "student", "password": password})
+
+    def test_login_checks_the_password_through_the_pool(self):
+        self.assertEqual(self.login("secret-password").status_code, 200)
+        self.assertEqual(self.login("wrong-password").status_code, 406)
+        self.assertEqual(self.pool.stats()["checked"], 2)
+
+    def test_login_upgrades_an_outdated_hash(self):
+        with override_settings(PASSWORD_HASHERS=FAST_HASHER + ["django.contrib.auth.hashers.PBKDF2PasswordHasher"]):
+            self.assertEqual(self.login("wrong-password").status_code, 406)
+            self.student.refresh_from_db()
+            self.assertTrue(self.student.password.startswith("pbkdf2_sha256$"))
+
+            self.assertEqual(self.login("secret-password").status_code, 200)
+            self.student.refresh_from_db()
+            self.assertTrue(self.student.password.startswith("md5$"))
+            self.assertEqual(self.login("secret-password").status_code, 200)
+
+    def test_stats_are_admin_only(self):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens_for_user(self.student)['access']}")
+        self.assertEqual(client.get("/api/users/login/stats").status_code, 403)
+
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens_for_user(self.admin)['access']}")
+        response = client.get("/api/users/login/stats")
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("p99_ms", response.json()["data"])
+
+
+def roster_csv(rows):
+    lines = ["username,email,password,first_name,last_name,age"]
+    lines.extend(",".join(row) for row in rows)
+    return "\n".join(lines).encode()
+
+
+FAST_HASHER = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+
+@override_settings(
+    PASSWORD_HASHERS=FAST_HASHER,
+    ROSTER_IMPORT={"HASH_WORKERS": 0, "BATCH_SIZE": 2, "MAX_ROWS": 10}
+)
+class RosterImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.teacher = create_user("teacher", UserType.TEACHER.value)
+        create_user("taken")
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens_for_user(self.teacher)['access']}")
+
+    def upload(self, name, content, client=None):
+        return (client or self.client).post(
+            "/api/users/import",
+            {"file": SimpleUploadedFile(name, content)},
+            format="multipart"
+        )
+
+    def test_csv_import_with_row_errors(self):
+        response = self.upload("roster.csv", roster_csv([
+            ["alice", "alice@example.com", "pass-1", "Alice", "A", "20"],
+            ["bob", "bob@example.com", "", "Bob", "B", ""],
+            ["taken", "new@example.com", "pass-3", "T", "T", "20"],
+            ["carol", "ALICE@example.com", "pass-4", "Carol", "C", "20"],
+            ["dave", "not-an-email", "pass-5", "Dave", "D", "-1"],
+        ]))
+
+        self.assertEqual(response.status_code, 200)
+        report = response.json()["data"]
+        self.assertEqual((report["created"], report["failed"]), (2, 3))
+        self.assertEqual([error["row"] for error in report["errors"]], [4, 5, 6])
+        self.assertIn("username", report["errors"][0]["errors"])
+        self.assertIn("email", report["errors"][1]["errors"])
+        self.assertEqual(set(report["errors"][2]["errors"]), {"email", "age"})
+
+        alice = UserProfile.objects.get(username="alice")
+        self.assertTrue(alice.check_password("pass-1"))
+        self.assertEqual(alice.role, UserType.STUDENT.value)
+        self.assertFalse(UserProfile.objects.get(username="bob").has_usable_password())
+
+    def test_existing_users_match_ignoring_case(self):
+        UserProfile.objects.create(username="Alice", email="alice@x.com")
+        response = self.upload("roster.csv", roster_csv([
+            ["alice", "new-alice@x.com", "pass-1", "Alice", "A", "20"],
+            ["alice-2", "ALICE@x.com", "pass-2", "Alice", "A", "20"],
+        ]))
+
+        report = response.json()["data"]
+        self.assertEqual(report["created"], 0)
+        self.assertEqual(
+            [(error["row"], list(error["errors"])) for error in report["errors"]],
+            [(2, ["username"]), (3, ["email"])]
+        )
+        self.assertEqual(UserProfile.objects.filter(username__iexact="alice").count(), 1)
+
+    def test_jsonl_import_runs_batched_lookups(self):
+        content = "\n".join(
+            f'{{"username": "student-{index}", "email": "student-{index}@example.com", "password": "pw"}}'
+            for index in range(6)
+        ).encode()
+        # 3 USERNAME AND 3 EMAIL LOOKUP BATCHES, 3 INSERT BATCHES AND THE SAVEPOINT PAIR
+        with self.assertNumQueries(11):
+            response = self.upload("roster.jsonl", content)
+        self.assertEqual(response.json()["data"]["created"], 6)
+
+    def test_hashes_in_worker_processes(self):
+        with self.settings(ROSTER_IMPORT={"HASH_WORKERS": 2, "BATCH_SIZE": 100, "MAX_ROWS": 10}):
+            response = self.upload("roster.csv", roster_csv([
+                [f"student-{index}", f"student-{index}@example.com", f"pass-{index}", "S", "T", "20"]
+                for index in range(4)
+            ]))
+        self.assertEqual(response.json()["data"]["created"], 4)
+        self.assertTrue(UserProfile.objects.get(username="student-3").check_password("pass-3"))
+
+    def test_rejected_uploads(self):
+        self.assertEqual(self.upload("roster.txt", b"username").status_code, 406)
+        self.assertEqual(self.upload("roster.jsonl", b"[1, 2]").status_code, 406)
+        self.assertEqual(self.upload("roster.csv", roster_csv([["a", "a@example.com", "", "", "", ""]] * 11)).status_code, 406)
+
+        student = APIClient()
+        student.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens_for_user(create_user('student'))['access']}")
+        self.assertEqual(self.upload("roster.csv", roster_csv([]), client=student).status_code, 403)
+
+
+@benchmark
+@override_settings(PASSWORD_HASHERS=FAST_HASHER)
+class RosterImportBenchmark(TestCase):
+    def test_5000_students(self):
+        teacher = create_user("teacher", UserType.TEACHER.value)
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f"Bearer {get_tokens_for_user(teacher)['access']}")
+        content = roster_csv([
+            [f"student-{index}", f"student-{index}@example.com", f"pass-{index}", "S", "T", "20"]
+            for index in range(5000)
+        ])
+
+        response = client.post(
+            "/api/users/import",
+            {"file": SimpleUploadedFile("roster.csv", content)},
+            format="multipart"
+        )
+
+        self.assertEqual(response.json()["data"]["created"], 5000)
+
+
+@override_settings(PASSWORD_HASHERS=FAST_HASHER)
+class LoadtestLoginUsersTests(TestCase):
+    def test_existing_users_keep_their_password_unless_reset(self):
+        existing = create_user("loadtest-0")
+        existing.set_password("own-password")
+        existing.save()
+        command = loadtest_login.Command()
+
+        self.assertEqual(command.create_users(["loadtest-0", "loadtest-1"], "loadtest-password"), 1)
+        self.assertTrue(UserProfile.objects.get(username="loadtest-0").check_password("own-password"))
+        self.assertTrue(UserProfile.objects.get(username="loadtest-1").check_password("loadtest-password"))
+
+        self.assertEqual(command.create_users(["loadtest-0"], "loadtest-password", reset_passwords=True), 0)
+        self.assertTrue(UserProfile.objects.get(username="loadtest-0").check_password("loadtest-password"))
+
+
+ROUTE_SETTINGS = override_settings(
+    PASSWORD_HASHERS=FAST_HASHER,
+    ROSTER_IMPORT={"HASH_WORKERS": 0, "BATCH_SIZE": 1000, "MAX_ROWS": 10}
+)
+
+
+class UserRouteQueries(RouteQueryCountMixin):
+    def setUp(self):
+        patcher = mock.patch(
+            "users.helper.get_password_pool",
+            return_value=PasswordCheckPool(workers=0, max_pending=0, timeout=30)
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_user_routes(self):
+        admin = self.fixture.admin
+        self.assert_route_queries(1, "get", "/api/users/", admin)
+        self.assert_route_queries(1, "get", f"/api/users/{self.fixture.students[0].id}/", admin)
+        self.assert_route_queries(3, "post", "/api/users/", admin, {
+            "username": "new-student",
+            "email": "new-student@example.com",
+            "password": "secret-password",
+            "first_name": "New",
+            "last_name": "Student",
+        })
+        # THE VIEW ANSWERS A SUCCESSFUL DELETE WITH A 400
+        self.assert_route_queries(21, "delete", f"/api/users/{self.fixture.students[0].id}/", admin, status_code=400)
+        self.assert_route_queries(40, "delete", f"/api/users/{self.fixture.teacher.id}/", admin, status_code=400)
+        self.assert_route_queries(
+            5, "post", "/api/users/import", admin,
+            {"file": SimpleUploadedFile("roster.csv", roster_csv([["alice", "alice@example.com", "pass-1", "Alice", "A", "20"]]))},
+            format="multipart"
+        )
+
+    def test_login_routes(self):
+        student = self.fixture.students[0]
+        student.set_password("secret-password")
+        student.save()
+        self.assert_route_queries(1, "post", "/api/users/login", data={"username": student.username, "password": "secret-password"})
+        self.assert_route_queries(0, "get", "/api/users/login/stats", self.fixture.admin)
+        refresh = get_tokens_for_user(student)["refresh"]
+        # simplejwt READS THE USER ROW, THE DEFAULT LocMemCache IS PER PROCESS SO THE CLAIMS DO TOO
+        self.assert_route_queries(2, "post", "/api/users/token/refresh/", data={"refresh": refresh})
+
+
+@ROUTE_SETTINGS
+class SmallUserRouteQueryTests(UserRouteQueries, TestCase):
+    fixture_size = "small"
+
+
+@ROUTE_SETTINGS
+class LargeUserRouteQueryTests(UserRouteQueries, TestCase):
+    fixture_size = "large"
@@ -4,6 +4,8 @@ from users import views
 urlpatterns = [
     path('', views.UserView.as_view(), name='user-view'),
     path('<int:id>/', views.UserView.as_view(), name='user-detail-delete'),
+    path('import', views.UserImportView.as_view(), name='user-import'),
     path('login', views.LoginView.as_view(), name='login'),
+    path('login/stats', views.LoginStatsView.as_view(), name='login-stats'),
     path('token/refresh/', views.CustomTokenRefreshView.as_view(), name='token_refresh'),
 ]
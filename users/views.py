@@ -1,11 +1,19 @@
+from django.conf import settings
 from django.shortcuts import get_object_or_404
 from rest_framework import status
+from rest_framework.parsers import MultiPartParser
+from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 from rest_framework_simplejwt.views import TokenRefreshView
 
 from resources import (
     response_builder,
-    QuizExceptionHandler
+    timed_view,
+    paginate_by_id,
+    read_import_rows,
+    check_user_role,
+    QuizExceptionHandler,
+    UserType
 )
 from users.seralizer import (
     UserProfileSerializer,
@@ -16,8 +24,12 @@ from users import (
     helper,
     models
 )
+from users.password_pool import get_password_pool
+from users.roster import import_roster
+from quiz.signals import tracked_delete
 
 
+@timed_view
 class UserView(APIView):
     def get(self, request, id=None):
         if id:
@@ -28,11 +40,12 @@ class UserView(APIView):
                 status_code=status.HTTP_200_OK
             )
         else:
-            users = models.UserProfile.objects.all()
-            serializer = UserProfileSerializer(users, many=True)
+            page = paginate_by_id(models.UserProfile.objects.all(), request)
+            serializer = UserProfileSerializer(page.items, many=True)
             return response_builder(
                 result=serializer.data,
-                status_code=status.HTTP_200_OK
+                status_code=status.HTTP_200_OK,
+                page=page
             )
 
     def post(self, request):
@@ -56,13 +69,38 @@ class UserView(APIView):
             )
         user = get_object_or_404(models.UserProfile, id=id)
         username = user.username
-        user.delete()
+        tracked_delete(user)
         return response_builder(
             result=f"User '{username}' deleted successfully.",
             status_code=status.HTTP_400_BAD_REQUEST
         )
 
 
+@timed_view
+class UserImportView(APIView):
+    permission_classes = [IsAuthenticated]
+    parser_classes = [MultiPartParser]
+    def post(self, request):
+        try:
+            check_user_role(request, [UserType.ADMIN.value, UserType.TEACHER.value])
+            rows = read_import_rows(request, settings.ROSTER_IMPORT["MAX_ROWS"])
+            return response_builder(
+                result=import_roster(rows),
+                status_code=status.HTTP_200_OK
+            )
+        except QuizExceptionHandler as e:
+            return response_builder(
+                result=e.error_msg,
+                status_code=e.error_code
+            )
+        except Exception as e:
+            return response_builder(
+                result=str(e),
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+@timed_view
 class LoginView(APIView):
     def post(self, request):
         try:
@@ -92,5 +130,22 @@ class LoginView(APIView):
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+@timed_view
+class LoginStatsView(APIView):
+    permission_classes = [IsAuthenticated]
+    def get(self, request):
+        try:
+            check_user_role(request, [UserType.ADMIN.value])
+            return response_builder(
+                result=get_password_pool().stats(),
+                status_code=status.HTTP_200_OK
+            )
+        except QuizExceptionHandler as e:
+            return response_builder(
+                result=e.error_msg,
+                status_code=e.error_code
+            )
+
+@timed_view
 class CustomTokenRefreshView(TokenRefreshView):
     serializer_class = CustomTokenRefreshSerializer